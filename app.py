@@ -1,20 +1,99 @@
-from flask import Flask, render_template, request, jsonify
-from app.services.translation.asl_converter import convert_to_asl
-from app.services.speech_to_text.speech_to_text_converter import record_and_transcribe
-from app.services.translation.multilingual_translator import translate_to_english
-from app.services.sign_synthesis.video_matcher import prepare_display_data
-from app.services.sign_synthesis.pose_extraction import pose_extraction
-from app.services.utils.mongo_utils import init_mongo_client
-from app.config import MAX_TOKENS
+import time
+STARTUP_STARTED = time.perf_counter()
+
+import json
+import hashlib
+import threading
+from flask import Flask, Response, render_template, request, jsonify
+from app.services.translation.asl_converter import convert_to_asl, stream_asl
+from app.services.translation.fused_annotator import annotate_sentence, sanitize_annotation
+from app.services.utils.warmup import start_warmup, get_warmup_report
+from app.services.utils.llm_gateway import gateway, LLMGatewayError
+from app.services.utils.mongo_utils import init_mongo_client, ensure_indexes
+from app.services.utils.video_cache import get_cache_stats
+from app.services.utils.llm_cache import get_llm_cache_stats
+from app.services.utils.lexicon_index import LexiconIndex
+from app.services.utils.word_catalog import WordCatalog
+from app.services.utils.tracing import start_trace, get_current_trace, clear_trace, render_metrics, REQUEST_DURATIONS
+from app.services.utils.job_workspace import job_exists, start_garbage_collector
+from app.services.utils.task_queue import task_queue, QueueBusyError
+from app.config import (
+    MAX_TOKENS, FUSED_TRANSLATION, PLAYBACK_MODE, WARMUP_ON_STARTUP, AUDIO_UPLOAD_MAX_BYTES, WORDS_SEARCH_LIMIT,
+    IMPORT_MAX_BYTES, TIMING_IN_RESPONSES, ORCHESTRATED_PIPELINE
+)
+
+# The media stacks (moviepy, OpenCV, MediaPipe, audio) are imported by the
+# routes that need them, and loaded in the background by the warm-up.
 
 app = Flask(__name__)
+# No route accepts a larger body. Werkzeug stops reading beyond it, including
+# chunked uploads that announce no length.
+app.config["MAX_CONTENT_LENGTH"] = IMPORT_MAX_BYTES
+
+# Set by create_app(). Pose worker processes are spawned and re-import this
+# module as __mp_main__, so nothing below may run at import time.
+collection = None
+lexicon = None
+word_catalog = None
+STARTUP_SECONDS = None
 
-collection = init_mongo_client()
+def create_app():
+    """
+    Connects to MongoDB, loads the lexicon and starts the background services
+    the routes rely on.
+
+    Returns:
+        Flask: The application.
+    """
+    global collection, lexicon, word_catalog, STARTUP_SECONDS
+    collection = init_mongo_client()
+    try:
+        ensure_indexes(collection)
+    except Exception as e:
+        print(f"Error creating lexicon indexes: {e}")
+    lexicon = LexiconIndex(collection)
+    lexicon.load()
+    lexicon.start_watching()
+    word_catalog = WordCatalog(lexicon)
+    start_garbage_collector()
+    if WARMUP_ON_STARTUP:
+        start_warmup()
+
+    STARTUP_SECONDS = time.perf_counter() - STARTUP_STARTED
+    print(f"Server initialized in {STARTUP_SECONDS:.2f}s")
+    return app
+
+@app.before_request
+def start_request_trace():
+    """Starts collecting the pipeline stages of the request."""
+    start_trace()
+
+@app.after_request
+def finish_request_trace(response):
+    """
+    Records the request duration, and adds the per-stage timing breakdown to JSON
+    responses when TIMING_IN_RESPONSES is set or the request has ?timing=1.
+    """
+    trace = get_current_trace()
+    if trace is None:
+        return response
+    clear_trace()
+    REQUEST_DURATIONS.observe(request.endpoint or "unknown", time.perf_counter() - trace.started)
+
+    if (TIMING_IN_RESPONSES or request.args.get("timing") == "1") and response.is_json and not response.is_streamed:
+        payload = response.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload.setdefault("timing", trace.to_dict())
+            response.set_data(json.dumps(payload))
+    return response
 
 @app.route("/", methods=["GET"])
 def render_index():
     """Render the index page."""
-    return render_template("index.html", page_title="Text to ASL Translator", max_tokens=MAX_TOKENS)
+    return render_template(
+        "index.html", page_title="Text to ASL Translator", max_tokens=MAX_TOKENS,
+        playback_mode=PLAYBACK_MODE, orchestrated_pipeline=ORCHESTRATED_PIPELINE
+    )
 
 @app.route("/words", methods=["GET"])
 def render_words_list():
@@ -35,26 +114,95 @@ def handle_metadata():
             "definitions": meanings_data
         }
 
-        collection.create_index("words", unique=True)
-
         try:
             collection.replace_one({"words": {"$in": word_data["words"]}}, word_data, upsert=True)
+            lexicon.reload_documents(word_data["words"])
             return render_template("scrape.html", page_title="Add a Word", metadata="Word added successfully!", error=None)
         except Exception as e:
             return render_template("scrape.html", page_title="Add a Word", metadata=None, error=f"Error inserting or replacing document: {e}")
 
     return render_template("scrape.html", page_title="Add a Word", metadata=None, error=None)
 
+@app.route("/admin/import", methods=["POST"])
+def import_lexicon():
+    """Handle bulk import of lexicon documents from a CSV or JSON Lines upload."""
+    import io
+    from app.services.utils.lexicon_import import read_records, import_records, detect_format, LexiconImportError
+
+    def render(report=None, metadata=None, error=None):
+        return render_template("scrape.html", page_title="Add a Word", metadata=metadata, error=error, import_report=report)
+
+    # Checked before request.files, which spools the whole upload
+    if (request.content_length or 0) > IMPORT_MAX_BYTES:
+        return render(error="Import file too large"), 413
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        return render(error="No import file provided"), 400
+    file_format = detect_format(upload.filename)
+    if not file_format:
+        return render(error="Import file must be .csv or .jsonl"), 400
+
+    try:
+        records = read_records(io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline=""), file_format)
+        report = import_records(collection, records)
+    except (LexiconImportError, UnicodeDecodeError) as e:
+        return render(error=f"Error reading import file: {e}"), 400
+
+    if report["words"]:
+        lexicon.reload_documents(report["words"])
+    if report["video_urls"] and request.form.get("download_videos"):
+        from scripts.video_scraper import download_video_batch
+        threading.Thread(target=download_video_batch, args=(report["video_urls"],), daemon=True).start()
+        report["downloads_started"] = True
+
+    imported = report["inserted"] + report["updated"]
+    return render(report=report, metadata=f"Imported {imported} of {report['records']} record(s)")
+
+@app.route("/api/translate", methods=["POST"])
+def translate_api():
+    """
+    API endpoint to translate a text to signs, streaming the English translation
+    and the gloss as Server-Sent Events while they are generated. The LLM stages
+    run in the request; only the merge and skeleton render are queued as a
+    background task, whose ID the "done" event carries as "task_id".
+    """
+    from app.services.sign_synthesis.translation_pipeline import ClipPrefetcher, stream_translation, render_translation
+    from app.services.sign_synthesis.video_tasks import get_sequence_key
+    input_text = (request.get_json(silent=True) or {}).get("input_text")
+    if not input_text or not input_text.strip():
+        return jsonify({"error": "No input text provided"}), 400
+    mode = request.json.get("mode", PLAYBACK_MODE)
+    fused = bool(request.json.get("fused", FUSED_TRANSLATION))
+
+    def generate():
+        prefetcher = ClipPrefetcher(lexicon)
+        try:
+            for event, data in stream_translation(input_text, lexicon, prefetcher, mode, fused):
+                video_paths = data.pop("video_paths", None) if event == "done" else None
+                if video_paths:
+                    # Requests resolving to the same clips share one render while it is in flight
+                    data["task_id"] = task_queue.submit(
+                        "translate", get_sequence_key(video_paths), render_translation, video_paths, prefetcher
+                    )["id"]
+                yield format_sse(event, data)
+        except QueueBusyError as e:
+            yield format_sse("error", {"error": str(e), "busy": True})
+        except Exception as e:
+            yield format_sse("error", {"error": str(e)})
+
+    return Response(generate(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route("/api/translate-to-english", methods=["POST"])
 def translate_to_english_api():
     """API endpoint to translate text to English."""
+    from app.services.translation.multilingual_translator import to_english
     original_text = request.json.get("input_text")
     if not original_text:
         return jsonify({"error": "No input text provided"}), 400
     try:
-        english_text = translate_to_english(original_text)
-        print(f'Translated text: {english_text}')
-        return jsonify({"english_text": english_text})
+        result = to_english(original_text)
+        print(f'Translated text: {result["english_text"]} (fast path: {result["fast_path"]}, cached: {result["cached"]})')
+        return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -70,41 +218,175 @@ def convert_to_asl_api():
         return jsonify({"error": f"Input too long! Please limit to {MAX_TOKENS} words."}), 400
     
     try:
+        if request.json.get("fused", FUSED_TRANSLATION):
+            result = annotate_sentence(english_text, lexicon)
+            if result:
+                print(f'ASL Gloss generated with annotation: {result}')
+                return jsonify(result)
+
         asl_translation = convert_to_asl(english_text)
         print(f'ASL Gloss generated: {asl_translation}')
         return jsonify({"asl_translation": asl_translation})
+    except LLMGatewayError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def format_sse(event, data):
+    """Formats a Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route("/api/convert-to-asl/stream", methods=["POST"])
+def stream_convert_to_asl_api():
+    """
+    API endpoint to convert English text to ASL, streaming the gloss as
+    Server-Sent Events while it is generated.
+    """
+    english_text = request.json.get("english_text")
+    if not english_text:
+        return jsonify({"error": "No English text provided"}), 400
+
+    word_count = len(english_text.split())
+    if word_count > MAX_TOKENS:
+        return jsonify({"error": f"Input too long! Please limit to {MAX_TOKENS} words."}), 400
+
+    fused = request.json.get("fused", FUSED_TRANSLATION)
+
+    def generate():
+        try:
+            if fused:
+                # The fused call returns the gloss all at once, with its annotation
+                result = annotate_sentence(english_text, lexicon)
+                if result:
+                    yield format_sse("done", result)
+                    return
+
+            asl_translation = ""
+            for _, partial_gloss in stream_asl(english_text):
+                yield format_sse("gloss", {"gloss": partial_gloss})
+                asl_translation = partial_gloss
+
+            if not asl_translation:
+                yield format_sse("error", {"error": "Failed to generate ASL gloss"})
+                return
+
+            print(f'ASL Gloss generated: {asl_translation}')
+            yield format_sse("done", {"asl_translation": asl_translation})
+        except Exception as e:
+            yield format_sse("error", {"error": str(e)})
+
+    return Response(generate(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route("/api/prepare-video", methods=["POST"])
 def prepare_video_api():
     """API endpoint to prepare video for ASL translation."""
+    from app.services.sign_synthesis.video_matcher import resolve_display_data, prepare_playlist
+    from app.services.sign_synthesis.video_tasks import get_sequence_key, prepare_merged_video
     asl_translation = request.json.get("asl_translation")
     context = request.json.get("context")
+    annotation = sanitize_annotation(request.json.get("annotation"))
+    mode = request.json.get("mode", "merged")
     if not asl_translation:
         return jsonify({"error": "No ASL translation provided"}), 400
-    try:
-        if prepare_display_data(asl_translation, context=context, collection=collection):
-            print("Video merge complete")
-            return jsonify({"video_ready": True})
-        else:
+
+    if mode == "playlist":
+        try:
+            clips = prepare_playlist(asl_translation, context=context, collection=lexicon, annotation=annotation)
+            if clips:
+                return jsonify({"video_ready": True, "mode": "playlist", "clips": clips})
             return jsonify({"video_ready": False}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    try:
+        display_data = resolve_display_data(asl_translation, context=context, collection=lexicon, annotation=annotation)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    video_paths = [path for _, path in display_data]
+    if not video_paths:
+        return jsonify({"video_ready": False}), 400
+
+    # Requests resolving to the same clips share one merge while it is in flight
+    return submit_task("prepare", get_sequence_key(video_paths), prepare_merged_video, video_paths)
 
 @app.route("/api/pose-extraction", methods=["POST"])
 def pose_extraction_api():
-    """API endpoint to perform pose extraction."""
+    """API endpoint to queue pose extraction for the merged video of a job."""
+    from app.services.sign_synthesis.video_tasks import extract_job_pose
+    job_id = (request.get_json(silent=True) or {}).get("job_id")
+    if not job_id:
+        return jsonify({"error": "No job ID provided"}), 400
+    if not job_exists(job_id):
+        return jsonify({"error": "Job not found or expired"}), 404
+    return submit_task("pose", job_id, extract_job_pose, job_id)
+
+def submit_task(kind, key, function, *args):
+    """
+    Queues a background task and answers with its ID, or with 503 and
+    Retry-After when the queue is full.
+
+    Args:
+        kind (str): The kind of task.
+        key (str): Identifies the work, so that identical in-flight tasks are coalesced.
+        function (callable): Computes the result of the task.
+        *args: Arguments of the function.
+
+    Returns:
+        Response: The Flask response.
+    """
     try:
-        output_path = pose_extraction()
-        print("Pose extraction complete")
-        return jsonify({"output_path": output_path})
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        task = task_queue.submit(kind, key, function, *args)
+    except QueueBusyError as e:
+        response = jsonify({"error": str(e), "busy": True})
+        response.status_code = 503
+        response.headers["Retry-After"] = "5"
+        return response
+    return jsonify({"task_id": task["id"], "status": task["status"], "position": task["position"]}), 202
+
+@app.route("/api/tasks/<task_id>", methods=["GET"])
+def task_status_api(task_id):
+    """
+    API endpoint to fetch the status and result of a background task. It answers
+    at once, so polling clients never hold a server thread; they back off between polls.
+    """
+    task = task_queue.get(task_id)
+    if task is None:
+        return jsonify({"error": "Task not found or expired"}), 404
+
+    timing = task.pop("timing")
+    if timing and (TIMING_IN_RESPONSES or request.args.get("timing") == "1"):
+        task["timing"] = timing
+    return jsonify(task)
+
+@app.route("/api/task-stats", methods=["GET"])
+def task_stats_api():
+    """API endpoint to report submitted, coalesced, rejected and queued background tasks."""
+    return jsonify(task_queue.get_stats())
+
+@app.route("/api/cache-stats", methods=["GET"])
+def cache_stats_api():
+    """API endpoint to report video and LLM response cache statistics."""
+    return jsonify({"video": get_cache_stats(), "llm": get_llm_cache_stats()})
+
+@app.route("/api/llm-gateway-stats", methods=["GET"])
+def llm_gateway_stats_api():
+    """API endpoint to report LLM call, retry, hedge and failure counts and the circuit breaker state."""
+    return jsonify(gateway.get_stats())
+
+@app.route("/api/startup-stats", methods=["GET"])
+def startup_stats_api():
+    """API endpoint to report server startup time, warm-up progress and Holistic pool statistics."""
+    return jsonify({"startup_seconds": STARTUP_SECONDS, "warmup": get_warmup_report()})
+
+@app.route("/metrics", methods=["GET"])
+def metrics_api():
+    """Endpoint exposing stage and request duration histograms and event counters to Prometheus."""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
 
 @app.route("/api/speech-to-text", methods=["POST"])
 def speech_to_text_api():
     """API endpoint to convert speech to text."""
+    from app.services.speech_to_text.speech_to_text_converter import record_and_transcribe
     try:
         transcription = record_and_transcribe()
         
@@ -118,14 +400,96 @@ def speech_to_text_api():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route("/api/speech-to-text/chunk", methods=["POST"])
+def speech_chunk_api():
+    """
+    API endpoint receiving browser audio as a sequence of raw 16-bit mono PCM
+    chunks. The audio is kept in memory and transcribed when the final chunk arrives.
+    """
+    from app.services.speech_to_text.audio_upload import append_chunk, finish_upload, AudioUploadError
+    from app.services.speech_to_text.speech_to_text_converter import transcribe_pcm, SAMPLE_RATE
+
+    upload_id = request.args.get("upload_id")
+    final = request.args.get("final") == "1"
+    try:
+        index = int(request.args.get("index", ""))
+        sample_rate = int(request.args.get("sample_rate", SAMPLE_RATE))
+    except ValueError:
+        return jsonify({"success": False, "error": "Invalid chunk index or sample rate"}), 400
+    if not 8000 <= sample_rate <= 48000:
+        return jsonify({"success": False, "error": "Unsupported sample rate"}), 400
+    if (request.content_length or 0) > AUDIO_UPLOAD_MAX_BYTES:
+        return jsonify({"success": False, "error": "Audio upload too large"}), 413
+
+    try:
+        received = append_chunk(upload_id, request.get_data(), index)
+        if not final:
+            return jsonify({"success": True, "received": received})
+        pcm_bytes = finish_upload(upload_id)
+    except AudioUploadError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    try:
+        transcription = transcribe_pcm(pcm_bytes, sample_rate)
+        if not transcription:
+            return jsonify({"success": False, "error": "No speech detected"}), 400
+        return jsonify({"success": True, "text": transcription})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+def words_response(etag, build_payload):
+    """
+    Answers a words request with a 304 when the client already has the current
+    version, and with the JSON payload and its ETag otherwise.
+
+    Args:
+        etag (str): The ETag of the response for the current word list.
+        build_payload (callable): Returns the JSON payload of the response.
+
+    Returns:
+        Response: The Flask response.
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build_payload())
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+def parse_limit():
+    """Reads the optional "limit" query parameter, or None if it is missing or invalid."""
+    try:
+        return int(request.args["limit"])
+    except (KeyError, ValueError):
+        return None
+
 @app.route("/api/words", methods=["GET"])
 def fetch_words_api():
-    """API endpoint to fetch all supported words."""
+    """
+    API endpoint to fetch supported words a page at a time. Pass the "next_cursor"
+    of a page as "cursor" to get the following page.
+    """
+    try:
+        cursor = request.args.get("cursor") or None
+        limit = word_catalog.clamp_limit(parse_limit())
+        snapshot = word_catalog.snapshot()
+        etag = f"{snapshot.digest}-{hashlib.sha256(f'{cursor}|{limit}'.encode('utf-8')).hexdigest()[:12]}"
+        return words_response(etag, lambda: snapshot.page(cursor, limit))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/words/search", methods=["GET"])
+def search_words_api():
+    """API endpoint to find the supported words starting with a prefix, for search and autocomplete."""
+    prefix = request.args.get("prefix", "").strip()
+    if not prefix:
+        return jsonify({"error": "No prefix provided"}), 400
     try:
-        words_data = collection.find({}, {"words": 1})
-        words = [word["words"] for word in words_data]
-        sorted_words = sorted([w for sublist in words for w in sublist])
-        return jsonify({"words": sorted_words})
+        limit = word_catalog.clamp_limit(parse_limit(), default=WORDS_SEARCH_LIMIT)
+        snapshot = word_catalog.snapshot()
+        etag = f"{snapshot.digest}-{hashlib.sha256(f'{prefix.lower()}|{limit}'.encode('utf-8')).hexdigest()[:12]}"
+        return words_response(etag, lambda: snapshot.search(prefix, limit))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -135,4 +499,4 @@ def page_not_found(e):
     return "Page not found!", 404
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -19,21 +19,96 @@ def get_env_var(var_name):
     return value
 
 HUGGINGFACE_TOKEN = lambda: get_env_var("HUGGINGFACE_TOKEN")
-ASR_API_URL = "https://api-inference.huggingface.co/models/openai/whisper-large-v3-turbo"
+ASR_API_URL = os.getenv("ASR_API_URL", "https://api-inference.huggingface.co/models/openai/whisper-large-v3-turbo")
 LLM_MODEL_NAME = "Qwen/Qwen2.5-72B-Instruct"
+LLM_CACHE_DB_PATH = os.path.normpath(os.path.join("data", "llm_cache.sqlite3"))
+LLM_CACHE_MEMORY_ENTRIES = 1024  # Responses kept in the in-memory LRU tier
+LLM_CACHE_TTLS = {  # Seconds a cached response stays valid, per call site
+    "asl_gloss": 7 * 24 * 60 * 60,
+    "named_entities": 7 * 24 * 60 * 60,
+    "wsd": 30 * 24 * 60 * 60,
+    "fused_annotation": 7 * 24 * 60 * 60
+}
+PLAYBACK_MODE = "merged"  # "merged" for a server-rendered video, "playlist" to play the clips in the browser
+FUSED_TRANSLATION = False  # Generate gloss, named entities and word senses in one LLM call
 
 MONGODB_URI = lambda: get_env_var("MONGODB_URI")
 DB_NAME = lambda: get_env_var("DB_NAME")
 COLLECTION_NAME = lambda: get_env_var("COLLECTION_NAME")
+LEXICON_REFRESH_SECONDS = 5 * 60  # Reload interval of the lexicon index without a change stream
 
 STATIC_VIDEO_PATH = os.path.normpath(os.path.join("static", "sign_videos"))
+NORMALIZED_VIDEO_PATH = os.path.normpath(os.path.join("static", "sign_videos_normalized"))
+LANDMARK_CACHE_PATH = os.path.normpath(os.path.join("data", "landmarks"))
 TEMP_VIDEO_PATH = os.path.normpath(os.path.join("static", "temp"))
 MERGED_VIDEO_FILENAME = "merged_video.mp4"
 OUTPUT_VIDEO_FILENAME = "output_video.mp4"
 MERGED_VIDEO_PATH = os.path.normpath(os.path.join(TEMP_VIDEO_PATH, MERGED_VIDEO_FILENAME))
 OUTPUT_VIDEO_PATH = os.path.normpath(os.path.join(TEMP_VIDEO_PATH, OUTPUT_VIDEO_FILENAME))
+VIDEO_CACHE_PATH = os.path.normpath(os.path.join(TEMP_VIDEO_PATH, "cache"))
+
+NORMALIZED_VIDEO_SIZE = (480, 360)  # Width and height of normalized sign clips
+NORMALIZED_VIDEO_FPS = 30
+NORMALIZED_VIDEO_GOP = 30  # Keyframe interval of normalized sign clips in frames
+
+JOB_MAX_AGE_SECONDS = 15 * 60  # Job workspaces older than this are evicted
+JOB_DISK_QUOTA_BYTES = 500 * 1024 * 1024  # Total size allowed for all job workspaces
+JOB_GC_INTERVAL_SECONDS = 60  # How often the job garbage collector runs
+VIDEO_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # Byte budget of the merged/pose video cache
 
 MAX_TOKENS = 50
 TARGET_LANGUAGE = "en"
 RECORD_DURATION = 5  # Recording duration in seconds
-DRAW_COLOR = (48, 255, 48)  # Pose landmarks drawing color
\ No newline at end of file
+DRAW_COLOR = (48, 255, 48)  # Pose landmarks drawing color
+POSE_WORKERS = 4  # Worker processes for pose extraction, 1 to run it in the request thread
+POSE_MIN_SEGMENT_FRAMES = 60  # Smallest number of frames worth handing to a pose worker
+POSE_MIN_FRAME_INTERVAL = 1  # Smallest gap between frames that run pose inference
+POSE_MAX_FRAME_INTERVAL = 8  # Largest gap between frames that run pose inference, reached during holds
+POSE_MOTION_PER_INTERVAL = 0.02  # Landmark displacement, in normalized units, allowed between inferred frames
+HOLISTIC_POOL_SIZE = 2  # Ready MediaPipe Holistic instances kept per process for pose extraction
+WARMUP_ON_STARTUP = True  # Import the media stacks and fill the Holistic pool in the background at startup
+LLM_BASE_URL = os.getenv("LLM_BASE_URL")  # OpenAI-compatible endpoint used instead of the Hugging Face API, e.g. scripts/llm_stub_server.py
+LLM_DEADLINE_SECONDS = 20  # Time budget of one LLM call, retries included
+LLM_ATTEMPT_TIMEOUT_SECONDS = 10  # Timeout of a single upstream request
+LLM_MAX_RETRIES = 2  # Retries after a failed or timed out attempt
+LLM_RETRY_BACKOFF_SECONDS = 0.5  # Base delay of the jittered exponential backoff between retries
+LLM_HEDGE_AFTER_SECONDS = 0  # Send a duplicate request if the first has not answered after this long, 0 to disable
+LLM_MAX_CONCURRENCY = 8  # Upstream LLM requests allowed in flight at once
+LLM_BREAKER_FAILURES = 5  # Consecutive failures that open the circuit breaker
+LLM_BREAKER_RESET_SECONDS = 30  # How long the open breaker rejects calls before letting a trial call through
+TRANSLATION_CACHE_ENTRIES = 512  # Non-English inputs whose English translation is kept in memory
+VAD_ENABLED = True  # Stop recording after trailing silence instead of always capturing RECORD_DURATION
+VAD_FRAME_MS = 30  # Length of the frames the voice activity detector classifies
+VAD_ENERGY_THRESHOLD = 0.01  # Minimum RMS level of a speech frame
+VAD_NOISE_MULTIPLIER = 3.0  # Speech frames must also be this many times louder than the measured noise floor
+VAD_MIN_SPEECH_FRAMES = 3  # Consecutive speech frames that mark the start of an utterance
+VAD_TRAILING_SILENCE_SECONDS = 0.8  # Silence after speech that ends the recording
+VAD_PADDING_SECONDS = 0.2  # Audio kept before the first and after the last speech frame
+VAD_MAX_RECORD_SECONDS = 15  # Longest recording, speech or not
+
+ASR_TIMEOUT_SECONDS = 30  # Timeout of a transcription request
+ASR_POOL_SIZE = 4  # Connections kept open to the transcription API
+AUDIO_UPLOAD_MAX_BYTES = 16000 * 2 * 60  # Largest browser upload: 60 s of 16 kHz 16-bit mono PCM
+AUDIO_UPLOAD_TTL_SECONDS = 120  # Unfinished browser uploads are dropped after this long
+VIDEO_MANIFEST_PATH = os.path.normpath(os.path.join("data", "video_manifest.json"))
+SCRAPER_WORKERS = 5  # Parallel video downloads of scripts/video_scraper.py
+MANIFEST_SAVE_EVERY = 50  # Completed downloads between manifest saves, so an interrupted sync keeps its progress
+DOWNLOAD_CHUNK_SIZE = 256 * 1024  # Bytes read at a time from a video download
+CLIP_SPANS_PATH = os.path.normpath(os.path.join("data", "clip_spans.json"))
+TRIM_IDLE_FRAMES = True  # Play only the active span of library clips found by scripts/trim_clips.py
+TRIM_ANALYSIS_WIDTH = 64  # Width frames are downscaled to before they are compared
+TRIM_MOTION_THRESHOLD = 0.5  # Minimum mean absolute difference between frames (0-255) counted as motion
+TRIM_NOISE_MULTIPLIER = 3.0  # Motion must also exceed the noise floor of the clip by this factor
+TRIM_PADDING_SECONDS = 0.15  # Idle time kept before motion onset and after motion offset
+TRIM_MIN_ACTIVE_SECONDS = 0.5  # Clips whose active span would be shorter are left untrimmed
+WORDS_PAGE_SIZE = 200  # Words per page of /api/words
+WORDS_MAX_PAGE_SIZE = 1000  # Largest page a client may request from /api/words
+WORDS_SEARCH_LIMIT = 20  # Default number of matches returned by /api/words/search
+IMPORT_BATCH_SIZE = 500  # Documents written per bulk_write call of a lexicon import
+IMPORT_MAX_BYTES = 20 * 1024 * 1024  # Largest lexicon file accepted by /admin/import
+TIMING_IN_RESPONSES = False  # Add a per-stage "timing" breakdown to every JSON API response, not only to ?timing=1 requests
+TASK_WORKERS = 2  # Worker threads merging videos and extracting poses in the background
+TASK_QUEUE_SIZE = 16  # Tasks that may wait for a worker before requests are answered as busy
+TASK_RESULT_TTL_SECONDS = 10 * 60  # How long finished task results can be fetched
+PIPELINE_WORKERS = 4  # Threads running the independent stages of /api/translate side by side
+ORCHESTRATED_PIPELINE = True  # Let the browser translate with one /api/translate request instead of one request per stage
\ No newline at end of file
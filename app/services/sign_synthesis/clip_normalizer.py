@@ -0,0 +1,170 @@
+import os
+import json
+import subprocess
+import threading
+from moviepy.config import FFMPEG_BINARY
+from app.services.sign_synthesis.clip_trimming import get_clip_span, get_active_span
+from app.config import NORMALIZED_VIDEO_PATH, NORMALIZED_VIDEO_SIZE, NORMALIZED_VIDEO_FPS, NORMALIZED_VIDEO_GOP, TRIM_IDLE_FRAMES
+
+PROFILE_FILENAME = "profile.json"
+
+NORMALIZATION_PROFILE = {
+    "codec": "libx264",
+    "pix_fmt": "yuv420p",
+    "size": list(NORMALIZED_VIDEO_SIZE),
+    "fps": NORMALIZED_VIDEO_FPS,
+    "gop": NORMALIZED_VIDEO_GOP,
+    "timescale": 15360,
+    "audio": False,
+    "trim": TRIM_IDLE_FRAMES
+}
+
+def run_ffmpeg(args):
+    """
+    Runs ffmpeg with the given arguments.
+
+    Args:
+        args (list): The ffmpeg command line arguments, without the binary.
+
+    Raises:
+        RuntimeError: If ffmpeg exits with an error.
+    """
+    result = subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y", *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()}")
+
+def get_normalized_path(video_path):
+    """
+    Returns the path at which the normalized version of a library clip is stored.
+
+    Args:
+        video_path (str): The path of the library clip.
+
+    Returns:
+        str: The path of the normalized clip.
+    """
+    return os.path.normpath(os.path.join(NORMALIZED_VIDEO_PATH, os.path.basename(video_path)))
+
+def profile_matches():
+    """
+    Checks whether the normalized clips on disk were made with the current profile.
+
+    Returns:
+        bool: True if the stored profile matches the current one.
+    """
+    try:
+        with open(os.path.join(NORMALIZED_VIDEO_PATH, PROFILE_FILENAME)) as f:
+            return json.load(f) == NORMALIZATION_PROFILE
+    except (OSError, ValueError):
+        return False
+
+def write_profile():
+    """Records the current normalization profile next to the normalized clips."""
+    os.makedirs(NORMALIZED_VIDEO_PATH, exist_ok=True)
+    with open(os.path.join(NORMALIZED_VIDEO_PATH, PROFILE_FILENAME), "w") as f:
+        json.dump(NORMALIZATION_PROFILE, f)
+
+def get_normalized_clip(video_path):
+    """
+    Returns the normalized version of a library clip if it exists and is up to
+    date with both the clip and its active span.
+
+    Args:
+        video_path (str): The path of the library clip.
+
+    Returns:
+        str: The path of the normalized clip, or None if the clip is not normalized.
+    """
+    normalized_path = get_normalized_path(video_path)
+    span = get_clip_span(video_path)
+    try:
+        normalized_time = os.path.getmtime(normalized_path)
+        if normalized_time >= os.path.getmtime(video_path) and (span is None or normalized_time >= span["analyzed_at"]):
+            return normalized_path
+    except OSError:
+        pass
+    return None
+
+def normalize_clip(video_path, force=False):
+    """
+    Transcodes a library clip to the normalization profile so that it can be
+    joined with other normalized clips without re-encoding. Only the active
+    span of the clip is kept when one was detected.
+
+    Args:
+        video_path (str): The path of the library clip.
+        force (bool, optional): Re-encode the clip even if it is up to date.
+
+    Returns:
+        str: The path of the normalized clip.
+    """
+    if not force:
+        normalized_path = get_normalized_clip(video_path)
+        if normalized_path:
+            return normalized_path
+
+    width, height = NORMALIZATION_PROFILE["size"]
+    video_filter = (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
+        f"fps={NORMALIZATION_PROFILE['fps']},setsar=1"
+    )
+    gop = str(NORMALIZATION_PROFILE["gop"])
+    span = get_active_span(video_path)
+    span_args = ["-ss", f"{span[0]:.3f}", "-t", f"{span[1] - span[0]:.3f}"] if span else []
+
+    normalized_path = get_normalized_path(video_path)
+    temp_path = f"{normalized_path}.{os.getpid()}.{threading.get_ident()}.tmp.mp4"
+    os.makedirs(NORMALIZED_VIDEO_PATH, exist_ok=True)
+    try:
+        run_ffmpeg([
+            *span_args,
+            "-i", video_path,
+            "-an",
+            "-vf", video_filter,
+            "-c:v", NORMALIZATION_PROFILE["codec"],
+            "-preset", "medium",
+            "-pix_fmt", NORMALIZATION_PROFILE["pix_fmt"],
+            "-g", gop,
+            "-keyint_min", gop,
+            "-sc_threshold", "0",
+            "-video_track_timescale", str(NORMALIZATION_PROFILE["timescale"]),
+            "-movflags", "+faststart",
+            temp_path
+        ])
+        os.replace(temp_path, normalized_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return normalized_path
+
+def concat_normalized_clips(normalized_paths, output_path):
+    """
+    Joins normalized clips at the container level, without re-encoding.
+
+    Args:
+        normalized_paths (list): List of paths to normalized clips, in playback order.
+        output_path (str): The path to write the joined video to.
+    """
+    output_dir = os.path.dirname(output_path) or "."
+    os.makedirs(output_dir, exist_ok=True)
+    list_path = f"{output_path}.concat.txt"
+    with open(list_path, "w") as f:
+        for path in normalized_paths:
+            escaped_path = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped_path}'\n")
+    try:
+        run_ffmpeg([
+            "-f", "concat",
+            "-safe", "0",
+            "-i", list_path,
+            "-c", "copy",
+            "-movflags", "+faststart",
+            output_path
+        ])
+    finally:
+        os.remove(list_path)
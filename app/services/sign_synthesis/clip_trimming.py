@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import threading
+import cv2
+import numpy as np
+from app.config import (
+    CLIP_SPANS_PATH, TRIM_IDLE_FRAMES, TRIM_ANALYSIS_WIDTH, TRIM_MOTION_THRESHOLD,
+    TRIM_NOISE_MULTIPLIER, TRIM_PADDING_SECONDS, TRIM_MIN_ACTIVE_SECONDS
+)
+
+SMOOTHING_FRAMES = 5  # Frames the motion signal is averaged over, so single noisy frames do not count as motion
+NOISE_PERCENTILE = 10  # Percentile of the motion signal taken as the noise floor of a clip
+
+_spans = {"entries": {}, "mtime": None}
+_lock = threading.Lock()
+
+def measure_frame_motion(video_path):
+    """
+    Measures how much each frame of a clip differs from the previous one.
+
+    Args:
+        video_path (str): The path of the clip.
+
+    Returns:
+        tuple: The mean absolute difference of each frame from its predecessor
+        as a float array (0 for the first frame), and the clip frame rate.
+    """
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    motion = []
+    previous = None
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            height, width = frame.shape[:2]
+            size = (TRIM_ANALYSIS_WIDTH, max(1, int(height * TRIM_ANALYSIS_WIDTH / width)))
+            gray = cv2.cvtColor(cv2.resize(frame, size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+            gray = cv2.GaussianBlur(gray, (3, 3), 0)
+            motion.append(0.0 if previous is None else float(cv2.absdiff(gray, previous).mean()))
+            previous = gray
+    finally:
+        cap.release()
+    return np.array(motion, dtype=np.float32), fps
+
+def detect_active_span(motion, fps):
+    """
+    Finds the span between motion onset and offset of a clip.
+
+    Args:
+        motion (np.ndarray): The per-frame motion returned by measure_frame_motion.
+        fps (float): The clip frame rate.
+
+    Returns:
+        tuple: The (in, out) points in seconds, padded by TRIM_PADDING_SECONDS,
+        or None if the clip has no clear active span.
+    """
+    if len(motion) < 2:
+        return None
+
+    window = min(SMOOTHING_FRAMES, len(motion))
+    smoothed = np.convolve(motion, np.ones(window) / window, mode="same")
+    noise_floor = np.percentile(motion[1:], NOISE_PERCENTILE)
+    threshold = max(TRIM_MOTION_THRESHOLD, noise_floor * TRIM_NOISE_MULTIPLIER)
+    active = np.flatnonzero(smoothed > threshold)
+    if not len(active):
+        return None
+
+    duration = len(motion) / fps
+    # Motion at frame i happens between frames i - 1 and i
+    in_point = max(0.0, (active[0] - 1) / fps - TRIM_PADDING_SECONDS)
+    out_point = min(duration, (active[-1] + 1) / fps + TRIM_PADDING_SECONDS)
+    if out_point - in_point < TRIM_MIN_ACTIVE_SECONDS:
+        return None
+    return round(float(in_point), 3), round(float(out_point), 3)
+
+def analyze_clip(video_path):
+    """
+    Detects the active span of a library clip.
+
+    Args:
+        video_path (str): The path of the library clip.
+
+    Returns:
+        dict: The span entry, with "in" and "out" in seconds (the whole clip if
+        no active span was found), the clip "duration", the "size" and
+        "mtime_ns" of the analyzed file and the "analyzed_at" timestamp.
+    """
+    stat = os.stat(video_path)
+    motion, fps = measure_frame_motion(video_path)
+    duration = round(len(motion) / fps, 3)
+    span = detect_active_span(motion, fps) or (0.0, duration)
+    return {
+        "in": span[0],
+        "out": span[1],
+        "duration": duration,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "analyzed_at": time.time()
+    }
+
+def load_spans():
+    """
+    Returns the stored span entries, reloading them when the file changes.
+
+    Returns:
+        dict: Mapping of library clip paths to span entries.
+    """
+    try:
+        mtime = os.path.getmtime(CLIP_SPANS_PATH)
+    except OSError:
+        return {}
+    with _lock:
+        if _spans["mtime"] != mtime:
+            try:
+                with open(CLIP_SPANS_PATH) as f:
+                    _spans["entries"] = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error reading clip spans: {e}")
+                _spans["entries"] = {}
+            _spans["mtime"] = mtime
+        return _spans["entries"]
+
+def save_spans(entries):
+    """
+    Stores span entries, replacing the file atomically.
+
+    Args:
+        entries (dict): Mapping of library clip paths to span entries.
+    """
+    os.makedirs(os.path.dirname(CLIP_SPANS_PATH) or ".", exist_ok=True)
+    temp_path = f"{CLIP_SPANS_PATH}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(entries, f, indent=2, sort_keys=True)
+    os.replace(temp_path, CLIP_SPANS_PATH)
+
+def is_entry_current(video_path, entry):
+    """
+    Checks that a span entry was made from the clip as it is on disk.
+
+    Args:
+        video_path (str): The path of the library clip.
+        entry (dict): The span entry.
+
+    Returns:
+        bool: True if the clip has not changed since it was analyzed.
+    """
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return False
+    return entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
+
+def get_clip_span(video_path):
+    """
+    Returns the span entry of a library clip if trimming is enabled and the
+    entry is up to date.
+
+    Args:
+        video_path (str): The path of the library clip.
+
+    Returns:
+        dict: The span entry, or None if the clip should be played in full.
+    """
+    if not TRIM_IDLE_FRAMES:
+        return None
+    entry = load_spans().get(os.path.normpath(video_path))
+    if entry is None or not is_entry_current(video_path, entry):
+        return None
+    return entry
+
+def get_active_span(video_path):
+    """
+    Returns the in and out points of a library clip.
+
+    Args:
+        video_path (str): The path of the library clip.
+
+    Returns:
+        tuple: The (in, out) points in seconds, or None if the clip should be
+        played in full.
+    """
+    entry = get_clip_span(video_path)
+    if entry is None or (entry["in"] <= 0 and entry["out"] >= entry["duration"]):
+        return None
+    return entry["in"], entry["out"]
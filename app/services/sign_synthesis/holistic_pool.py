@@ -0,0 +1,121 @@
+import time
+import queue
+import threading
+from contextlib import contextmanager
+from app.services.sign_synthesis.skeleton_renderer import mp_holistic
+from app.config import HOLISTIC_POOL_SIZE
+
+class HolisticPool:
+    """
+    A bounded pool of ready MediaPipe Holistic instances. Building the Holistic
+    graph is expensive, so requests check an instance out and return it instead
+    of creating their own. Instances are reset on return so that tracking state
+    does not leak from one video into the next.
+    """
+
+    def __init__(self, size=HOLISTIC_POOL_SIZE):
+        """
+        Args:
+            size (int, optional): The maximum number of instances.
+        """
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._stats = {"checkouts": 0, "created": 0, "init_seconds": 0.0, "wait_seconds": 0.0}
+
+    def _create(self):
+        """Builds a new Holistic instance and records how long it took."""
+        start_time = time.perf_counter()
+        holistic = mp_holistic.Holistic(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        elapsed = time.perf_counter() - start_time
+        with self._lock:
+            self._stats["created"] += 1
+            self._stats["init_seconds"] += elapsed
+        print(f"Holistic instance initialized in {elapsed:.2f}s")
+        return holistic
+
+    def _reserve(self):
+        """Claims a slot for a new instance, returning False if the pool is full."""
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def _create_reserved(self):
+        """Builds an instance for a claimed slot, releasing the slot on failure."""
+        try:
+            return self._create()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _discard(self, holistic):
+        """Closes an instance that may be in a broken state and frees its slot."""
+        try:
+            holistic.close()
+        except Exception as e:
+            print(f"Error closing Holistic instance: {e}")
+        with self._lock:
+            self._created -= 1
+
+    def fill(self, count=None):
+        """
+        Creates instances ahead of use.
+
+        Args:
+            count (int, optional): The number of instances to hold. Defaults to the pool size.
+        """
+        target = self.size if count is None else min(count, self.size)
+        while self._created < target and self._reserve():
+            self._idle.put(self._create_reserved())
+
+    @contextmanager
+    def acquire(self):
+        """
+        Checks out a Holistic instance, creating one if the pool is not full yet
+        and waiting for one to be returned otherwise.
+
+        Yields:
+            mp_holistic.Holistic: The checked out instance.
+        """
+        start_time = time.perf_counter()
+        holistic = None
+        while holistic is None:
+            try:
+                holistic = self._idle.get(block=self._created >= self.size, timeout=0.5)
+            except queue.Empty:
+                if self._reserve():
+                    holistic = self._create_reserved()
+        elapsed = time.perf_counter() - start_time
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds"] += elapsed
+        print(f"Holistic instance checked out in {elapsed * 1000:.1f}ms")
+
+        try:
+            yield holistic
+            holistic.reset()
+        except Exception:
+            self._discard(holistic)
+            raise
+        self._idle.put(holistic)
+
+    def get_stats(self):
+        """
+        Returns the pool size and how long instance creation and checkouts took.
+
+        Returns:
+            dict: The pool statistics.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = self.size
+            stats["instances"] = self._created
+        stats["idle"] = self._idle.qsize()
+        stats["mean_checkout_seconds"] = stats["wait_seconds"] / stats["checkouts"] if stats["checkouts"] else 0.0
+        return stats
+
+holistic_pool = HolisticPool()
@@ -0,0 +1,214 @@
+import os
+import cv2
+import numpy as np
+from app.services.sign_synthesis.pose_extraction import mp_holistic, mediapipe_detection
+from app.services.sign_synthesis.skeleton_renderer import (
+    FACE_LANDMARK_COUNT, POSE_LANDMARK_COUNT, HAND_LANDMARK_COUNT, LANDMARK_CONNECTIONS,
+    SkeletonRenderer, results_to_landmarks, is_detected
+)
+from app.services.sign_synthesis.clip_normalizer import get_normalized_clip
+from app.services.sign_synthesis.clip_trimming import get_active_span
+from app.services.utils.tracing import count
+from app.config import LANDMARK_CACHE_PATH, NORMALIZED_VIDEO_SIZE, NORMALIZED_VIDEO_FPS
+
+def get_landmark_cache_path(video_path):
+    """
+    Returns the path of the landmark cache entry of a library clip.
+
+    Args:
+        video_path (str): The path of the library clip.
+
+    Returns:
+        str: The path of the cached landmark arrays.
+    """
+    filename = os.path.splitext(os.path.basename(video_path))[0] + ".npz"
+    return os.path.normpath(os.path.join(LANDMARK_CACHE_PATH, filename))
+
+def get_landmark_source(video_path):
+    """
+    Returns the clip landmarks should be extracted from, preferring the normalized
+    copy so that the coordinates match the frame layout of the merged video.
+
+    Args:
+        video_path (str): The path of the library clip.
+
+    Returns:
+        str: The path of the clip to extract landmarks from.
+    """
+    return get_normalized_clip(video_path) or video_path
+
+def extract_clip_landmarks(video_path):
+    """
+    Runs MediaPipe Holistic over every frame of a library clip.
+
+    Args:
+        video_path (str): The path of the library clip.
+
+    Returns:
+        dict: Landmark arrays per body part, each of shape (frames, landmarks, dims),
+        and the clip frame rate.
+    """
+    source_path = get_landmark_source(video_path)
+    frames = {"face": [], "pose": [], "left_hand": [], "right_hand": []}
+
+    with mp_holistic.Holistic(min_detection_confidence=0.5, min_tracking_confidence=0.5) as holistic:
+        cap = cv2.VideoCapture(source_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or NORMALIZED_VIDEO_FPS
+        try:
+            while cap.isOpened():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frame_landmarks = results_to_landmarks(mediapipe_detection(frame, holistic))
+                for part, arrays in frames.items():
+                    arrays.append(frame_landmarks[part])
+        finally:
+            cap.release()
+
+    landmarks = {
+        "face": np.empty((0, FACE_LANDMARK_COUNT, 2)),
+        "pose": np.empty((0, POSE_LANDMARK_COUNT, 3)),
+        "left_hand": np.empty((0, HAND_LANDMARK_COUNT, 2)),
+        "right_hand": np.empty((0, HAND_LANDMARK_COUNT, 2))
+    }
+    for part, arrays in frames.items():
+        if arrays:
+            landmarks[part] = np.stack(arrays)
+    landmarks["fps"] = fps
+    landmarks["source"] = source_path
+    return landmarks
+
+def save_clip_landmarks(video_path, landmarks):
+    """
+    Stores the landmarks of a library clip as compressed float16 arrays.
+
+    Args:
+        video_path (str): The path of the library clip.
+        landmarks (dict): The landmarks returned by extract_clip_landmarks.
+
+    Returns:
+        str: The path of the cache entry.
+    """
+    cache_path = get_landmark_cache_path(video_path)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+    os.makedirs(LANDMARK_CACHE_PATH, exist_ok=True)
+    np.savez_compressed(
+        temp_path,
+        face=landmarks["face"].astype(np.float16),
+        pose=landmarks["pose"].astype(np.float16),
+        left_hand=landmarks["left_hand"].astype(np.float16),
+        right_hand=landmarks["right_hand"].astype(np.float16),
+        fps=np.float32(landmarks["fps"]),
+        source=np.str_(landmarks["source"])
+    )
+    os.replace(temp_path, cache_path)
+    return cache_path
+
+def has_clip_landmarks(video_path):
+    """
+    Checks, without loading them, whether a library clip has cached landmarks
+    at least as new as the clip they are taken from.
+
+    Args:
+        video_path (str): The path of the library clip.
+
+    Returns:
+        bool: True if the landmarks are cached.
+    """
+    try:
+        return os.path.getmtime(get_landmark_cache_path(video_path)) >= os.path.getmtime(get_landmark_source(video_path))
+    except OSError:
+        return False
+
+def load_clip_landmarks(video_path):
+    """
+    Loads the cached landmarks of a library clip if they are up to date.
+
+    Args:
+        video_path (str): The path of the library clip.
+
+    Returns:
+        dict: The landmark arrays, frame rate and source clip, or None on a cache miss.
+    """
+    cache_path = get_landmark_cache_path(video_path)
+    source_path = get_landmark_source(video_path)
+    try:
+        if os.path.getmtime(cache_path) < os.path.getmtime(source_path):
+            return None
+        with np.load(cache_path) as data:
+            if str(data["source"]) != source_path:
+                return None
+            return {
+                "face": data["face"],
+                "pose": data["pose"],
+                "left_hand": data["left_hand"],
+                "right_hand": data["right_hand"],
+                "fps": float(data["fps"]),
+                "source": source_path
+            }
+    except (OSError, KeyError, ValueError):
+        return None
+
+def get_active_frames(video_path, landmarks):
+    """
+    Returns the frame range of cached landmarks that lies in the active span of
+    a library clip. Landmarks taken from the normalized copy are already trimmed.
+
+    Args:
+        video_path (str): The path of the library clip.
+        landmarks (dict): The landmarks returned by load_clip_landmarks.
+
+    Returns:
+        tuple: The first frame and the frame after the last frame to render.
+    """
+    source_frames = len(landmarks["pose"])
+    span = get_active_span(video_path) if landmarks["source"] == video_path else None
+    if span is None:
+        return 0, source_frames
+    start = min(int(span[0] * landmarks["fps"]), source_frames)
+    end = min(int(round(span[1] * landmarks["fps"])), source_frames)
+    return start, max(start, end)
+
+def render_cached_skeleton(video_paths, output_path, fps=NORMALIZED_VIDEO_FPS, frame_size=NORMALIZED_VIDEO_SIZE, preloaded=None):
+    """
+    Renders the skeleton video of a clip sequence from cached landmarks, without
+    running any inference. Only the active span of each clip is rendered.
+
+    Args:
+        video_paths (list): The library clip paths, in playback order.
+        output_path (str): The path of the output video file.
+        fps (float, optional): The frame rate of the output video.
+        frame_size (tuple, optional): The (width, height) of the output video.
+        preloaded (dict, optional): Landmarks already returned by
+            load_clip_landmarks, keyed by clip path.
+
+    Returns:
+        str: The path to the output video file, or None if a clip is not cached.
+    """
+    preloaded = preloaded or {}
+    clip_landmarks = []
+    for video_path in video_paths:
+        landmarks = preloaded.get(video_path) or load_clip_landmarks(video_path)
+        if landmarks is None:
+            print(f"Landmark cache miss: {video_path}")
+            return None
+        clip_landmarks.append((landmarks, get_active_frames(video_path, landmarks)))
+
+    width, height = frame_size
+    fourcc = cv2.VideoWriter_fourcc(*'avc1')
+    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    renderer = SkeletonRenderer(width, height)
+    try:
+        for landmarks, (start, end) in clip_landmarks:
+            output_frames = int(round((end - start) * fps / landmarks["fps"]))
+            for i in range(output_frames):
+                index = min(start + int(i * landmarks["fps"] / fps), end - 1)
+                if is_detected(landmarks["pose"][index]):
+                    out.write(renderer.render({part: landmarks[part][index] for part in LANDMARK_CONNECTIONS}))
+                else:
+                    out.write(renderer.blank())
+            count("frames_rendered", output_frames)
+    finally:
+        out.release()
+
+    return output_path
@@ -0,0 +1,158 @@
+import numpy as np
+from app.services.sign_synthesis.skeleton_renderer import is_detected
+from app.config import POSE_MIN_FRAME_INTERVAL, POSE_MAX_FRAME_INTERVAL, POSE_MOTION_PER_INTERVAL
+
+MOTION_PARTS = ["pose", "left_hand", "right_hand"]
+
+def read_frames(cap, limit=None):
+    """
+    Yields the frames of an opened video capture.
+
+    Args:
+        cap (cv2.VideoCapture): The video capture.
+        limit (int, optional): The maximum number of frames to read.
+
+    Yields:
+        np.ndarray: The next frame in BGR format.
+    """
+    count = 0
+    while cap.isOpened() and (limit is None or count < limit):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        count += 1
+        yield frame
+
+def interpolate_landmarks(start, end, t):
+    """
+    Interpolates the landmarks of a frame between two inferred frames. Body parts
+    detected in only one of them are taken from the nearer frame.
+
+    Args:
+        start (dict): Landmark arrays of the earlier inferred frame, or None if it had no pose.
+        end (dict): Landmark arrays of the later inferred frame, or None if it had no pose.
+        t (float): Position of the frame between the two, from 0 to 1.
+
+    Returns:
+        dict: Landmark arrays of the frame, or None if it has no pose.
+    """
+    if start is None or end is None:
+        return start if t < 0.5 else end
+
+    frame_landmarks = {}
+    for part, start_points in start.items():
+        end_points = end[part]
+        if is_detected(start_points) and is_detected(end_points):
+            start_points = start_points.astype(np.float32)
+            frame_landmarks[part] = start_points + (end_points.astype(np.float32) - start_points) * t
+        else:
+            frame_landmarks[part] = start_points if t < 0.5 else end_points
+    return frame_landmarks
+
+def measure_motion(start, end, frames):
+    """
+    Measures how far the pose and hands moved per frame between two inferred frames.
+
+    Args:
+        start (dict): Landmark arrays of the earlier inferred frame, or None.
+        end (dict): Landmark arrays of the later inferred frame, or None.
+        frames (int): The number of frames between the two.
+
+    Returns:
+        float: The mean landmark displacement per frame in normalized units, inf
+        if a body part appeared or disappeared, or None if nothing can be measured.
+    """
+    if start is None or end is None:
+        return None if start is end else float("inf")
+
+    displacements = []
+    for part in MOTION_PARTS:
+        start_detected, end_detected = is_detected(start[part]), is_detected(end[part])
+        if start_detected != end_detected:
+            return float("inf")
+        if start_detected:
+            delta = end[part][:, :2].astype(np.float32) - start[part][:, :2].astype(np.float32)
+            displacements.append(np.nanmean(np.linalg.norm(delta, axis=1)))
+    if not displacements:
+        return None
+    return float(np.mean(displacements)) / max(1, frames)
+
+def choose_frame_interval(motion, interval, min_interval=POSE_MIN_FRAME_INTERVAL, max_interval=POSE_MAX_FRAME_INTERVAL):
+    """
+    Picks the gap to the next inferred frame so that landmarks move about
+    POSE_MOTION_PER_INTERVAL between inferred frames: long during holds, short
+    during fast signing.
+
+    Args:
+        motion (float): The landmark displacement per frame, or None if unknown.
+        interval (int): The current gap between inferred frames.
+        min_interval (int, optional): The smallest gap.
+        max_interval (int, optional): The largest gap.
+
+    Returns:
+        int: The number of frames until the next inferred frame.
+    """
+    if motion is None or np.isnan(motion):
+        return max(min_interval, min(interval, max_interval))
+    if motion == 0:
+        return max_interval
+    return max(min_interval, min(int(POSE_MOTION_PER_INTERVAL / motion), max_interval))
+
+def interpolate_gap(start, end, frames):
+    """
+    Yields the interpolated landmarks of the skipped frames between two inferred frames.
+
+    Args:
+        start (dict): Landmark arrays of the earlier inferred frame, or None.
+        end (dict): Landmark arrays of the later inferred frame, or None.
+        frames (int): The number of skipped frames.
+
+    Yields:
+        dict: Landmark arrays of each skipped frame, or None.
+    """
+    for i in range(1, frames + 1):
+        yield interpolate_landmarks(start, end, i / (frames + 1))
+
+def track_landmarks(frames, detect, initial_interval=2, min_interval=POSE_MIN_FRAME_INTERVAL, max_interval=POSE_MAX_FRAME_INTERVAL):
+    """
+    Runs pose inference on a motion-dependent subset of frames and interpolates
+    the landmarks of the frames in between. The last frame is always inferred
+    so that the tail of the video is interpolated rather than frozen.
+
+    Args:
+        frames (iterable): The video frames, in order.
+        detect (callable): Returns the landmark arrays of a frame, or None if it has no pose.
+        initial_interval (int, optional): The gap between inferred frames until motion is measured.
+        min_interval (int, optional): The smallest gap between inferred frames.
+        max_interval (int, optional): The largest gap between inferred frames.
+
+    Yields:
+        dict: Landmark arrays of each frame, or None for frames without a pose.
+    """
+    interval = max(min_interval, min(initial_interval, max_interval))
+    previous = None
+    pending = 0
+    next_inferred = 0
+    last_frame = None
+
+    for index, frame in enumerate(frames):
+        if index < next_inferred:
+            pending += 1
+            last_frame = frame
+            continue
+
+        current = detect(frame)
+        yield from interpolate_gap(previous, current, pending)
+        yield current
+
+        if index > 0:
+            interval = choose_frame_interval(measure_motion(previous, current, pending + 1), interval, min_interval, max_interval)
+        previous = current
+        pending = 0
+        last_frame = None
+        next_inferred = index + interval
+
+    if pending:
+        current = detect(last_frame)
+        yield from interpolate_gap(previous, current, pending - 1)
+        yield current
@@ -0,0 +1,230 @@
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from app.services.sign_synthesis.pose_extraction import mediapipe_detection
+from app.services.sign_synthesis.skeleton_renderer import SkeletonRenderer, results_to_landmarks
+from app.services.sign_synthesis.landmark_tracking import read_frames, track_landmarks
+from app.services.sign_synthesis.holistic_pool import holistic_pool
+from app.services.sign_synthesis.clip_normalizer import get_normalized_clip
+from app.services.sign_synthesis.clip_trimming import get_active_span
+from app.services.utils.video_utils import get_video_duration
+from app.services.utils.tracing import count
+from app.config import POSE_WORKERS, POSE_MIN_SEGMENT_FRAMES
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+def warm_worker():
+    """Builds the Holistic instance of a worker process as soon as it starts."""
+    holistic_pool.fill(1)
+
+def _get_executor(workers):
+    """
+    Returns the shared pose worker pool, creating it on first use. Workers are
+    spawned rather than forked so that they do not inherit the server's threads.
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_worker
+            )
+            _executor_workers = workers
+        return _executor
+
+def start_workers(workers=POSE_WORKERS):
+    """
+    Starts the pose worker processes ahead of the first request, so that their
+    imports and Holistic graphs are ready when a video arrives.
+
+    Args:
+        workers (int, optional): The number of worker processes.
+    """
+    executor = _get_executor(workers)
+    for future in [executor.submit(time.sleep, 0.1) for _ in range(workers)]:
+        future.result()
+
+def get_clip_frame_counts(video_paths, fps):
+    """
+    Estimates how many frames each clip occupies in a merged video.
+
+    Args:
+        video_paths (list): The library clip paths, in playback order.
+        fps (float): The frame rate of the merged video.
+
+    Returns:
+        list: The number of frames of each clip, or None if a duration is unknown.
+    """
+    frame_counts = []
+    for video_path in video_paths:
+        normalized_path = get_normalized_clip(video_path)
+        span = None if normalized_path else get_active_span(video_path)
+        duration = span[1] - span[0] if span else get_video_duration(normalized_path or video_path)
+        if not duration:
+            return None
+        frame_counts.append(int(round(duration * fps)))
+    return frame_counts
+
+def plan_segments(total_frames, workers, clip_frame_counts=None, min_segment_frames=POSE_MIN_SEGMENT_FRAMES):
+    """
+    Splits a video into contiguous frame ranges of similar length, cutting at
+    clip boundaries when they are known so that tracking restarts with each sign.
+
+    Args:
+        total_frames (int): The number of frames in the video.
+        workers (int): The number of workers to split the video for.
+        clip_frame_counts (list, optional): The number of frames of each clip.
+        min_segment_frames (int, optional): The smallest segment worth a worker.
+
+    Returns:
+        list: List of (start_frame, end_frame) tuples covering the whole video.
+    """
+    segment_count = max(1, min(workers, total_frames // max(1, min_segment_frames)))
+    if segment_count == 1:
+        return [(0, total_frames)]
+
+    boundaries = [int(boundary) for boundary in np.cumsum(clip_frame_counts or [])[:-1] if 0 < boundary < total_frames]
+    if not boundaries:
+        boundaries = list(range(1, total_frames))
+
+    cuts = []
+    for i in range(1, segment_count):
+        target = total_frames * i / segment_count
+        cut = min(boundaries, key=lambda boundary: abs(boundary - target))
+        if not cuts or cut > cuts[-1]:
+            cuts.append(cut)
+
+    edges = [0] + cuts + [total_frames]
+    return [(start, end) for start, end in zip(edges, edges[1:]) if end > start]
+
+def seek_to_frame(cap, frame_index):
+    """
+    Positions a capture so that the next read returns the given frame.
+
+    Seeking in H.264 is only exact at keyframes, and the position the capture
+    reports after a seek is not reliable. So the frame before the target is
+    decoded and its timestamp checked against the one the target needs.
+
+    Args:
+        cap (cv2.VideoCapture): The opened capture.
+        frame_index (int): The frame the next read should return.
+
+    Returns:
+        bool: True if the capture is positioned exactly, False if the seek landed elsewhere.
+    """
+    if frame_index <= 0:
+        return True
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index - 1)
+    if not cap.grab():
+        return False
+    expected_ms = (frame_index - 1) * 1000 / fps
+    return abs(cap.get(cv2.CAP_PROP_POS_MSEC) - expected_ms) < 500 / fps
+
+def open_at_frame(video_path, frame_index):
+    """
+    Opens a video positioned at a frame, decoding forward from the start when
+    seeking is not exact.
+
+    Args:
+        video_path (str): The path to the video file.
+        frame_index (int): The frame the first read should return.
+
+    Returns:
+        cv2.VideoCapture: The positioned capture.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if seek_to_frame(cap, frame_index):
+        return cap
+    print(f"Inexact seek to frame {frame_index} of {video_path}, decoding from the start")
+    cap.release()
+    cap = cv2.VideoCapture(video_path)
+    for _ in range(frame_index):
+        if not cap.grab():
+            break
+    return cap
+
+def extract_segment_landmarks(video_path, start_frame, end_frame, process_every_nth_frame=2):
+    """
+    Runs MediaPipe Holistic over a frame range of a video in a worker process.
+
+    Args:
+        video_path (str): The path to the input video file.
+        start_frame (int): The first frame of the range.
+        end_frame (int): The frame after the last frame of the range.
+        process_every_nth_frame (int, optional): The interval at which frames are processed until motion is measured.
+
+    Returns:
+        list: The landmark arrays of each frame, or None for frames without a
+        pose. Skipped frames are interpolated between the surrounding processed frames.
+    """
+    cap = open_at_frame(video_path, start_frame)
+    try:
+        with holistic_pool.acquire() as holistic:
+            def detect(frame):
+                results = mediapipe_detection(frame, holistic)
+                return results_to_landmarks(results) if results.pose_landmarks else None
+
+            return list(track_landmarks(read_frames(cap, end_frame - start_frame), detect, initial_interval=process_every_nth_frame))
+    finally:
+        cap.release()
+
+def parallel_pose_extraction(video_path, output_path, video_paths=None, workers=POSE_WORKERS, process_every_nth_frame=2):
+    """
+    Extracts pose landmarks from a video with one Holistic instance per worker
+    process and writes the rendered skeleton frames in order.
+
+    Args:
+        video_path (str): The path to the input video file.
+        output_path (str): The path to the output video file.
+        video_paths (list, optional): The clips the video was merged from, used to
+            cut segments at clip boundaries.
+        workers (int, optional): The number of worker processes.
+        process_every_nth_frame (int, optional): The interval at which frames are processed.
+
+    Returns:
+        str: The path to the output video file.
+    """
+    start_time = time.perf_counter()
+    cap = cv2.VideoCapture(video_path)
+    frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    clip_frame_counts = get_clip_frame_counts(video_paths, fps) if video_paths else None
+    segments = plan_segments(total_frames, workers, clip_frame_counts)
+    executor = _get_executor(workers)
+    futures = [
+        executor.submit(extract_segment_landmarks, video_path, start, end, process_every_nth_frame)
+        for start, end in segments
+    ]
+
+    fourcc = cv2.VideoWriter_fourcc(*'avc1')
+    out = cv2.VideoWriter(output_path, fourcc, fps, (frame_width, frame_height))
+    renderer = SkeletonRenderer(frame_width, frame_height)
+    frames_written = 0
+    try:
+        for future in futures:
+            for frame_landmarks in future.result():
+                out.write(renderer.blank() if frame_landmarks is None else renderer.render(frame_landmarks))
+                frames_written += 1
+    finally:
+        out.release()
+
+    elapsed = time.perf_counter() - start_time
+    count("frames_processed", frames_written)
+    print(
+        f"Pose extraction processed {frames_written} frames in {elapsed:.2f}s "
+        f"({frames_written / elapsed if elapsed else 0:.1f} fps) across {len(segments)} segment(s)"
+    )
+    return output_path
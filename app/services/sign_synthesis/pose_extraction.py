@@ -1,18 +1,15 @@
+import time
 import cv2
 import mediapipe as mp
 import numpy as np
+from app.services.sign_synthesis.skeleton_renderer import mp_holistic, custom_pose_connections, SkeletonRenderer, results_to_landmarks
+from app.services.sign_synthesis.landmark_tracking import read_frames, track_landmarks
+from app.services.sign_synthesis.holistic_pool import holistic_pool
+from app.services.utils.tracing import count
 from app.config import DRAW_COLOR, MERGED_VIDEO_PATH, OUTPUT_VIDEO_PATH
 
-mp_holistic = mp.solutions.holistic
 mp_drawing = mp.solutions.drawing_utils
 
-IGNORED_POSE_LANDMARKS = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 17, 18, 19, 20, 21, 22]
-
-custom_pose_connections = [
-    connection for connection in mp_holistic.POSE_CONNECTIONS
-    if connection[0] not in IGNORED_POSE_LANDMARKS and connection[1] not in IGNORED_POSE_LANDMARKS
-]
-
 def mediapipe_detection(image, model):
     """
     Converts the image to RGB and processes it using the provided MediaPipe model.
@@ -91,16 +88,21 @@ def draw_wrist_connection(image, pose_wrist, hand_wrist):
 def pose_extraction(video_path=MERGED_VIDEO_PATH, output_path=OUTPUT_VIDEO_PATH, process_every_nth_frame=2):
     """
     Extracts pose landmarks from a video and saves the output to a new video file.
+    Inference runs on a motion-dependent subset of frames and the landmarks of
+    the skipped frames are interpolated.
 
     Args:
         video_path: The path to the input video file.
         output_path: The path to the output video file.
-        process_every_nth_frame: The interval at which frames are processed.
+        process_every_nth_frame: The interval at which frames are processed until motion is measured.
 
     Returns:
         The path to the output video file.
     """
-    with mp_holistic.Holistic(min_detection_confidence=0.5, min_tracking_confidence=0.5) as holistic:
+    start_time = time.perf_counter()
+    frame_count = 0
+    inferred_count = 0
+    with holistic_pool.acquire() as holistic:
         cap = cv2.VideoCapture(video_path)
         frame_width = int(cap.get(3))
         frame_height = int(cap.get(4))
@@ -109,28 +111,17 @@ def pose_extraction(video_path=MERGED_VIDEO_PATH, output_path=OUTPUT_VIDEO_PATH,
             fps = 30
         fourcc = cv2.VideoWriter_fourcc(*'avc1')
         out = cv2.VideoWriter(output_path, fourcc, fps, (frame_width, frame_height))
+        renderer = SkeletonRenderer(frame_width, frame_height)
+
+        def detect(frame):
+            nonlocal inferred_count
+            inferred_count += 1
+            results = mediapipe_detection(frame, holistic)
+            return results_to_landmarks(results) if results.pose_landmarks else None
 
         try:
-            frame_count = 0
-            prev_mask = None
-
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                if frame_count % process_every_nth_frame == 0:
-                    results = mediapipe_detection(frame, holistic)
-                    if results.pose_landmarks:
-                        mask = draw_styled_landmarks(frame, results)
-                        prev_mask = mask
-                    else:
-                       prev_mask = np.zeros_like(frame)
-
-                if prev_mask is not None:
-                    out.write(prev_mask)
-                else:
-                     out.write(np.zeros_like(frame))
+            for frame_landmarks in track_landmarks(read_frames(cap), detect, initial_interval=process_every_nth_frame):
+                out.write(renderer.blank() if frame_landmarks is None else renderer.render(frame_landmarks))
                 frame_count += 1
 
         except Exception as e:
@@ -140,4 +131,11 @@ def pose_extraction(video_path=MERGED_VIDEO_PATH, output_path=OUTPUT_VIDEO_PATH,
             out.release()
             cv2.destroyAllWindows()
 
+    elapsed = time.perf_counter() - start_time
+    count("frames_processed", frame_count)
+    count("frames_inferred", inferred_count)
+    print(
+        f"Pose extraction processed {frame_count} frames ({inferred_count} inferred) in {elapsed:.2f}s "
+        f"({frame_count / elapsed if elapsed else 0:.1f} fps)"
+    )
     return output_path
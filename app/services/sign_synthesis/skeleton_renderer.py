@@ -0,0 +1,172 @@
+import cv2
+import mediapipe as mp
+import numpy as np
+from app.config import DRAW_COLOR
+
+mp_holistic = mp.solutions.holistic
+
+IGNORED_POSE_LANDMARKS = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 17, 18, 19, 20, 21, 22]
+
+custom_pose_connections = [
+    connection for connection in mp_holistic.POSE_CONNECTIONS
+    if connection[0] not in IGNORED_POSE_LANDMARKS and connection[1] not in IGNORED_POSE_LANDMARKS
+]
+
+FACE_LANDMARK_COUNT = 468
+POSE_LANDMARK_COUNT = 33
+HAND_LANDMARK_COUNT = 21
+VISIBILITY_THRESHOLD = 0.5
+
+LANDMARK_CONNECTIONS = {
+    "face": list(mp_holistic.FACEMESH_CONTOURS),
+    "pose": custom_pose_connections,
+    "left_hand": list(mp_holistic.HAND_CONNECTIONS),
+    "right_hand": list(mp_holistic.HAND_CONNECTIONS)
+}
+
+WRIST_CONNECTIONS = [
+    ("left_hand", int(mp_holistic.PoseLandmark.LEFT_WRIST)),
+    ("right_hand", int(mp_holistic.PoseLandmark.RIGHT_WRIST))
+]
+HAND_WRIST = int(mp_holistic.HandLandmark.WRIST)
+
+def landmarks_to_array(landmark_list, count, with_visibility=False):
+    """
+    Converts a MediaPipe landmark list to an array of normalized coordinates.
+
+    Args:
+        landmark_list: The MediaPipe landmark list, or None if nothing was detected.
+        count (int): The number of landmarks expected.
+        with_visibility (bool, optional): Whether to keep the visibility score.
+
+    Returns:
+        np.ndarray: Array of shape (count, 2) or (count, 3), NaN where missing.
+    """
+    width = 3 if with_visibility else 2
+    array = np.full((count, width), np.nan, dtype=np.float32)
+    if landmark_list:
+        landmarks = landmark_list.landmark[:count]
+        if with_visibility:
+            array[:len(landmarks)] = [(lm.x, lm.y, lm.visibility) for lm in landmarks]
+        else:
+            array[:len(landmarks)] = [(lm.x, lm.y) for lm in landmarks]
+    return array
+
+def results_to_landmarks(results):
+    """
+    Converts the MediaPipe Holistic results of one frame to landmark arrays.
+
+    Args:
+        results: The results from the MediaPipe model.
+
+    Returns:
+        dict: Landmark arrays of the frame per body part.
+    """
+    return {
+        "face": landmarks_to_array(results.face_landmarks, FACE_LANDMARK_COUNT),
+        "pose": landmarks_to_array(results.pose_landmarks, POSE_LANDMARK_COUNT, with_visibility=True),
+        "left_hand": landmarks_to_array(results.left_hand_landmarks, HAND_LANDMARK_COUNT),
+        "right_hand": landmarks_to_array(results.right_hand_landmarks, HAND_LANDMARK_COUNT)
+    }
+
+def is_detected(points):
+    """
+    Checks whether a body part was detected in a frame.
+
+    Args:
+        points (np.ndarray): The landmark array of the body part in one frame.
+
+    Returns:
+        bool: True if the landmarks hold coordinates rather than NaN.
+    """
+    return not np.isnan(points[:, 0].astype(np.float32)).all()
+
+class SkeletonRenderer:
+    """
+    Draws skeleton frames from landmark arrays.
+
+    All connections of a frame are drawn with a single cv2.polylines call, and
+    frames are drawn into a small ring of preallocated buffers instead of newly
+    allocated images. A returned frame stays valid until buffer_count more frames
+    have been rendered, which leaves room for holding on to the previous frame.
+    """
+
+    def __init__(self, width, height, buffer_count=3, color=DRAW_COLOR, thickness=2):
+        """
+        Args:
+            width (int): The frame width.
+            height (int): The frame height.
+            buffer_count (int, optional): The number of preallocated frame buffers.
+            color (tuple, optional): The drawing color.
+            thickness (int, optional): The line thickness.
+        """
+        self.width = width
+        self.height = height
+        self.color = color
+        self.thickness = thickness
+        self._buffers = [np.zeros((height, width, 3), dtype=np.uint8) for _ in range(buffer_count)]
+        self._blank = np.zeros((height, width, 3), dtype=np.uint8)
+        self._next_buffer = 0
+        self._scale = np.array([width, height], dtype=np.float32)
+        self._max_pixel = np.array([width - 1, height - 1], dtype=np.int32)
+        self._connections = {
+            part: np.array(connections, dtype=np.intp).reshape(-1, 2)
+            for part, connections in LANDMARK_CONNECTIONS.items()
+        }
+
+    def blank(self):
+        """Returns an empty frame. It is shared and must not be drawn on."""
+        return self._blank
+
+    def _to_pixels(self, points, with_visibility):
+        """Converts normalized landmarks to clamped pixel coordinates and a drawable mask."""
+        xy = points[:, :2].astype(np.float32)
+        valid = np.all((xy >= 0) & (xy <= 1), axis=1)
+        if with_visibility:
+            valid &= points[:, 2].astype(np.float32) >= VISIBILITY_THRESHOLD
+        pixels = np.minimum(np.nan_to_num(xy * self._scale).astype(np.int32), self._max_pixel)
+        return pixels, valid
+
+    def render(self, frame_landmarks):
+        """
+        Draws the landmarks of one frame.
+
+        Args:
+            frame_landmarks (dict): Landmark arrays of one frame per body part.
+
+        Returns:
+            np.ndarray: The rendered frame.
+        """
+        frame = self._buffers[self._next_buffer]
+        self._next_buffer = (self._next_buffer + 1) % len(self._buffers)
+        frame.fill(0)
+
+        segments = []
+        part_pixels = {}
+        for part, connections in self._connections.items():
+            pixels, valid = self._to_pixels(frame_landmarks[part], with_visibility=(part == "pose"))
+            part_pixels[part] = pixels
+            drawable = valid[connections[:, 0]] & valid[connections[:, 1]]
+            if drawable.any():
+                segments.append(pixels[connections[drawable]])
+
+        if is_detected(frame_landmarks["pose"]):
+            for hand, pose_wrist in WRIST_CONNECTIONS:
+                if is_detected(frame_landmarks[hand]):
+                    segments.append(np.stack([part_pixels["pose"][pose_wrist], part_pixels[hand][HAND_WRIST]])[np.newaxis])
+
+        if segments:
+            cv2.polylines(frame, list(np.concatenate(segments)), False, self.color, thickness=self.thickness)
+        return frame
+
+    def render_results(self, results):
+        """
+        Draws the MediaPipe Holistic results of one frame.
+
+        Args:
+            results: The results from the MediaPipe model.
+
+        Returns:
+            np.ndarray: The rendered frame.
+        """
+        return self.render(results_to_landmarks(results))
@@ -0,0 +1,71 @@
+from app.services.sign_synthesis.pose_extraction import pose_extraction
+from app.services.sign_synthesis.landmark_cache import render_cached_skeleton, has_clip_landmarks
+from app.services.sign_synthesis.parallel_pose_extraction import parallel_pose_extraction
+from app.services.sign_synthesis.clip_trimming import get_active_span
+from app.services.utils.tracing import span, count
+from app.services.utils.video_cache import get_cache_key, fetch_cached_video, store_cached_video
+from app.config import DRAW_COLOR, NORMALIZED_VIDEO_FPS, NORMALIZED_VIDEO_SIZE, POSE_WORKERS
+
+POSE_VIDEO_SETTINGS = {
+    "draw_color": DRAW_COLOR,
+    "fps": NORMALIZED_VIDEO_FPS,
+    "size": NORMALIZED_VIDEO_SIZE
+}
+
+def extract_pose(video_paths, merged_video_path, output_path):
+    """
+    Runs pose extraction on the merged video, in parallel when worker processes
+    are configured.
+
+    Args:
+        video_paths (list): The library clip paths, in playback order, or None if unknown.
+        merged_video_path (str): The path of the merged video.
+        output_path (str): The path of the output video file.
+
+    Returns:
+        str: The path to the output video file.
+    """
+    if POSE_WORKERS > 1:
+        return parallel_pose_extraction(merged_video_path, output_path, video_paths=video_paths, workers=POSE_WORKERS)
+    return pose_extraction(video_path=merged_video_path, output_path=output_path)
+
+def render_skeleton_video(video_paths, merged_video_path, output_path, preloaded_landmarks=None):
+    """
+    Produces the skeleton video of a clip sequence, serving it from the video
+    cache when possible, then rendering from cached landmarks, and only running
+    pose extraction on the merged video as a last resort.
+
+    Args:
+        video_paths (list): The library clip paths, in playback order, or None if unknown.
+        merged_video_path (str): The path of the merged video.
+        output_path (str): The path of the output video file.
+        preloaded_landmarks (dict, optional): Clip landmarks already loaded from
+            the landmark cache, keyed by clip path.
+
+    Returns:
+        str: The path to the output video file.
+    """
+    with span("pose"):
+        if not video_paths:
+            return extract_pose(None, merged_video_path, output_path)
+
+        # Videos rendered from cached landmarks and by live inference differ in
+        # size, frame rate and interpolation, so they are cached under separate keys
+        source = "landmarks" if all(has_clip_landmarks(path) for path in video_paths) else "inference"
+        cache_key = get_cache_key("pose", video_paths, {
+            **POSE_VIDEO_SETTINGS,
+            "spans": [get_active_span(path) for path in video_paths],
+            "source": source
+        })
+        if fetch_cached_video(cache_key, output_path):
+            count("video_cache_hits")
+            print("Pose video served from cache")
+            return output_path
+
+        rendered_source = "landmarks"
+        if not render_cached_skeleton(video_paths, output_path, preloaded=preloaded_landmarks):
+            rendered_source = "inference"
+            extract_pose(video_paths, merged_video_path, output_path)
+        if rendered_source == source:
+            store_cached_video(cache_key, output_path)
+        return output_path
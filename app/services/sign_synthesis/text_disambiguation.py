@@ -1,6 +1,34 @@
 import re
+import ast
+import json
 from app.services.utils.llm_query import query_llm
 
+def parse_named_entities_response(raw_response):
+    """
+    Parses the JSON list returned by the named entity prompt. The response is
+    never evaluated, since the prompt includes user text.
+
+    Args:
+        raw_response (str): The raw LLM response.
+
+    Returns:
+        list: The proper noun words, or an empty list if the response is not a
+        list of strings.
+    """
+    match = re.search(r'\[.*\]', raw_response or "", re.DOTALL)
+    if not match:
+        return []
+    try:
+        parsed = json.loads(match.group(0))
+    except ValueError:
+        try:
+            parsed = ast.literal_eval(match.group(0))  # Python-style list with single quotes
+        except (ValueError, SyntaxError):
+            return []
+    if not isinstance(parsed, list):
+        return []
+    return [word for word in parsed if isinstance(word, str)]
+
 def query_named_entities(asl_gloss, original_sentence):
     """
     Analyze the ASL gloss sentence with reference to the original English sentence to classify each word.
@@ -36,8 +64,8 @@ def query_named_entities(asl_gloss, original_sentence):
             }
         ]
 
-        raw_response = query_llm(messages, max_tokens=50)
-        return eval(raw_response)  # Convert stringified list to actual list
+        raw_response = query_llm(messages, max_tokens=50, cache_site="named_entities")
+        return parse_named_entities_response(raw_response)
     except Exception as e:
         print(f"Error querying Qwen LLM for named entities: {e}")
         return []
@@ -77,8 +105,86 @@ def query_wsd(word, sentence, meanings):
             }
         ]
 
-        raw_response = query_llm(messages, max_tokens=10)
+        raw_response = query_llm(messages, max_tokens=10, cache_site="wsd")
         return re.sub(r'[^\w\s]', '', raw_response)  # Remove punctuation
     except Exception as e:
         print(f"Error querying Qwen LLM for WSD: {e}")
-        return ""
\ No newline at end of file
+        return ""
+
+def parse_wsd_batch_response(raw_response, word_meanings):
+    """
+    Parses the JSON mapping returned by the batched WSD prompt.
+
+    Args:
+        raw_response (str): The raw LLM response.
+        word_meanings (dict): Mapping of each ambiguous word to its list of meanings.
+
+    Returns:
+        dict: Mapping of each word to the 0-based index of its selected meaning.
+        Words missing from the response or with invalid values map to 0.
+    """
+    selections = {word: 0 for word in word_meanings}
+    match = re.search(r'\{.*\}', raw_response or "", re.DOTALL)
+    if not match:
+        return selections
+
+    try:
+        parsed = json.loads(match.group(0))
+    except ValueError:
+        return selections
+    if not isinstance(parsed, dict):
+        return selections
+
+    normalized = {str(key).lower().strip(): value for key, value in parsed.items()}
+    for word, meanings in word_meanings.items():
+        try:
+            selected_index = int(normalized.get(word.lower())) - 1
+        except (TypeError, ValueError):
+            continue
+        selections[word] = max(0, min(selected_index, len(meanings) - 1))
+    return selections
+
+def query_wsd_batch(sentence, word_meanings):
+    """
+    Identifies the most appropriate meaning of every ambiguous word of a sentence
+    in a single LLM call.
+
+    Args:
+        sentence (str): The sentence providing context.
+        word_meanings (dict): Mapping of each ambiguous word to its list of meanings.
+
+    Returns:
+        dict: Mapping of each word to the 0-based index of its selected meaning.
+    """
+    if not word_meanings:
+        return {}
+
+    try:
+        word_sections = [
+            f"Word: \"{word}\"\n"
+            f"Meanings:\n"
+            f"{chr(10).join([f'{i + 1}. {meaning}' for i, meaning in enumerate(meanings)])}"
+            for word, meanings in word_meanings.items()
+        ]
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    "You are an assistant for word sense disambiguation tasks.\n\n"
+                    "Instructions:\n"
+                    "Based on the context provided in the sentence, identify which meaning of each word is most appropriate.\n"
+                    "Return only a JSON object mapping each word to the number corresponding to its correct meaning.\n\n"
+                    "Example Output:\n{\"bank\": 2, \"light\": 1}"
+                )
+            },
+            {
+                "role": "user",
+                "content": f"Sentence: \"{sentence}\"\n\n" + "\n\n".join(word_sections)
+            }
+        ]
+
+        raw_response = query_llm(messages, max_tokens=10 * len(word_meanings) + 10, cache_site="wsd")
+        return parse_wsd_batch_response(raw_response, word_meanings)
+    except Exception as e:
+        print(f"Error querying Qwen LLM for batched WSD: {e}")
+        return {word: 0 for word in word_meanings}
\ No newline at end of file
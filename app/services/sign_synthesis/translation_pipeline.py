@@ -0,0 +1,338 @@
+import os
+import re
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+from app.services.translation.multilingual_translator import to_english
+from app.services.translation.asl_converter import stream_asl
+from app.services.translation.fused_annotator import annotate_sentence
+from app.services.sign_synthesis.text_disambiguation import query_named_entities, query_wsd_batch
+from app.services.sign_synthesis.video_matcher import (
+    resolve_display_data, split_gloss_word, collect_ambiguous_words, resolve_video_path,
+    merge_cached_video, get_playlist_entry
+)
+from app.services.sign_synthesis.clip_normalizer import get_normalized_clip
+from app.services.sign_synthesis.clip_trimming import get_active_span
+from app.services.sign_synthesis.landmark_cache import load_clip_landmarks
+from app.services.sign_synthesis.skeleton_video import render_skeleton_video
+from app.services.utils.lexicon_index import lookup_document
+from app.services.utils.job_workspace import (
+    create_job, remove_job, use_job, get_merged_video_path, get_output_video_path, save_job_clips
+)
+from app.services.utils.tracing import count
+from app.config import MAX_TOKENS, FUSED_TRANSLATION, PIPELINE_WORKERS, LLM_MAX_CONCURRENCY
+
+_executor = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="pipeline")
+# LLM calls get their own threads so they never queue behind clip prefetches.
+# The gateway admits no more requests than this at once anyway.
+_llm_executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="pipeline-llm")
+
+def submit(function, *args, executor=_executor):
+    """
+    Runs a function on the pipeline threads, attributing its spans and counts
+    to the trace of the caller.
+
+    Args:
+        function (callable): The function to run.
+        *args: Arguments of the function.
+        executor (ThreadPoolExecutor, optional): The threads to run it on.
+
+    Returns:
+        Future: The future of the result.
+    """
+    return executor.submit(contextvars.copy_context().run, function, *args)
+
+def read_ahead(path):
+    """Asks the OS to start reading a file into the page cache, where supported."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+def prefetch_clip(video_path):
+    """
+    Prepares what merging and rendering will read of a library clip: its active
+    span, the file the merge reads and its decoded landmarks.
+
+    Args:
+        video_path (str): The path of the library clip.
+
+    Returns:
+        dict: The landmarks returned by load_clip_landmarks, or None if the clip
+        is missing or its landmarks are not cached.
+    """
+    if not os.path.exists(video_path):
+        return None
+    get_active_span(video_path)
+    read_ahead(get_normalized_clip(video_path) or video_path)
+    landmarks = load_clip_landmarks(video_path)
+    count("clips_prefetched")
+    return landmarks
+
+def get_candidate_clips(collection, word):
+    """
+    Lists the clips a gloss word may resolve to before named entity recognition
+    and disambiguation are done: the video of every definition of the word, or
+    the letters it is fingerspelled with when it is not in the lexicon.
+
+    Args:
+        collection: The lexicon index or MongoDB collection to fetch data from.
+        word (str): The normalized gloss word.
+
+    Returns:
+        list: The candidate clip paths.
+    """
+    video_paths = []
+    for w in split_gloss_word(collection, word):
+        document = lookup_document(collection, w)
+        if document:
+            definitions = document.get("definitions", [])
+        else:
+            letters = [lookup_document(collection, char) for char in w]
+            definitions = [letter["definitions"][0] for letter in letters if letter and letter.get("definitions")]
+        video_paths.extend(path for path in map(resolve_video_path, definitions) if path)
+    return video_paths
+
+class ClipPrefetcher:
+    """
+    Prefetches the candidate clips of gloss words on the pipeline threads as the
+    words become known, so that their landmarks are decoded by the time the
+    final clip order is.
+    """
+
+    def __init__(self, collection):
+        """
+        Args:
+            collection: The lexicon index or MongoDB collection to fetch data from.
+        """
+        self.collection = collection
+        self._words = set()
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def add_word(self, word):
+        """Starts prefetching the candidate clips of a gloss word."""
+        word = word.lower().strip()
+        with self._lock:
+            if not word or word in self._words:
+                return
+            self._words.add(word)
+        for video_path in get_candidate_clips(self.collection, word):
+            with self._lock:
+                if video_path not in self._futures:
+                    self._futures[video_path] = submit(prefetch_clip, video_path)
+
+    def get_landmarks(self, video_paths):
+        """
+        Waits for the prefetch of the given clips.
+
+        Args:
+            video_paths (list): The clip paths.
+
+        Returns:
+            dict: The decoded landmarks, keyed by clip path, of the clips whose
+            landmarks are cached.
+        """
+        landmarks = {}
+        for video_path in video_paths:
+            with self._lock:
+                future = self._futures.get(video_path)
+            if future is None:
+                continue
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Prefetch failed for {video_path}: {e}")
+                continue
+            if result is not None:
+                landmarks[video_path] = result
+        return landmarks
+
+def stream_gloss(english_text, collection, prefetcher, fused=FUSED_TRANSLATION):
+    """
+    Generates the ASL gloss, yielding it as it grows and prefetching the clips of
+    each gloss word as soon as it is complete.
+
+    Args:
+        english_text (str): The English sentence.
+        collection: The lexicon index or MongoDB collection to fetch data from.
+        prefetcher (ClipPrefetcher): Prefetches the clips of the gloss words.
+        fused (bool, optional): Generate the gloss together with its annotation.
+
+    Yields:
+        str: The gloss generated so far.
+
+    Returns:
+        tuple: The gloss and its annotation, or None as the annotation when the
+        gloss was generated without one.
+    """
+    if fused:
+        result = annotate_sentence(english_text, collection)
+        if result:
+            for word in result["asl_translation"].split():
+                prefetcher.add_word(word)
+            yield result["asl_translation"]
+            return result["asl_translation"], result["annotation"]
+
+    asl_translation = ""
+    for words, partial_gloss in stream_asl(english_text):
+        for word in words:
+            prefetcher.add_word(word)
+        asl_translation = partial_gloss
+        yield partial_gloss
+    return asl_translation, None
+
+def is_capitalized_name(word, sentence):
+    """
+    Checks whether a word only appears capitalized in a sentence, and never at
+    the start of a sentence, as names do.
+
+    Args:
+        word (str): The gloss word.
+        sentence (str): The English sentence.
+
+    Returns:
+        bool: True if the word looks like a name.
+    """
+    occurrences = [
+        match for match in re.finditer(r"[A-Za-z][\w'-]*", sentence)
+        if match.group(0).lower() == word.lower()
+    ]
+    if not occurrences:
+        return False
+    for match in occurrences:
+        preceding = sentence[:match.start()].rstrip()
+        if not match.group(0)[0].isupper() or not preceding or preceding[-1] in ".!?":
+            return False
+    return True
+
+def annotate_gloss(asl_translation, context, collection, annotation=None):
+    """
+    Finds the named entities and word senses of a gloss. Named entity recognition
+    and disambiguation run side by side. Words capitalized like names in the
+    English sentence are left out of the disambiguation; if NER does not confirm
+    them as names, resolve_display_data disambiguates them afterwards.
+
+    Args:
+        asl_translation (str): The ASL gloss.
+        context (str): The English sentence.
+        collection: The lexicon index or MongoDB collection to fetch data from.
+        annotation (dict, optional): The annotation generated with the gloss,
+            which is returned as it is.
+
+    Returns:
+        dict: The "named_entities" and "senses" to hand to resolve_display_data.
+    """
+    if annotation:
+        return annotation
+
+    words = [word.lower().strip() for word in asl_translation.split()]
+    ambiguous_words = {
+        word: meanings for word, meanings in collect_ambiguous_words(collection, words, context).items()
+        if not is_capitalized_name(word, context)
+    }
+    wsd_future = submit(query_wsd_batch, context, ambiguous_words, executor=_llm_executor) if ambiguous_words else None
+    named_entities = [pn.lower().strip() for pn in query_named_entities(asl_translation, context)]
+    return {"named_entities": named_entities, "senses": wsd_future.result() if wsd_future else {}}
+
+def render_translation(video_paths, prefetcher):
+    """
+    Merges a clip sequence into a new job and renders its skeleton video. When
+    the landmarks of every clip are cached, the skeleton is rendered while the
+    clips are merged, since it is then drawn without the merged video.
+
+    Args:
+        video_paths (list): The library clip paths, in playback order.
+        prefetcher (ClipPrefetcher): Holds the prefetched landmarks of the clips.
+
+    Returns:
+        dict: The "job_id" and the "output_path" of the skeleton video.
+    """
+    job_id = create_job()
+    merged_path = get_merged_video_path(job_id)
+    output_path = get_output_video_path(job_id)
+    try:
+        with use_job(job_id):
+            landmarks = prefetcher.get_landmarks(video_paths)
+            pose_future = None
+            if all(path in landmarks for path in video_paths):
+                pose_future = submit(render_skeleton_video, video_paths, merged_path, output_path, landmarks)
+            try:
+                merge_cached_video(video_paths, merged_path)
+                save_job_clips(job_id, video_paths)
+            finally:
+                if pose_future:
+                    wait([pose_future])
+
+            if pose_future:
+                pose_future.result()
+            else:
+                render_skeleton_video(video_paths, merged_path, output_path, landmarks)
+    except Exception:
+        remove_job(job_id)
+        raise
+    print(f"Translation render complete for job {job_id}")
+    return {"job_id": job_id, "output_path": output_path}
+
+def stream_translation(input_text, collection, prefetcher, mode="merged", fused=FUSED_TRANSLATION):
+    """
+    Translates a text up to the clips to sign it with, yielding each stage as it
+    completes. Stages that do not depend on each other overlap:
+
+    - the clips of gloss words are looked up and their landmarks decoded while
+      the rest of the gloss is generated
+    - named entity recognition and disambiguation run side by side
+
+    Rendering is left to the caller, which can hand the clips and the prefetcher
+    to render_translation on a background worker.
+
+    Args:
+        input_text (str): The text to translate, in any language.
+        collection: The lexicon index or MongoDB collection to fetch data from.
+        prefetcher (ClipPrefetcher): Prefetches the clips of the gloss words.
+        mode (str, optional): "merged" for a server-rendered video, "playlist"
+            to play the clips in the browser.
+        fused (bool, optional): Generate the gloss, named entities and word
+            senses in one LLM call.
+
+    Yields:
+        tuple: The event name and its data: "english" with the "english_text",
+        "gloss" with the partial "gloss", and last "done" with the
+        "english_text", "asl_translation", "mode" and "video_ready", plus the
+        "clips" in playlist mode or the "video_paths" to render in merged mode.
+
+    Raises:
+        ValueError: If the text cannot be translated or is too long.
+    """
+    english_text = to_english(input_text)["english_text"]
+    if not english_text:
+        raise ValueError("Failed to translate the input to English")
+    if len(english_text.split()) > MAX_TOKENS:
+        raise ValueError(f"Input too long! Please limit to {MAX_TOKENS} words.")
+    yield "english", {"english_text": english_text}
+
+    gloss = stream_gloss(english_text, collection, prefetcher, fused)
+    while True:
+        try:
+            yield "gloss", {"gloss": next(gloss)}
+        except StopIteration as stop:
+            asl_translation, annotation = stop.value
+            break
+    if not asl_translation:
+        raise ValueError("Failed to generate ASL gloss")
+    print(f'ASL Gloss generated: {asl_translation}')
+
+    annotation = annotate_gloss(asl_translation, english_text, collection, annotation)
+    display_data = resolve_display_data(asl_translation, context=english_text, collection=collection, annotation=annotation)
+    result = {"english_text": english_text, "asl_translation": asl_translation, "mode": mode, "video_ready": bool(display_data)}
+    if display_data and mode == "playlist":
+        result["clips"] = [get_playlist_entry(label, path) for label, path in display_data]
+    elif display_data:
+        result["video_paths"] = [path for _, path in display_data]
+    yield "done", result
@@ -1,26 +1,114 @@
 import os
 from moviepy import VideoFileClip, concatenate_videoclips
 from app.services.sign_synthesis.text_disambiguation import *
-from app.services.utils.mongo_utils import fetch_document
-from app.services.utils.video_utils import construct_video_path
+from app.services.sign_synthesis.clip_normalizer import (
+    NORMALIZATION_PROFILE, profile_matches, get_normalized_clip, normalize_clip, concat_normalized_clips
+)
+from app.services.sign_synthesis.clip_trimming import get_active_span
+from app.services.utils.lexicon_index import lookup_document
+from app.services.utils.tracing import span, count
+from app.services.utils.video_cache import get_cache_key, fetch_cached_video, store_cached_video
+from app.services.utils.video_utils import construct_video_path, video_path_to_url, get_video_duration
 from app.config import TEMP_VIDEO_PATH, MERGED_VIDEO_PATH
 
-def merge_video_files(video_paths):
+MERGE_SETTINGS = {
+    "target_resolution": (480, 360),
+    "codec": "libx264",
+    "audio_codec": "aac",
+    "preset": "medium",
+    "fps": 30
+}
+
+def merge_video_files(video_paths, output_path=MERGED_VIDEO_PATH):
     """
     Merges multiple video files into a single video file.
+
+    Clips without an up-to-date normalized copy are normalized on their own
+    first, then all copies are joined without re-encoding. The whole sequence
+    is re-encoded with moviepy only when no normalized library exists or
+    ffmpeg fails. Either way only the active span of each clip is kept.
     
     Args:
         video_paths (list): List of file paths to the video files to be merged.
+        output_path (str, optional): The path to write the merged video to.
+
+    Returns:
+        str: "stream_copy" or "reencode", the way the video was produced.
     """
-    clips = [VideoFileClip(path, target_resolution=(480,360)) for path in video_paths]
+    with span("merge"):
+        count("clips_merged", len(video_paths))
+        if video_paths and profile_matches():
+            try:
+                concat_normalized_clips(get_normalized_clips(video_paths), output_path)
+                return "stream_copy"
+            except Exception as e:
+                print(f"Stream-copy merge failed, re-encoding instead: {e}")
+
+        count("merge_reencodes")
+        reencode_video_files(video_paths, output_path)
+        return "reencode"
+
+def get_normalized_clips(video_paths):
+    """
+    Returns the normalized copy of every clip, normalizing the clips that have
+    no up-to-date copy yet.
+
+    Args:
+        video_paths (list): The library clip paths, in playback order.
+
+    Returns:
+        list: The normalized clip paths, in playback order.
+    """
+    normalized = {}
+    for path in video_paths:
+        if path not in normalized:
+            normalized[path] = get_normalized_clip(path)
+            if normalized[path] is None:
+                count("clips_normalized")
+                normalized[path] = normalize_clip(path)
+    return [normalized[path] for path in video_paths]
+
+def reencode_video_files(video_paths, output_path):
+    """
+    Merges multiple video files by decoding and re-encoding them with moviepy.
+    
+    Args:
+        video_paths (list): List of file paths to the video files to be merged.
+        output_path (str): The path to write the merged video to.
+    """
+    clips = []
+    for path in video_paths:
+        clip = VideoFileClip(path, target_resolution=MERGE_SETTINGS["target_resolution"])
+        span = get_active_span(path)
+        clips.append(clip.subclipped(*span) if span else clip)
     final_clip = concatenate_videoclips(clips, method="compose")
-    os.makedirs(TEMP_VIDEO_PATH, exist_ok=True)
-    final_clip.write_videofile(MERGED_VIDEO_PATH, codec='libx264', audio_codec='aac', preset='medium', fps=30, logger=None)
+    os.makedirs(os.path.dirname(output_path) or TEMP_VIDEO_PATH, exist_ok=True)
+    final_clip.write_videofile(
+        output_path,
+        codec=MERGE_SETTINGS["codec"],
+        audio_codec=MERGE_SETTINGS["audio_codec"],
+        preset=MERGE_SETTINGS["preset"],
+        fps=MERGE_SETTINGS["fps"],
+        logger=None
+    )
     for clip in clips:
         clip.close()
     final_clip.close()
 
-def handle_definitions(definitions, word, context):
+def resolve_video_path(definition):
+    """
+    Returns the local video path of a definition, using the path resolved by the
+    lexicon index when available.
+    
+    Args:
+        definition (dict): The definition containing the video URL.
+        
+    Returns:
+        str: The file path of the video, or None if the definition has no video.
+    """
+    return definition.get("video_path") or construct_video_path(definition.get("video_url"))
+
+def handle_definitions(definitions, word, context, selected_index=None):
     """
     Handles multiple definitions of a word and returns the video mapping.
     
@@ -28,25 +116,27 @@ def handle_definitions(definitions, word, context):
         definitions (list): List of definitions for the word.
         word (str): The word being processed.
         context (str): The context in which the word is used.
+        selected_index (int, optional): The definition already chosen by batched
+            disambiguation. When omitted, an ambiguous word is disambiguated on its own.
         
     Returns:
         list: List of tuples containing the word and its corresponding video path.
     """
     word_video_map = []
     if len(definitions) > 1 and context:
-        print(f'Handling ambiguity for "{word}"')
-        meanings = [d.get("meaning") for d in definitions]
-        response = query_wsd(word, context, meanings)
+        if selected_index is None:
+            print(f'Handling ambiguity for "{word}"')
+            meanings = [d.get("meaning") for d in definitions]
+            response = query_wsd(word, context, meanings)
+            selected_index = parse_llm_response(response, len(definitions))
 
-        selected_index = parse_llm_response(response, len(definitions))
-        video_url = definitions[selected_index].get("video_url")
-        video_path = construct_video_path(video_url)
+        selected_index = max(0, min(selected_index, len(definitions) - 1))
+        video_path = resolve_video_path(definitions[selected_index])
         if video_path and os.path.exists(video_path):
             word_video_map.append((word, video_path))
     else:
         for definition in definitions:
-            video_url = definition.get("video_url")
-            video_path = construct_video_path(video_url)
+            video_path = resolve_video_path(definition)
             if video_path and os.path.exists(video_path):
                 word_video_map.append((word, video_path))
                 break
@@ -74,7 +164,7 @@ def fingerspell_word(collection, word):
     Generates a video mapping for fingerspelling a word.
     
     Args:
-        collection: The MongoDB collection to fetch data from.
+        collection: The lexicon index or MongoDB collection to fetch data from.
         word (str): The word to be fingerspelled.
         
     Returns:
@@ -82,25 +172,24 @@ def fingerspell_word(collection, word):
     """
     word_video_map = []
     for char in word:
-        char_doc = fetch_document(collection, char)
+        char_doc = lookup_document(collection, char)
         if char_doc and char_doc.get("definitions"):
-            video_url = char_doc["definitions"][0].get("video_url")
-            if video_url:
-                video_path = construct_video_path(video_url)
+            video_path = resolve_video_path(char_doc["definitions"][0])
+            if video_path:
                 word_video_map.append((char, video_path))
     return word_video_map
 
-def get_word_video_mapping(collection, word, context=None):
+def split_gloss_word(collection, word):
     """
-    Retrieves the video mapping for a given word.
+    Splits a gloss word into the lexicon words it is signed with, separating
+    question marks and breaking up hyphenated words that are not in the lexicon.
     
     Args:
-        collection: The MongoDB collection to fetch data from.
-        word (str): The word to be mapped to a video.
-        context (str, optional): The context in which the word is used.
+        collection: The lexicon index or MongoDB collection to fetch data from.
+        word (str): The gloss word.
         
     Returns:
-        list: List of tuples containing the word and its corresponding video path.
+        list: The words to look up, in signing order.
     """
     words_to_check = []
     for token in word.split():
@@ -114,50 +203,198 @@ def get_word_video_mapping(collection, word, context=None):
 
     processed_words = []
     for w in words_to_check:
-        if '-' in w and not fetch_document(collection, w):
+        if '-' in w and not lookup_document(collection, w):
             processed_words.extend(w.replace('-', ' ').split())
         else:
             processed_words.append(w)
 
+    return processed_words
+
+def collect_ambiguous_words(collection, words, context):
+    """
+    Finds the words of a gloss that need disambiguation.
+    
+    Args:
+        collection: The lexicon index or MongoDB collection to fetch data from.
+        words (list): The gloss words, excluding fingerspelled named entities.
+        context (str): The context in which the words are used.
+        
+    Returns:
+        dict: Mapping of each ambiguous word to its list of meanings.
+    """
+    word_meanings = {}
+    if not context:
+        return word_meanings
+    for word in words:
+        for w in split_gloss_word(collection, word):
+            document = lookup_document(collection, w)
+            definitions = document.get("definitions", []) if document else []
+            if len(definitions) > 1:
+                word_meanings[w] = [d.get("meaning") for d in definitions]
+    return word_meanings
+
+def get_word_video_mapping(collection, word, context=None, wsd_selections=None):
+    """
+    Retrieves the video mapping for a given word.
+    
+    Args:
+        collection: The lexicon index or MongoDB collection to fetch data from.
+        word (str): The word to be mapped to a video.
+        context (str, optional): The context in which the word is used.
+        wsd_selections (dict, optional): Definition indices already chosen by
+            batched disambiguation, keyed by word.
+        
+    Returns:
+        list: List of tuples containing the word and its corresponding video path.
+    """
+    wsd_selections = wsd_selections or {}
     word_video_map = []
-    for w in processed_words:
-        document = fetch_document(collection, w)
+    for w in split_gloss_word(collection, word):
+        document = lookup_document(collection, w)
         if document:
-            word_video_map.extend(handle_definitions(document.get("definitions", []), w, context))
+            word_video_map.extend(handle_definitions(document.get("definitions", []), w, context, wsd_selections.get(w)))
         else:
             word_video_map.extend(fingerspell_word(collection, w))
 
     return word_video_map
 
-def prepare_display_data(asl_translation, context=None, collection=None):
+def resolve_display_data(asl_translation, context=None, collection=None, annotation=None):
     """
-    Prepares the display data for the ASL translation.
+    Resolves the ASL translation to the ordered clips that sign it.
     
     Args:
         asl_translation (str): The ASL translation text.
         context (str, optional): The context in which the translation is used.
-        collection: The MongoDB collection to fetch data from.
+        collection: The lexicon index or MongoDB collection to fetch data from.
+        annotation (dict, optional): Named entities and word senses produced
+            together with the gloss. When given, named entity recognition is
+            skipped and only words without a sense are disambiguated.
         
     Returns:
-        bool: True if the display data was prepared successfully, False otherwise.
+        list: List of tuples containing each gloss label and its video path.
     """
-    if not asl_translation:
-        return False
-
-    named_entities = query_named_entities(asl_translation, context)
-    normalized_named_entities = [pn.lower().strip() for pn in named_entities]
-    print(f'Named entities detected: {normalized_named_entities}')
+    with span("resolve_clips"):
+        if not asl_translation:
+            return []
 
-    display_data = []
-    normalized_translation = [word.lower().strip() for word in asl_translation.split()]
-    for normalized_word in normalized_translation:
-        if (normalized_word in normalized_named_entities):
-            display_data.extend(fingerspell_word(collection, normalized_word))
+        if annotation:
+            normalized_named_entities = annotation["named_entities"]
+            wsd_selections = dict(annotation["senses"])
         else:
-            word_mapping = get_word_video_mapping(collection, normalized_word, context=context)
-            display_data.extend(word_mapping)
+            named_entities = query_named_entities(asl_translation, context)
+            normalized_named_entities = [pn.lower().strip() for pn in named_entities]
+            wsd_selections = {}
+        print(f'Named entities detected: {normalized_named_entities}')
+
+        normalized_translation = [word.lower().strip() for word in asl_translation.split()]
+        ambiguous_words = collect_ambiguous_words(
+            collection, [w for w in normalized_translation if w not in normalized_named_entities], context
+        )
+        unresolved_words = {w: meanings for w, meanings in ambiguous_words.items() if w not in wsd_selections}
+        if unresolved_words:
+            print(f'Handling ambiguity for {list(unresolved_words)}')
+            wsd_selections.update(query_wsd_batch(context, unresolved_words))
+
+        display_data = []
+        for normalized_word in normalized_translation:
+            if (normalized_word in normalized_named_entities):
+                display_data.extend(fingerspell_word(collection, normalized_word))
+            else:
+                word_mapping = get_word_video_mapping(collection, normalized_word, context=context, wsd_selections=wsd_selections)
+                display_data.extend(word_mapping)
+
+        count("clips_resolved", len(display_data))
+        return display_data
 
+def prepare_playlist(asl_translation, context=None, collection=None, annotation=None):
+    """
+    Prepares the ASL translation for client-side playback of the individual clips,
+    without merging them into one video.
+    
+    Args:
+        asl_translation (str): The ASL translation text.
+        context (str, optional): The context in which the translation is used.
+        collection: The lexicon index or MongoDB collection to fetch data from.
+        annotation (dict, optional): Named entities and word senses produced together with the gloss.
+        
+    Returns:
+        list: List of dicts with the "label", "url" and "duration" in seconds of each clip, in playback order.
+    """
+    display_data = resolve_display_data(asl_translation, context=context, collection=collection, annotation=annotation)
+    return [get_playlist_entry(label, path) for label, path in display_data]
+
+def get_playlist_entry(label, video_path):
+    """
+    Describes a clip for client-side playback. The normalized copy is served when
+    it is up to date, since it is already trimmed to the active span. Otherwise
+    the library clip is served with the "start" and "end" of its active span.
+
+    Args:
+        label (str): The word or letter the clip shows.
+        video_path (str): The path of the library clip.
+
+    Returns:
+        dict: The "label", "url" and "duration" in seconds of the clip, plus
+        "start" and "end" in seconds when the player has to trim it.
+    """
+    normalized_path = get_normalized_clip(video_path) if profile_matches() else None
+    if normalized_path:
+        return {"label": label, "url": video_path_to_url(normalized_path), "duration": get_video_duration(normalized_path)}
+
+    span = get_active_span(video_path)
+    if span is None:
+        return {"label": label, "url": video_path_to_url(video_path), "duration": get_video_duration(video_path)}
+    return {
+        "label": label,
+        "url": video_path_to_url(video_path),
+        "duration": round(span[1] - span[0], 3),
+        "start": span[0],
+        "end": span[1]
+    }
+
+def prepare_display_data(asl_translation, context=None, collection=None, output_path=MERGED_VIDEO_PATH, annotation=None):
+    """
+    Prepares the display data for the ASL translation.
+    
+    Args:
+        asl_translation (str): The ASL translation text.
+        context (str, optional): The context in which the translation is used.
+        collection: The lexicon index or MongoDB collection to fetch data from.
+        output_path (str, optional): The path to write the merged video to.
+        annotation (dict, optional): Named entities and word senses produced
+            together with the gloss. When given, named entity recognition is
+            skipped and only words without a sense are disambiguated.
+        
+    Returns:
+        list: The paths of the clips merged into the video, or an empty list if
+        there was nothing to merge.
+    """
+    display_data = resolve_display_data(asl_translation, context=context, collection=collection, annotation=annotation)
     video_paths = [path for _, path in display_data]
-    merge_video_files(video_paths)
+    if video_paths:
+        merge_cached_video(video_paths, output_path)
+    return video_paths
+
+def merge_cached_video(video_paths, output_path=MERGED_VIDEO_PATH):
+    """
+    Merges a clip sequence, serving the video from the video cache when the same
+    sequence was merged before.
 
-    return True
+    Args:
+        video_paths (list): The library clip paths, in playback order.
+        output_path (str, optional): The path to write the merged video to.
+    """
+    # Stream-copied and re-encoded videos differ in size and encoding, so they
+    # are cached under separate keys
+    method = "stream_copy" if profile_matches() else "reencode"
+    cache_key = get_cache_key("merged", video_paths, {
+        "merge": MERGE_SETTINGS,
+        "normalization": NORMALIZATION_PROFILE,
+        "spans": [get_active_span(path) for path in video_paths],
+        "method": method
+    })
+    if fetch_cached_video(cache_key, output_path):
+        count("video_cache_hits")
+        print("Merged video served from cache")
+    elif merge_video_files(video_paths, output_path=output_path) == method:
+        store_cached_video(cache_key, output_path)
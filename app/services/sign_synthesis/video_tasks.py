@@ -0,0 +1,66 @@
+import hashlib
+import json
+from app.services.sign_synthesis.video_matcher import merge_cached_video
+from app.services.sign_synthesis.skeleton_video import render_skeleton_video
+from app.services.utils.job_workspace import (
+    create_job, job_exists, remove_job, use_job,
+    get_merged_video_path, get_output_video_path, save_job_clips, load_job_clips
+)
+
+def get_sequence_key(video_paths):
+    """
+    Identifies a clip sequence, so that requests resolving to the same clips
+    share one merge.
+
+    Args:
+        video_paths (list): The library clip paths, in playback order.
+
+    Returns:
+        str: The hex digest of the sequence.
+    """
+    return hashlib.sha256(json.dumps(video_paths).encode("utf-8")).hexdigest()
+
+def prepare_merged_video(video_paths):
+    """
+    Merges a clip sequence into the workspace of a new job.
+
+    Args:
+        video_paths (list): The library clip paths, in playback order.
+
+    Returns:
+        dict: "video_ready" and the "job_id" holding the merged video.
+    """
+    job_id = create_job()
+    try:
+        with use_job(job_id):
+            merge_cached_video(video_paths, get_merged_video_path(job_id))
+            save_job_clips(job_id, video_paths)
+    except Exception:
+        remove_job(job_id)
+        raise
+    print(f"Video merge complete for job {job_id}")
+    return {"video_ready": True, "job_id": job_id}
+
+def extract_job_pose(job_id):
+    """
+    Renders the skeleton video of a job.
+
+    Args:
+        job_id (str): The job holding the merged video.
+
+    Returns:
+        dict: The "output_path" of the skeleton video.
+
+    Raises:
+        FileNotFoundError: If the job workspace was evicted.
+    """
+    if not job_exists(job_id):
+        raise FileNotFoundError("Job not found or expired")
+    with use_job(job_id):
+        output_path = render_skeleton_video(
+            load_job_clips(job_id),
+            merged_video_path=get_merged_video_path(job_id),
+            output_path=get_output_video_path(job_id)
+        )
+    print(f"Pose extraction complete for job {job_id}")
+    return {"output_path": output_path}
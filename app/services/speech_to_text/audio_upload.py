@@ -0,0 +1,87 @@
+import io
+import re
+import time
+import threading
+from app.config import AUDIO_UPLOAD_MAX_BYTES, AUDIO_UPLOAD_TTL_SECONDS
+
+UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+_uploads = {}
+_lock = threading.Lock()
+
+class AudioUploadError(ValueError):
+    """Raised when an upload chunk is rejected."""
+
+def is_valid_upload_id(upload_id):
+    """
+    Checks that an upload ID has the format generated by the browser.
+
+    Args:
+        upload_id (str): The upload ID.
+
+    Returns:
+        bool: True if the ID is 32 lowercase hex characters.
+    """
+    return isinstance(upload_id, str) and bool(UPLOAD_ID_PATTERN.match(upload_id))
+
+def _drop_stale_uploads(now):
+    """Forgets uploads that have not received a chunk within AUDIO_UPLOAD_TTL_SECONDS."""
+    for upload_id in [key for key, upload in _uploads.items() if now - upload["updated_at"] > AUDIO_UPLOAD_TTL_SECONDS]:
+        del _uploads[upload_id]
+
+def append_chunk(upload_id, chunk, index):
+    """
+    Appends a chunk of audio to an upload, starting the upload with chunk 0.
+
+    Args:
+        upload_id (str): The upload ID.
+        chunk (bytes): The audio data of the chunk.
+        index (int): The position of the chunk in the upload.
+
+    Returns:
+        int: The number of bytes received so far.
+
+    Raises:
+        AudioUploadError: If the ID is invalid, the chunk is out of order or the
+            upload grows beyond AUDIO_UPLOAD_MAX_BYTES.
+    """
+    if not is_valid_upload_id(upload_id):
+        raise AudioUploadError("Invalid upload ID")
+
+    now = time.time()
+    with _lock:
+        _drop_stale_uploads(now)
+        upload = _uploads.get(upload_id)
+        if index == 0 and upload is None:
+            upload = _uploads[upload_id] = {"buffer": io.BytesIO(), "next_index": 0, "updated_at": now}
+        if upload is None:
+            raise AudioUploadError("Unknown or expired upload")
+        if index != upload["next_index"]:
+            raise AudioUploadError(f"Expected chunk {upload['next_index']}, got {index}")
+        if upload["buffer"].tell() + len(chunk) > AUDIO_UPLOAD_MAX_BYTES:
+            del _uploads[upload_id]
+            raise AudioUploadError("Audio upload too large")
+
+        upload["buffer"].write(chunk)
+        upload["next_index"] += 1
+        upload["updated_at"] = now
+        return upload["buffer"].tell()
+
+def finish_upload(upload_id):
+    """
+    Removes an upload and returns its audio.
+
+    Args:
+        upload_id (str): The upload ID.
+
+    Returns:
+        bytes: The audio data of all chunks.
+
+    Raises:
+        AudioUploadError: If the upload does not exist.
+    """
+    with _lock:
+        upload = _uploads.pop(upload_id, None)
+    if upload is None:
+        raise AudioUploadError("Unknown or expired upload")
+    return upload["buffer"].getvalue()
@@ -1,72 +1,283 @@
-import os
+import io
+import threading
 import requests
-import sounddevice as sd
 import soundfile as sf
-import tempfile
 import numpy as np
-from app.config import ASR_API_URL, RECORD_DURATION, TARGET_LANGUAGE, HUGGINGFACE_TOKEN
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.services.utils.tracing import span, count
+from app.config import (
+    ASR_API_URL, RECORD_DURATION, TARGET_LANGUAGE, HUGGINGFACE_TOKEN, VAD_ENABLED, VAD_FRAME_MS,
+    VAD_ENERGY_THRESHOLD, VAD_NOISE_MULTIPLIER, VAD_MIN_SPEECH_FRAMES, VAD_TRAILING_SILENCE_SECONDS,
+    VAD_PADDING_SECONDS, VAD_MAX_RECORD_SECONDS, ASR_TIMEOUT_SECONDS, ASR_POOL_SIZE
+)
 
 SAMPLE_RATE = 16000
+FRAME_SIZE = int(SAMPLE_RATE * VAD_FRAME_MS / 1000)
 
-def query(filename):
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Returns the HTTP session used for transcription requests, creating it on
+    first use. Its connections to the API are kept open and reused, and requests
+    failing while the model loads are retried.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["POST"])
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=ASR_POOL_SIZE, max_retries=retry)
+            _session = requests.Session()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+def query(audio_bytes, content_type="audio/flac"):
     """
-    Sends an audio file to the Hugging Face API for transcription.
+    Sends encoded audio to the Hugging Face API for transcription.
 
     Args:
-        filename: The path to the audio file.
+        audio_bytes: The encoded audio.
+        content_type: The MIME type of the audio.
 
     Returns:
         The JSON response from the API.
     """
-    with open(filename, "rb") as f:
-        data = f.read()
-
     params = {
         "language": TARGET_LANGUAGE,
         "task": "automatic-speech-recognition",
         "forced_language": TARGET_LANGUAGE
     }
 
-    response = requests.post(
+    response = get_session().post(
         ASR_API_URL,
-        headers={"Authorization": f"Bearer {HUGGINGFACE_TOKEN()}"},
+        headers={"Authorization": f"Bearer {HUGGINGFACE_TOKEN()}", "Content-Type": content_type},
         params=params,
-        data=data
+        data=audio_bytes,
+        timeout=ASR_TIMEOUT_SECONDS
     )
     return response.json()
 
-def record_and_transcribe():
+def encode_flac(audio_data, sample_rate=SAMPLE_RATE):
     """
-    Records audio from the microphone and transcribes it using the Whisper API.
+    Compresses audio to FLAC in memory.
+
+    Args:
+        audio_data (np.ndarray): The audio samples in the range -1..1.
+        sample_rate (int, optional): The sample rate.
 
     Returns:
-        The transcribed text.
+        bytes: The FLAC file contents.
     """
-    try:
-        audio_data = sd.rec(
-            int(SAMPLE_RATE * RECORD_DURATION),
-            samplerate=SAMPLE_RATE,
-            channels=1,
-            dtype='float32'
-        )
-        sd.wait()
-
-        audio_data = np.squeeze(audio_data)
-        audio_level = np.abs(audio_data).mean()
-        
-        if audio_level < 0.005:
-            print("Audio level too low")
-            return ""
+    buffer = io.BytesIO()
+    sf.write(buffer, audio_data, sample_rate, format="FLAC", subtype="PCM_16")
+    return buffer.getvalue()
+
+def pcm_to_audio(pcm_bytes):
+    """
+    Converts 16-bit little-endian mono PCM to float samples.
+
+    Args:
+        pcm_bytes (bytes): The raw PCM data.
+
+    Returns:
+        np.ndarray: The audio samples in the range -1..1.
+    """
+    usable = len(pcm_bytes) - len(pcm_bytes) % 2
+    return np.frombuffer(pcm_bytes[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+def frame_energy(frame):
+    """
+    Computes the RMS level of an audio frame.
+
+    Args:
+        frame (np.ndarray): The audio samples.
+
+    Returns:
+        float: The RMS level.
+    """
+    return float(np.sqrt(np.mean(np.square(frame))))
+
+class EnergyVAD:
+    """
+    Classifies audio frames as speech or silence by comparing their level with
+    a fixed minimum and with a running estimate of the background noise.
+    """
+
+    def __init__(self, threshold=VAD_ENERGY_THRESHOLD, noise_multiplier=VAD_NOISE_MULTIPLIER):
+        """
+        Args:
+            threshold (float, optional): Minimum RMS level of a speech frame.
+            noise_multiplier (float, optional): How much louder than the noise floor speech must be.
+        """
+        self.threshold = threshold
+        self.noise_multiplier = noise_multiplier
+        # Until quieter frames are measured, speech only has to clear the fixed
+        # minimum, so a user already speaking when recording starts is detected
+        self.noise_floor = threshold / noise_multiplier
+
+    def is_speech(self, frame):
+        """
+        Classifies a frame and updates the noise floor with the non-speech ones.
+
+        Args:
+            frame (np.ndarray): The audio samples of the frame.
+
+        Returns:
+            bool: True if the frame holds speech.
+        """
+        energy = frame_energy(frame)
+        if energy < self.noise_floor:
+            self.noise_floor = energy
+        speech = energy > max(self.threshold, self.noise_floor * self.noise_multiplier)
+        if not speech:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * energy
+        return speech
+
+def record_until_silence(
+    start_timeout=RECORD_DURATION,
+    trailing_silence=VAD_TRAILING_SILENCE_SECONDS,
+    max_duration=VAD_MAX_RECORD_SECONDS
+):
+    """
+    Records from the microphone frame by frame until the speaker stops.
+
+    Args:
+        start_timeout (float, optional): Seconds to wait for speech to start.
+        trailing_silence (float, optional): Seconds of silence after speech that end the recording.
+        max_duration (float, optional): The longest recording in seconds.
+
+    Returns:
+        tuple: The list of recorded frames and the list of their speech flags.
+    """
+    frame_seconds = FRAME_SIZE / SAMPLE_RATE
+    vad = EnergyVAD()
+    frames, speech_flags = [], []
+    speech_run = 0
+    silent_frames = 0
+    speech_started = False
 
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio:
-            audio_data = audio_data / np.max(np.abs(audio_data))
-            sf.write(temp_audio.name, audio_data, SAMPLE_RATE)
-            temp_audio_path = temp_audio.name
-            print(f"Audio saved to {temp_audio_path}")
+    import sounddevice as sd
+
+    with sd.InputStream(samplerate=SAMPLE_RATE, channels=1, dtype='float32', blocksize=FRAME_SIZE) as stream:
+        while True:
+            block, overflowed = stream.read(FRAME_SIZE)
+            if overflowed:
+                print("Audio input overflowed")
+            frame = block[:, 0].copy()
+            speech = vad.is_speech(frame)
+            frames.append(frame)
+            speech_flags.append(speech)
+
+            speech_run = speech_run + 1 if speech else 0
+            silent_frames = 0 if speech else silent_frames + 1
+            if speech_run >= VAD_MIN_SPEECH_FRAMES:
+                speech_started = True
+
+            elapsed = len(frames) * frame_seconds
+            if speech_started and silent_frames * frame_seconds >= trailing_silence:
+                break
+            if not speech_started and elapsed >= start_timeout:
+                break
+            if elapsed >= max_duration:
+                break
+
+    print(f"Recorded {len(frames) * frame_seconds:.2f}s of audio")
+    return frames, speech_flags
+
+def trim_silence(frames, speech_flags, padding=VAD_PADDING_SECONDS):
+    """
+    Cuts the silence before the first and after the last speech frame, keeping
+    some padding so that soft word onsets and endings are not clipped.
+
+    Args:
+        frames (list): The recorded frames.
+        speech_flags (list): Whether each frame holds speech.
+        padding (float, optional): Seconds of audio kept around the speech.
+
+    Returns:
+        np.ndarray: The trimmed audio, empty if there was not enough speech.
+    """
+    speech_indices = [i for i, speech in enumerate(speech_flags) if speech]
+    if len(speech_indices) < VAD_MIN_SPEECH_FRAMES:
+        return np.zeros(0, dtype=np.float32)
+    padding_frames = int(round(padding * 1000 / VAD_FRAME_MS))
+    start = max(0, speech_indices[0] - padding_frames)
+    end = min(len(frames), speech_indices[-1] + 1 + padding_frames)
+    return np.concatenate(frames[start:end])
+
+def record_fixed_duration():
+    """
+    Records RECORD_DURATION seconds from the microphone.
+
+    Returns:
+        np.ndarray: The recorded audio, empty if its level is too low to hold speech.
+    """
+    import sounddevice as sd
+
+    audio_data = sd.rec(
+        int(SAMPLE_RATE * RECORD_DURATION),
+        samplerate=SAMPLE_RATE,
+        channels=1,
+        dtype='float32'
+    )
+    sd.wait()
+
+    audio_data = np.squeeze(audio_data)
+    audio_level = np.abs(audio_data).mean()
+
+    if audio_level < 0.005:
+        print("Audio level too low")
+        return np.zeros(0, dtype=np.float32)
+    return audio_data
+
+def trim_audio(audio_data, sample_rate=SAMPLE_RATE):
+    """
+    Runs the voice activity detector over recorded audio and trims the silence
+    around the speech.
+
+    Args:
+        audio_data (np.ndarray): The audio samples.
+        sample_rate (int, optional): The sample rate.
+
+    Returns:
+        np.ndarray: The trimmed audio, empty if there was not enough speech.
+    """
+    frame_size = max(1, int(sample_rate * VAD_FRAME_MS / 1000))
+    frames = [audio_data[i:i + frame_size] for i in range(0, len(audio_data), frame_size)]
+    vad = EnergyVAD()
+    return trim_silence(frames, [vad.is_speech(frame) for frame in frames])
+
+def transcribe_audio(audio_data, sample_rate=SAMPLE_RATE):
+    """
+    Normalizes audio, compresses it to FLAC in memory and transcribes it using
+    the Whisper API.
+
+    Args:
+        audio_data (np.ndarray): The audio samples.
+        sample_rate (int, optional): The sample rate.
+
+    Returns:
+        str: The transcribed text, or an empty string if there is no speech or an error occurs.
+    """
+    if not audio_data.size or not np.max(np.abs(audio_data)):
+        print("No speech detected")
+        return ""
+
+    with span("speech_to_text"):
+        audio_data = audio_data / np.max(np.abs(audio_data))
+        audio_bytes = encode_flac(audio_data, sample_rate)
+        print(f"Uploading {len(audio_data) / sample_rate:.2f}s of audio as {len(audio_bytes)} bytes of FLAC")
 
         try:
-            result = query(temp_audio_path)
-            
+            count("asr_requests")
+            result = query(audio_bytes)
+
             if isinstance(result, dict) and 'text' in result:
                 transcription = result['text'].strip()
                 return transcription
@@ -77,13 +288,37 @@ def record_and_transcribe():
         except Exception as e:
             print(f"Transcription error: {e}")
             return ""
-        finally:
-            if os.path.exists(temp_audio_path):
-                try:
-                    os.unlink(temp_audio_path)
-                except Exception as e:
-                    print(f"Error deleting temporary file: {e}")
 
+def transcribe_pcm(pcm_bytes, sample_rate=SAMPLE_RATE):
+    """
+    Transcribes 16-bit mono PCM uploaded by the browser, trimming the silence
+    around the speech first.
+
+    Args:
+        pcm_bytes (bytes): The raw PCM data.
+        sample_rate (int, optional): The sample rate.
+
+    Returns:
+        str: The transcribed text, or an empty string if there is no speech or an error occurs.
+    """
+    return transcribe_audio(trim_audio(pcm_to_audio(pcm_bytes), sample_rate), sample_rate)
+
+def record_and_transcribe():
+    """
+    Records audio from the microphone and transcribes it using the Whisper API.
+    With VAD_ENABLED the recording ends shortly after the speaker stops and the
+    surrounding silence is trimmed before upload.
+
+    Returns:
+        The transcribed text.
+    """
+    try:
+        if VAD_ENABLED:
+            audio_data = trim_silence(*record_until_silence())
+        else:
+            audio_data = record_fixed_duration()
     except Exception as e:
         print(f"Recording error: {e}")
         return ""
+
+    return transcribe_audio(audio_data)
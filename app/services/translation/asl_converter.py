@@ -1,5 +1,6 @@
 from app.services.translation.prompt_template import SYSTEM_PROMPT
-from app.services.utils.llm_query import query_llm
+from app.services.utils.llm_query import query_llm, stream_llm
+from app.services.utils.llm_gateway import LLMGatewayError
 from app.config import MAX_TOKENS
 
 WH_WORDS = {"what", "where", "who", "when", "why", "which", "whom", "how", "whose", "how-much", "how-many"}
@@ -27,6 +28,65 @@ def post_process_asl_response(response: str) -> str:
 
     return cleaned_response
 
+def build_asl_messages(input_text: str) -> list:
+    """
+    Build the chat messages asking the language model for the ASL gloss of a sentence.
+    
+    Args:
+        input_text (str): The text to be converted to ASL.
+    
+    Returns:
+        list: The chat messages.
+    """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f'Input Sentence: "{input_text}"'}
+    ]
+
+def clean_partial_gloss(response: str) -> str:
+    """
+    Clean a partially generated ASL response without the end-of-sentence handling
+    of post_process_asl_response, which needs the complete response.
+    
+    Args:
+        response (str): The ASL response generated so far.
+    
+    Returns:
+        str: The cleaned partial ASL gloss.
+    """
+    response = response.lstrip()
+    if response.startswith("ASL Gloss:"):
+        response = response[len("ASL Gloss:"):]
+    return response.lstrip().lstrip('"')
+
+def stream_asl(input_text: str):
+    """
+    Convert input text to ASL, yielding the gloss as the language model generates it.
+    
+    Args:
+        input_text (str): The text to be converted to ASL.
+    
+    Yields:
+        tuple: (completed_words, partial_gloss) after each generated piece, where
+        completed_words are the gloss words known to be complete so far. The final
+        item has every word completed and the post-processed gloss.
+    """
+    if not input_text.strip():
+        return
+
+    response_content = ""
+    for piece in stream_llm(build_asl_messages(input_text), temperature=0.2, max_tokens=MAX_TOKENS, top_p=0.8, cache_site="asl_gloss"):
+        response_content += piece
+        partial_gloss = clean_partial_gloss(response_content)
+        words = partial_gloss.split()
+        if words and not partial_gloss[-1].isspace():
+            words = words[:-1]  # The last word may still be incomplete
+        yield words, partial_gloss
+
+    if response_content.strip():
+        final_gloss = post_process_asl_response(response_content.strip())
+        yield final_gloss.split(), final_gloss
+
 def convert_to_asl(input_text: str):
     """
     Convert input text to ASL using a language model.
@@ -36,19 +96,21 @@ def convert_to_asl(input_text: str):
     
     Returns:
         str: The ASL converted text, or None if an error occurs.
+
+    Raises:
+        LLMGatewayError: If the language model is unavailable, so that callers can
+            report it instead of returning an empty gloss.
     """
     if not input_text.strip():
         return None
 
     try:
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": f'Input Sentence: "{input_text}"'}
-        ]
-
-        response_content = query_llm(messages, temperature=0.2, max_tokens=MAX_TOKENS, top_p=0.8)
+        messages = build_asl_messages(input_text)
+        response_content = query_llm(messages, temperature=0.2, max_tokens=MAX_TOKENS, top_p=0.8, cache_site="asl_gloss")
         return post_process_asl_response(response_content)
 
+    except LLMGatewayError:
+        raise
     except Exception as e:
         print(f"Error converting text to ASL: {str(e)}")
         return None
@@ -0,0 +1,181 @@
+import re
+import json
+from app.services.translation.prompt_template import FUSED_SYSTEM_PROMPT
+from app.services.translation.asl_converter import post_process_asl_response
+from app.services.utils.lexicon_index import lookup_document
+from app.services.utils.llm_query import query_llm
+from app.config import MAX_TOKENS
+
+def candidate_forms(token):
+    """
+    Returns the token and simple inflection-stripped forms of it, so that e.g.
+    "banks" and "running" can be matched against lexicon words.
+
+    Args:
+        token (str): A lowercase word of the input sentence.
+
+    Returns:
+        list: Possible lexicon forms of the token.
+    """
+    forms = [token]
+    if token.endswith("ies"):
+        forms.append(token[:-3] + "y")
+    if token.endswith("es"):
+        forms.append(token[:-2])
+    if token.endswith("s"):
+        forms.append(token[:-1])
+    if token.endswith("ed"):
+        forms.extend([token[:-2], token[:-1]])
+    if token.endswith("ing"):
+        forms.extend([token[:-3], token[:-3] + "e"])
+    return forms
+
+def find_sense_candidates(collection, input_text):
+    """
+    Finds the words of a sentence that have several meanings in the lexicon.
+
+    Args:
+        collection: The lexicon index or MongoDB collection to fetch data from.
+        input_text (str): The English sentence.
+
+    Returns:
+        dict: Mapping of each candidate lexicon word to its list of meanings.
+    """
+    candidates = {}
+    for token in re.findall(r"[a-z][a-z'-]*", input_text.lower()):
+        for form in candidate_forms(token):
+            if form in candidates:
+                break
+            document = lookup_document(collection, form)
+            definitions = document.get("definitions", []) if document else []
+            if len(definitions) > 1:
+                candidates[form] = [d.get("meaning") for d in definitions]
+                break
+    return candidates
+
+def parse_fused_response(raw_response, candidates):
+    """
+    Parses the JSON object returned by the fused prompt.
+
+    Args:
+        raw_response (str): The raw LLM response.
+        candidates (dict): Mapping of each candidate word to its list of meanings.
+
+    Returns:
+        dict: The ASL gloss, the proper nouns and the 0-based sense index of each
+        candidate word, or None if the response is not usable.
+    """
+    match = re.search(r'\{.*\}', raw_response or "", re.DOTALL)
+    if not match:
+        return None
+    try:
+        parsed = json.loads(match.group(0))
+    except ValueError:
+        return None
+
+    gloss = parsed.get("gloss") if isinstance(parsed, dict) else None
+    if not isinstance(gloss, list) or not gloss or not all(isinstance(word, str) for word in gloss):
+        return None
+
+    proper_nouns = parsed.get("proper_nouns")
+    if not isinstance(proper_nouns, list):
+        proper_nouns = []
+
+    senses = {}
+    raw_senses = parsed.get("senses")
+    if isinstance(raw_senses, dict):
+        for word, number in raw_senses.items():
+            word = str(word).lower().strip()
+            if word not in candidates:
+                continue
+            try:
+                selected_index = int(number) - 1
+            except (TypeError, ValueError):
+                continue
+            senses[word] = max(0, min(selected_index, len(candidates[word]) - 1))
+
+    return {
+        "asl_translation": post_process_asl_response(" ".join(gloss)),
+        "named_entities": [noun.lower().strip() for noun in proper_nouns if isinstance(noun, str)],
+        "senses": senses
+    }
+
+def annotate_sentence(input_text, collection):
+    """
+    Generates the ASL gloss, the proper-noun flags and the word senses of a
+    sentence in a single LLM call.
+
+    Args:
+        input_text (str): The English sentence.
+        collection: The lexicon index or MongoDB collection to fetch data from.
+
+    Returns:
+        dict: The "asl_translation" gloss and an "annotation" with the
+        "named_entities" and "senses" to hand to video preparation, or None if
+        the fused response was unusable and the regular pipeline should be used instead.
+
+    Raises:
+        LLMGatewayError: If the language model is unavailable, so that callers do
+            not wait out a second deadline on the regular pipeline.
+    """
+    if not input_text.strip():
+        return None
+
+    candidates = find_sense_candidates(collection, input_text)
+    candidate_lines = [
+        f"{word}: " + " ".join(f"{i + 1}. {meaning}" for i, meaning in enumerate(meanings))
+        for word, meanings in candidates.items()
+    ]
+    messages = [
+        {"role": "system", "content": FUSED_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": (
+                f'Input Sentence: "{input_text}"\n'
+                f"Candidates:\n{chr(10).join(candidate_lines) if candidate_lines else 'none'}"
+            )
+        }
+    ]
+
+    raw_response = query_llm(messages, temperature=0.2, max_tokens=4 * MAX_TOKENS, top_p=0.8, cache_site="fused_annotation")
+    try:
+        result = parse_fused_response(raw_response, candidates)
+    except (TypeError, ValueError, KeyError):
+        result = None
+    if result is None:
+        print(f"Unusable fused annotation response: {raw_response}")
+        return None
+
+    return {
+        "asl_translation": result["asl_translation"],
+        "annotation": {
+            "named_entities": result["named_entities"],
+            "senses": result["senses"]
+        }
+    }
+
+def sanitize_annotation(annotation):
+    """
+    Validates an annotation received from a client.
+
+    Args:
+        annotation: The annotation sent back with a video preparation request.
+
+    Returns:
+        dict: The annotation with only well-typed entries, or None if it is unusable.
+    """
+    if not isinstance(annotation, dict):
+        return None
+
+    named_entities = annotation.get("named_entities")
+    senses = annotation.get("senses")
+    if not isinstance(named_entities, list) or not isinstance(senses, dict):
+        return None
+
+    return {
+        "named_entities": [entity.lower().strip() for entity in named_entities if isinstance(entity, str)],
+        "senses": {
+            str(word): index for word, index in senses.items()
+            if isinstance(index, int) and not isinstance(index, bool)
+        }
+    }
@@ -0,0 +1,179 @@
+import re
+from collections import Counter
+
+NGRAM_SIZES = (1, 2, 3)
+PROFILE_SIZE = 300
+MIN_LETTERS = 8  # Shorter inputs carry too little signal to be classified locally
+MIN_MARGIN = 0.04  # Distance lead English needs over the runner-up, as a share of the maximum distance
+
+# Sample texts the character n-gram profiles are built from. English is the
+# only language that takes the fast path; the others are there so that input
+# in a common Latin-script language is not mistaken for English.
+SAMPLE_TEXTS = {
+    "en": (
+        "All human beings are born free and equal in dignity and rights. They are endowed with reason and "
+        "conscience and should act towards one another in a spirit of brotherhood. Hello, how are you today? "
+        "I would like to go to the store with my friend this afternoon. What is your name and where do you live? "
+        "Thank you very much for your help. The weather is nice and the children are playing outside in the park. "
+        "Can you tell me where the bathroom is? I am learning sign language because my brother is deaf. "
+        "We will meet at the library after school and then we can have dinner together. Please wait here for a "
+        "moment while I check the time of the next train. My mother works at the hospital and my father teaches "
+        "at the university. It was raining all night, so the river is higher than usual this morning. "
+        "Do you want something to eat or drink? They have been waiting for the doctor since eight o'clock. "
+        "This is the best book that I have ever read, and I think that you should read it too."
+    ),
+    "es": (
+        "Todos los seres humanos nacen libres e iguales en dignidad y derechos y, dotados como están de razón y "
+        "conciencia, deben comportarse fraternalmente los unos con los otros. Hola, ¿cómo estás hoy? Me gustaría "
+        "ir a la tienda con mi amigo esta tarde. ¿Cuál es tu nombre y dónde vives? Muchas gracias por tu ayuda. "
+        "El tiempo es agradable y los niños están jugando en el parque. ¿Puedes decirme dónde está el baño? "
+        "Estoy aprendiendo lengua de señas porque mi hermano es sordo. Nos vemos en la biblioteca después de la "
+        "escuela y luego podemos cenar juntos. Por favor espera aquí un momento mientras reviso la hora del "
+        "próximo tren. Mi madre trabaja en el hospital y mi padre enseña en la universidad."
+    ),
+    "fr": (
+        "Tous les êtres humains naissent libres et égaux en dignité et en droits. Ils sont doués de raison et de "
+        "conscience et doivent agir les uns envers les autres dans un esprit de fraternité. Bonjour, comment "
+        "allez-vous aujourd'hui? Je voudrais aller au magasin avec mon ami cet après-midi. Quel est votre nom et "
+        "où habitez-vous? Merci beaucoup pour votre aide. Il fait beau et les enfants jouent dehors dans le parc. "
+        "Pouvez-vous me dire où sont les toilettes? J'apprends la langue des signes parce que mon frère est sourd. "
+        "Nous nous retrouverons à la bibliothèque après l'école et ensuite nous pourrons dîner ensemble. Ma mère "
+        "travaille à l'hôpital et mon père enseigne à l'université."
+    ),
+    "de": (
+        "Alle Menschen sind frei und gleich an Würde und Rechten geboren. Sie sind mit Vernunft und Gewissen "
+        "begabt und sollen einander im Geist der Brüderlichkeit begegnen. Hallo, wie geht es dir heute? Ich "
+        "möchte heute Nachmittag mit meinem Freund in den Laden gehen. Wie heißt du und wo wohnst du? Vielen "
+        "Dank für deine Hilfe. Das Wetter ist schön und die Kinder spielen draußen im Park. Kannst du mir sagen, "
+        "wo die Toilette ist? Ich lerne Gebärdensprache, weil mein Bruder gehörlos ist. Wir treffen uns nach der "
+        "Schule in der Bibliothek und dann können wir zusammen zu Abend essen. Meine Mutter arbeitet im "
+        "Krankenhaus und mein Vater unterrichtet an der Universität."
+    ),
+    "it": (
+        "Tutti gli esseri umani nascono liberi ed eguali in dignità e diritti. Essi sono dotati di ragione e di "
+        "coscienza e devono agire gli uni verso gli altri in spirito di fratellanza. Ciao, come stai oggi? Vorrei "
+        "andare al negozio con il mio amico questo pomeriggio. Come ti chiami e dove abiti? Grazie mille per il "
+        "tuo aiuto. Il tempo è bello e i bambini stanno giocando fuori nel parco. Puoi dirmi dove si trova il "
+        "bagno? Sto imparando la lingua dei segni perché mio fratello è sordo. Ci vediamo in biblioteca dopo la "
+        "scuola e poi possiamo cenare insieme. Mia madre lavora in ospedale e mio padre insegna all'università."
+    ),
+    "pt": (
+        "Todos os seres humanos nascem livres e iguais em dignidade e em direitos. Dotados de razão e de "
+        "consciência, devem agir uns para com os outros em espírito de fraternidade. Olá, como você está hoje? "
+        "Eu gostaria de ir à loja com o meu amigo esta tarde. Qual é o seu nome e onde você mora? Muito obrigado "
+        "pela sua ajuda. O tempo está bom e as crianças estão brincando lá fora no parque. Você pode me dizer "
+        "onde fica o banheiro? Estou aprendendo língua de sinais porque o meu irmão é surdo. Vamos nos encontrar "
+        "na biblioteca depois da escola e depois podemos jantar juntos. A minha mãe trabalha no hospital e o meu "
+        "pai ensina na universidade."
+    ),
+    "nl": (
+        "Alle mensen worden vrij en gelijk in waardigheid en rechten geboren. Zij zijn begiftigd met verstand en "
+        "geweten, en behoren zich jegens elkander in een geest van broederschap te gedragen. Hallo, hoe gaat het "
+        "vandaag met je? Ik wil vanmiddag met mijn vriend naar de winkel gaan. Hoe heet je en waar woon je? "
+        "Hartelijk dank voor je hulp. Het weer is mooi en de kinderen spelen buiten in het park. Kun je me "
+        "vertellen waar de wc is? Ik leer gebarentaal omdat mijn broer doof is. We zien elkaar na school in de "
+        "bibliotheek en daarna kunnen we samen eten. Mijn moeder werkt in het ziekenhuis en mijn vader geeft les "
+        "aan de universiteit."
+    ),
+    "id": (
+        "Semua orang dilahirkan merdeka dan mempunyai martabat dan hak-hak yang sama. Mereka dikaruniai akal dan "
+        "hati nurani dan hendaknya bergaul satu sama lain dalam semangat persaudaraan. Halo, apa kabar hari ini? "
+        "Saya ingin pergi ke toko dengan teman saya sore ini. Siapa nama kamu dan di mana kamu tinggal? Terima "
+        "kasih banyak atas bantuan kamu. Cuacanya bagus dan anak-anak sedang bermain di taman. Bisakah kamu "
+        "memberi tahu saya di mana kamar mandi? Saya belajar bahasa isyarat karena kakak saya tuli."
+    )
+}
+
+def extract_ngrams(text):
+    """
+    Counts the character n-grams of the words of a text, padded with spaces so
+    that word beginnings and endings are captured.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        Counter: Occurrences of each n-gram.
+    """
+    counts = Counter()
+    for word in re.findall(r"[^\W\d_]+(?:'[^\W\d_]+)?", text.lower()):
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            for i in range(len(padded) - size + 1):
+                ngram = padded[i:i + size]
+                if ngram != " ":
+                    counts[ngram] += 1
+    return counts
+
+def build_profile(text, size=PROFILE_SIZE):
+    """
+    Ranks the most frequent n-grams of a text.
+
+    Args:
+        text (str): The text.
+        size (int, optional): The number of n-grams to keep.
+
+    Returns:
+        dict: Mapping of each n-gram to its rank.
+    """
+    return {ngram: rank for rank, (ngram, _) in enumerate(extract_ngrams(text).most_common(size))}
+
+LANGUAGE_PROFILES = {language: build_profile(text) for language, text in SAMPLE_TEXTS.items()}
+
+def profile_distance(document_profile, language_profile):
+    """
+    Computes the out-of-place distance between two profiles, normalized to 0..1.
+
+    Args:
+        document_profile (dict): The n-gram ranks of the input.
+        language_profile (dict): The n-gram ranks of a language.
+
+    Returns:
+        float: 0 for identical rankings, 1 if no n-gram is shared.
+    """
+    if not document_profile:
+        return 1.0
+    max_penalty = len(language_profile)
+    total = 0
+    for ngram, rank in document_profile.items():
+        language_rank = language_profile.get(ngram)
+        total += max_penalty if language_rank is None else min(abs(rank - language_rank), max_penalty)
+    return total / (max_penalty * len(document_profile))
+
+def detect_language(text):
+    """
+    Identifies the language of a text from its character n-grams.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        tuple: The closest language code and its distance lead over the
+        runner-up, or (None, 0.0) if the text cannot be classified locally.
+    """
+    if sum(char.isalpha() for char in text) < MIN_LETTERS:
+        return None, 0.0
+
+    document_profile = build_profile(text)
+    distances = sorted(
+        (profile_distance(document_profile, profile), language)
+        for language, profile in LANGUAGE_PROFILES.items()
+    )
+    (best_distance, best_language), (runner_up_distance, _) = distances[0], distances[1]
+    return best_language, runner_up_distance - best_distance
+
+def is_english(text):
+    """
+    Checks whether a text is confidently English. Text with letters outside
+    ASCII, or without a clear lead for English, is not.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        bool: True if the text can skip translation.
+    """
+    if not text.isascii():
+        return False
+    language, margin = detect_language(text)
+    return language == "en" and margin >= MIN_MARGIN
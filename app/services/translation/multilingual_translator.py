@@ -1,5 +1,11 @@
-import translators as ts
-from app.config import TARGET_LANGUAGE
+import threading
+from collections import OrderedDict
+from app.services.translation.language_detection import is_english
+from app.services.utils.tracing import span, count
+from app.config import TARGET_LANGUAGE, TRANSLATION_CACHE_ENTRIES
+
+_translations = OrderedDict()
+_lock = threading.Lock()
 
 def translate_to_english(text: str) -> str:
     """
@@ -11,6 +17,8 @@ def translate_to_english(text: str) -> str:
     Returns:
         str: The translated text in English, or an empty string if an error occurs.
     """
+    import translators as ts
+
     try:
         translated = ts.translate_text(
             query_text=text,
@@ -23,3 +31,37 @@ def translate_to_english(text: str) -> str:
     except Exception as e:
         print(f"Translation error: {e}")
         return ""
+
+def to_english(text: str) -> dict:
+    """
+    Returns the English version of a text, skipping the translator for input
+    that is already English and reusing recent translations.
+
+    Args:
+        text (str): The text to be translated.
+
+    Returns:
+        dict: The "english_text", whether the local "fast_path" was taken and
+        whether the translation was "cached".
+    """
+    with span("translate"):
+        text = text.strip()
+        if is_english(text):
+            return {"english_text": text, "fast_path": True, "cached": False}
+
+        with _lock:
+            english_text = _translations.get(text)
+            if english_text is not None:
+                _translations.move_to_end(text)
+        if english_text is not None:
+            return {"english_text": english_text, "fast_path": False, "cached": True}
+
+        count("translator_calls")
+        english_text = translate_to_english(text)
+        if english_text:
+            with _lock:
+                _translations[text] = english_text
+                _translations.move_to_end(text)
+                while len(_translations) > TRANSLATION_CACHE_ENTRIES:
+                    _translations.popitem(last=False)
+        return {"english_text": english_text, "fast_path": False, "cached": False}
@@ -1,4 +1,4 @@
-SYSTEM_PROMPT = """Translate the following English sentence into ASL gloss. Follow each rule carefully to ensure accurate ASL syntax. Omit all unnecessary words and focus on direct, formulaic translation without any eyebrow, body movement, or non-manual signals.
+GLOSS_RULES = """Translate the following English sentence into ASL gloss. Follow each rule carefully to ensure accurate ASL syntax. Omit all unnecessary words and focus on direct, formulaic translation without any eyebrow, body movement, or non-manual signals.
 
 ---
 
@@ -93,7 +93,26 @@ Indicate plurality by using repetition or adding the appropriate sign, unless a
 - Be Concise: Only use necessary words, following ASL gloss syntax.
 - No Non-Manual Markers: Do not include any eyebrow or body movement markers.
 - If there are any typos or sentences you do not understand, return "..."
+"""
 
+SYSTEM_PROMPT = GLOSS_RULES + """
 Input Sentence: "[Insert English sentence here]"
 
-ASL Gloss:"""
\ No newline at end of file
+ASL Gloss:"""
+
+FUSED_SYSTEM_PROMPT = GLOSS_RULES + """
+---
+
+### Output Format
+Return only a JSON object with these keys, and nothing else:
+- "gloss": the list of ASL gloss words, in order.
+- "proper_nouns": the gloss words that are proper nouns (names of people, places, brands, etc.).
+- "senses": for each candidate word that appears in your gloss, the number of its most appropriate meaning in the sentence.
+
+Example:
+Input Sentence: "My name is Brand and I work at the bank."
+Candidates:
+bank: 1. a financial institution 2. the land alongside a river
+
+Output:
+{"gloss": ["MY", "NAME", "BRAND", "ME", "WORK", "BANK"], "proper_nouns": ["BRAND"], "senses": {"bank": 1}}"""
\ No newline at end of file
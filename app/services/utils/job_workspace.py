@@ -0,0 +1,234 @@
+import os
+import re
+import json
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from app.config import (
+    TEMP_VIDEO_PATH, MERGED_VIDEO_FILENAME, OUTPUT_VIDEO_FILENAME,
+    JOB_MAX_AGE_SECONDS, JOB_DISK_QUOTA_BYTES, JOB_GC_INTERVAL_SECONDS
+)
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+CLIPS_MANIFEST_FILENAME = "clips.json"
+
+_active_jobs = {}
+_lock = threading.Lock()
+_gc_thread = None
+
+def is_valid_job_id(job_id):
+    """
+    Checks whether a job ID has the expected format.
+
+    Args:
+        job_id (str): The job ID to check.
+
+    Returns:
+        bool: True if the job ID is well-formed, False otherwise.
+    """
+    return isinstance(job_id, str) and bool(JOB_ID_PATTERN.match(job_id))
+
+def get_job_dir(job_id):
+    """
+    Returns the workspace directory of a job.
+
+    Args:
+        job_id (str): The job ID.
+
+    Returns:
+        str: The path to the job workspace directory.
+
+    Raises:
+        ValueError: If the job ID is malformed.
+    """
+    if not is_valid_job_id(job_id):
+        raise ValueError(f"Invalid job ID: {job_id}")
+    return os.path.normpath(os.path.join(TEMP_VIDEO_PATH, job_id))
+
+def get_merged_video_path(job_id):
+    """Returns the path of the merged sign video of a job."""
+    return os.path.normpath(os.path.join(get_job_dir(job_id), MERGED_VIDEO_FILENAME))
+
+def get_output_video_path(job_id):
+    """Returns the path of the pose output video of a job."""
+    return os.path.normpath(os.path.join(get_job_dir(job_id), OUTPUT_VIDEO_FILENAME))
+
+def save_job_clips(job_id, video_paths):
+    """
+    Records the ordered library clips that make up the merged video of a job.
+
+    Args:
+        job_id (str): The job ID.
+        video_paths (list): The clip paths, in playback order.
+    """
+    with open(os.path.join(get_job_dir(job_id), CLIPS_MANIFEST_FILENAME), "w") as f:
+        json.dump(video_paths, f)
+
+def load_job_clips(job_id):
+    """
+    Loads the ordered library clips recorded for a job.
+
+    Args:
+        job_id (str): The job ID.
+
+    Returns:
+        list: The clip paths, or None if none were recorded.
+    """
+    try:
+        with open(os.path.join(get_job_dir(job_id), CLIPS_MANIFEST_FILENAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def create_job():
+    """
+    Creates a new job workspace under the temporary video directory.
+
+    Returns:
+        str: The ID of the new job.
+    """
+    job_id = uuid.uuid4().hex
+    os.makedirs(get_job_dir(job_id), exist_ok=True)
+    return job_id
+
+def job_exists(job_id):
+    """
+    Checks whether the workspace of a job still exists.
+
+    Args:
+        job_id (str): The job ID.
+
+    Returns:
+        bool: True if the job ID is valid and its workspace exists.
+    """
+    return is_valid_job_id(job_id) and os.path.isdir(get_job_dir(job_id))
+
+def remove_job(job_id):
+    """
+    Deletes the workspace of a job.
+
+    Args:
+        job_id (str): The job ID.
+    """
+    shutil.rmtree(get_job_dir(job_id), ignore_errors=True)
+
+@contextmanager
+def use_job(job_id):
+    """
+    Marks a job as in use so the garbage collector leaves its workspace alone.
+
+    Args:
+        job_id (str): The job ID.
+
+    Yields:
+        str: The job workspace directory.
+    """
+    job_dir = get_job_dir(job_id)
+    with _lock:
+        _active_jobs[job_id] = _active_jobs.get(job_id, 0) + 1
+    try:
+        yield job_dir
+    finally:
+        with _lock:
+            _active_jobs[job_id] -= 1
+            if not _active_jobs[job_id]:
+                del _active_jobs[job_id]
+        if os.path.isdir(job_dir):
+            os.utime(job_dir)
+
+def _dir_size(path):
+    """Returns the total size in bytes of the files in a directory."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+def _list_jobs():
+    """
+    Lists the job workspaces on disk.
+
+    Returns:
+        list: List of (job_id, last_modified, size_in_bytes) tuples, oldest first.
+    """
+    if not os.path.isdir(TEMP_VIDEO_PATH):
+        return []
+
+    jobs = []
+    for entry in os.scandir(TEMP_VIDEO_PATH):
+        if entry.is_dir() and is_valid_job_id(entry.name):
+            try:
+                last_modified = entry.stat().st_mtime
+            except OSError:
+                continue
+            jobs.append((entry.name, last_modified, _dir_size(entry.path)))
+    return sorted(jobs, key=lambda job: job[1])
+
+def collect_garbage(max_age=JOB_MAX_AGE_SECONDS, disk_quota=JOB_DISK_QUOTA_BYTES):
+    """
+    Evicts job workspaces that are too old, then the oldest remaining ones until
+    the total size fits within the disk quota. Jobs in use are never evicted.
+
+    Args:
+        max_age (float): Maximum age of a job workspace in seconds.
+        disk_quota (int): Maximum total size of all job workspaces in bytes.
+
+    Returns:
+        list: The IDs of the evicted jobs.
+    """
+    now = time.time()
+    with _lock:
+        active_jobs = set(_active_jobs)
+
+    evicted = []
+    remaining = []
+    for job_id, last_modified, size in _list_jobs():
+        if job_id in active_jobs:
+            remaining.append((job_id, size))
+        elif now - last_modified > max_age:
+            remove_job(job_id)
+            evicted.append(job_id)
+        else:
+            remaining.append((job_id, size))
+
+    total_size = sum(size for _, size in remaining)
+    for job_id, size in remaining:
+        if total_size <= disk_quota:
+            break
+        if job_id in active_jobs:
+            continue
+        remove_job(job_id)
+        evicted.append(job_id)
+        total_size -= size
+
+    return evicted
+
+def _garbage_collector_loop(interval):
+    """Runs the garbage collector periodically."""
+    while True:
+        try:
+            evicted = collect_garbage()
+            if evicted:
+                print(f"Evicted {len(evicted)} job workspace(s)")
+        except Exception as e:
+            print(f"Job garbage collection error: {e}")
+        time.sleep(interval)
+
+def start_garbage_collector(interval=JOB_GC_INTERVAL_SECONDS):
+    """
+    Starts the background job garbage collector, if it is not already running.
+
+    Args:
+        interval (float): Seconds between garbage collection runs.
+    """
+    global _gc_thread
+    with _lock:
+        if _gc_thread is not None and _gc_thread.is_alive():
+            return
+        _gc_thread = threading.Thread(target=_garbage_collector_loop, args=(interval,), daemon=True)
+        _gc_thread.start()
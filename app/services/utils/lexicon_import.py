@@ -0,0 +1,243 @@
+import csv
+import json
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+from app.config import IMPORT_BATCH_SIZE
+
+CSV_COLUMNS = ("words", "meaning", "video_url")
+MAX_WORD_LENGTH = 100
+
+class LexiconImportError(ValueError):
+    """Raised when an import file cannot be read at all."""
+
+def split_words(words):
+    """
+    Normalizes the words of a record the way the admin form does: lowercased,
+    stripped and without duplicates.
+
+    Args:
+        words (str | list): Comma-separated words, or a list of words.
+
+    Returns:
+        list: The words, in their original order.
+    """
+    if isinstance(words, str):
+        words = words.split(",")
+    if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+        raise ValueError("'words' must be a comma-separated string or a list of strings")
+    normalized = []
+    for word in words:
+        word = word.strip().lower()
+        if word and word not in normalized:
+            normalized.append(word)
+    return normalized
+
+def validate_record(record):
+    """
+    Checks a record and converts it to a lexicon document.
+
+    Args:
+        record (dict): A record with "words" and "definitions", each definition
+            having a "meaning" and optionally a "video_url".
+
+    Returns:
+        dict: The document to store.
+
+    Raises:
+        ValueError: If the record is invalid.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+
+    words = split_words(record.get("words", ""))
+    if not words:
+        raise ValueError("Record has no words")
+    too_long = [word for word in words if len(word) > MAX_WORD_LENGTH]
+    if too_long:
+        raise ValueError(f"Word longer than {MAX_WORD_LENGTH} characters: {too_long[0][:20]}...")
+
+    definitions = record.get("definitions")
+    if not isinstance(definitions, list) or not definitions:
+        raise ValueError("Record has no definitions")
+    cleaned_definitions = []
+    for definition in definitions:
+        if not isinstance(definition, dict):
+            raise ValueError("Definition must be an object")
+        meaning = definition.get("meaning")
+        video_url = definition.get("video_url") or ""
+        if not isinstance(meaning, str) or not meaning.strip():
+            raise ValueError("Definition has no meaning")
+        if not isinstance(video_url, str) or (video_url and not video_url.startswith(("http://", "https://"))):
+            raise ValueError(f"Invalid video URL: {video_url}")
+        cleaned_definitions.append({"meaning": meaning.strip(), "video_url": video_url.strip()})
+
+    return {"words": words, "definitions": cleaned_definitions}
+
+def read_csv_records(lines):
+    """
+    Reads records from CSV with the columns "words", "meaning" and "video_url",
+    one definition per row. Rows with the same words become one record.
+
+    Args:
+        lines (iterable): The lines of the file.
+
+    Returns:
+        list: (line number, record) tuples.
+
+    Raises:
+        LexiconImportError: If a column is missing.
+    """
+    reader = csv.DictReader(lines)
+    missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise LexiconImportError(f"Missing CSV column(s): {', '.join(missing)}")
+
+    records = {}
+    for row in reader:
+        key = tuple(split_words(row.get("words") or ""))
+        _, record = records.setdefault(key, (reader.line_num, {"words": row.get("words") or "", "definitions": []}))
+        record["definitions"].append({"meaning": row.get("meaning"), "video_url": row.get("video_url")})
+    return list(records.values())
+
+def read_jsonl_records(lines):
+    """
+    Reads records from JSON Lines, one document per line.
+
+    Args:
+        lines (iterable): The lines of the file.
+
+    Returns:
+        list: (line number, record) tuples. Lines that are not valid JSON are
+        returned as (line number, ValueError) tuples.
+    """
+    records = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            records.append((line_number, json.loads(line)))
+        except ValueError as e:
+            records.append((line_number, ValueError(f"Invalid JSON: {e}")))
+    return records
+
+def read_records(lines, file_format):
+    """
+    Reads the records of an import file.
+
+    Args:
+        lines (iterable): The lines of the file.
+        file_format (str): "csv" or "jsonl".
+
+    Returns:
+        list: (line number, record) tuples.
+
+    Raises:
+        LexiconImportError: If the format is unknown or the file is unreadable.
+    """
+    if file_format == "csv":
+        try:
+            return read_csv_records(lines)
+        except csv.Error as e:
+            raise LexiconImportError(f"Invalid CSV: {e}")
+    if file_format == "jsonl":
+        return read_jsonl_records(lines)
+    raise LexiconImportError(f"Unsupported import format: {file_format}")
+
+def detect_format(filename):
+    """
+    Guesses the format of an import file from its extension.
+
+    Args:
+        filename (str): The file name.
+
+    Returns:
+        str: "csv" or "jsonl", or None if the extension is not recognized.
+    """
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return {"csv": "csv", "jsonl": "jsonl", "ndjson": "jsonl"}.get(extension)
+
+def write_batch(collection, batch, report):
+    """
+    Upserts a batch of documents with one unordered bulk write, recording
+    per-document failures in the report. The words of the documents about to be
+    replaced are added to the report too, so that words a replacement dropped
+    are reloaded, and thereby removed, as well.
+
+    Args:
+        collection (Collection): The MongoDB collection.
+        batch (list): (line number, document) tuples.
+        report (dict): The import report to update.
+    """
+    operations = [ReplaceOne({"words": {"$in": document["words"]}}, document, upsert=True) for _, document in batch]
+    failed_indexes = set()
+    try:
+        batch_words = [word for _, document in batch for word in document["words"]]
+        for replaced in collection.find({"words": {"$in": batch_words}}, {"words": 1}):
+            report["words"].extend(replaced.get("words", []))
+        result = collection.bulk_write(operations, ordered=False)
+        inserted, updated = result.upserted_count, result.matched_count
+    except BulkWriteError as e:
+        details = e.details
+        for error in details.get("writeErrors", []):
+            failed_indexes.add(error["index"])
+            report["failures"].append({"line": batch[error["index"]][0], "error": error.get("errmsg", "Write failed")})
+        inserted, updated = details.get("nUpserted", 0), details.get("nMatched", 0)
+    except Exception as e:
+        for line, _ in batch:
+            report["failures"].append({"line": line, "error": f"Batch failed: {e}"})
+        return
+
+    report["inserted"] += inserted
+    report["updated"] += updated
+    for i, (_, document) in enumerate(batch):
+        if i not in failed_indexes:
+            report["words"].extend(document["words"])
+            report["video_urls"].extend(d["video_url"] for d in document["definitions"] if d["video_url"])
+
+def import_records(collection, records, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Validates records and upserts them into the lexicon in batches.
+
+    A document replaces the existing document sharing any of its words. Records
+    repeating a word of an earlier record in the same import are rejected.
+
+    Args:
+        collection (Collection): The MongoDB collection.
+        records (list): (line number, record) tuples from read_records.
+        batch_size (int, optional): Documents per bulk write.
+
+    Returns:
+        dict: The number of "records" read, of documents "inserted" and
+        "updated", the "failures" as dicts with the "line" and "error", the
+        "words" of the imported and replaced documents and the "video_urls" of
+        the imported documents.
+    """
+    report = {"records": len(records), "inserted": 0, "updated": 0, "failures": [], "words": [], "video_urls": []}
+    seen_words = {}
+    batch = []
+
+    for line, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            document = validate_record(record)
+            repeated = [word for word in document["words"] if word in seen_words]
+            if repeated:
+                raise ValueError(f"Word '{repeated[0]}' already imported from line {seen_words[repeated[0]]}")
+        except ValueError as e:
+            report["failures"].append({"line": line, "error": str(e)})
+            continue
+
+        for word in document["words"]:
+            seen_words[word] = line
+        batch.append((line, document))
+        if len(batch) >= batch_size:
+            write_batch(collection, batch, report)
+            batch = []
+
+    if batch:
+        write_batch(collection, batch, report)
+    report["failures"].sort(key=lambda failure: failure["line"])
+    report["words"] = list(dict.fromkeys(report["words"]))
+    report["video_urls"] = list(dict.fromkeys(report["video_urls"]))
+    return report
@@ -0,0 +1,203 @@
+import time
+import threading
+from app.services.utils.mongo_utils import fetch_document
+from app.services.utils.video_utils import construct_video_path
+from app.services.utils.tracing import span, count
+from app.config import LEXICON_REFRESH_SECONDS
+
+class LexiconIndex:
+    """
+    In-memory copy of the lexicon collection, keyed by word.
+
+    Every document is loaded up front, including the single-letter documents used
+    for fingerspelling, so lookups never hit MongoDB. The index is kept fresh by a
+    change stream when the deployment supports one, and by a periodic reload otherwise.
+    """
+
+    def __init__(self, collection, refresh_seconds=LEXICON_REFRESH_SECONDS):
+        """
+        Args:
+            collection (Collection): The MongoDB collection backing the index.
+            refresh_seconds (float, optional): Maximum age of the index before it is reloaded.
+        """
+        self.collection = collection
+        self.refresh_seconds = refresh_seconds
+        self.loaded_at = 0.0
+        self.version = 0
+        self._documents = {}
+        self._words_by_id = {}
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._watcher = None
+
+    @staticmethod
+    def _prepare_document(document):
+        """Resolves the local video path of every definition of a document."""
+        document = dict(document)
+        document["definitions"] = [
+            {**definition, "video_path": construct_video_path(definition.get("video_url"))}
+            for definition in document.get("definitions", [])
+        ]
+        return document
+
+    def load(self):
+        """
+        Loads every document of the collection into the index.
+
+        Returns:
+            int: The number of words in the index.
+        """
+        documents = {}
+        words_by_id = {}
+        with span("mongo.load_lexicon"):
+            count("mongo_queries")
+            for document in self.collection.find({}, {"words": 1, "definitions": 1}):
+                document = self._prepare_document(document)
+                words_by_id[document["_id"]] = list(document.get("words", []))
+                for word in document.get("words", []):
+                    documents[word] = document
+
+        with self._lock:
+            self._documents = documents
+            self._words_by_id = words_by_id
+            self.loaded_at = time.time()
+            self.version += 1
+        print(f"Lexicon index loaded with {len(documents)} words")
+        return len(documents)
+
+    def upsert(self, document):
+        """
+        Adds or replaces a document in the index.
+
+        Args:
+            document (dict): The full MongoDB document, including its _id.
+        """
+        document = self._prepare_document(document)
+        with self._lock:
+            for word in self._words_by_id.get(document["_id"], []):
+                if self._documents.get(word, {}).get("_id") == document["_id"]:
+                    del self._documents[word]
+            self._words_by_id[document["_id"]] = list(document.get("words", []))
+            for word in document.get("words", []):
+                self._documents[word] = document
+            self.version += 1
+
+    def remove(self, document_id):
+        """
+        Removes a document from the index.
+
+        Args:
+            document_id: The _id of the removed document.
+        """
+        with self._lock:
+            for word in self._words_by_id.pop(document_id, []):
+                if self._documents.get(word, {}).get("_id") == document_id:
+                    del self._documents[word]
+            self.version += 1
+
+    def reload_documents(self, words):
+        """
+        Re-reads the documents containing any of the given words from MongoDB.
+        Words no document contains any more are removed from the index.
+
+        Args:
+            words (list): The words whose documents changed, including words
+                that replaced documents used to have.
+        """
+        count("mongo_queries")
+        words = set(words)
+        for document in self.collection.find({"words": {"$in": list(words)}}, {"words": 1, "definitions": 1}):
+            self.upsert(document)
+            words.difference_update(document.get("words", []))
+        if words:
+            with self._lock:
+                for word in words:
+                    self._documents.pop(word, None)
+                self.version += 1
+
+    def get(self, word):
+        """
+        Looks up the document of a word.
+
+        Args:
+            word (str): The word to look up.
+
+        Returns:
+            dict: The document, or None if the word is not in the lexicon.
+        """
+        self._refresh_if_stale()
+        count("lexicon_lookups")
+        return self._documents.get(word)
+
+    def words(self):
+        """Returns every word in the index."""
+        return list(self._documents)
+
+    def get_version(self):
+        """
+        Returns the version of the index, which changes whenever its contents do.
+        Starts a background reload once the index is older than the refresh interval.
+
+        Returns:
+            int: The index version.
+        """
+        self._refresh_if_stale()
+        return self.version
+
+    def _refresh_if_stale(self):
+        """Reloads the index in the background once it is older than the refresh interval."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        if time.time() - self.loaded_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self):
+        """Reloads the index, keeping the old contents if the reload fails."""
+        try:
+            self.load()
+        except Exception as e:
+            print(f"Error refreshing lexicon index: {e}")
+        finally:
+            self._refreshing = False
+
+    def _watch(self):
+        """Applies changes from the collection change stream to the index."""
+        try:
+            with self.collection.watch(full_document="updateLookup") as stream:
+                for change in stream:
+                    operation = change.get("operationType")
+                    if operation in ("insert", "replace", "update") and change.get("fullDocument"):
+                        self.upsert(change["fullDocument"])
+                    elif operation == "delete":
+                        self.remove(change["documentKey"]["_id"])
+                    elif operation in ("drop", "invalidate"):
+                        self.load()
+        except Exception as e:
+            print(f"Lexicon change stream unavailable, falling back to periodic reload: {e}")
+
+    def start_watching(self):
+        """Starts following the collection change stream in a background thread."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._watcher = threading.Thread(target=self._watch, daemon=True)
+        self._watcher.start()
+
+def lookup_document(source, key):
+    """
+    Fetches the document of a word from a lexicon index or a MongoDB collection.
+
+    Args:
+        source (LexiconIndex | Collection): Where to look the word up.
+        key (str): The word to look up.
+
+    Returns:
+        dict: The document found, or None if no document matches the key.
+    """
+    if isinstance(source, LexiconIndex):
+        return source.get(key)
+    return fetch_document(source, key)
@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from app.config import LLM_CACHE_DB_PATH, LLM_CACHE_MEMORY_ENTRIES
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_connection = None
+_stats = {}
+
+def make_cache_key(model, messages, temperature, top_p, max_tokens):
+    """
+    Computes a canonical hash of the parameters that determine an LLM response.
+
+    Args:
+        model (str): The model name.
+        messages (list): The chat messages.
+        temperature (float): The sampling temperature.
+        top_p (float): The nucleus sampling probability.
+        max_tokens (int): The maximum number of tokens to generate.
+
+    Returns:
+        str: The hex digest identifying the request.
+    """
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "top_p": top_p,
+        "max_tokens": max_tokens
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+def _get_connection():
+    """Opens the SQLite tier on first use, dropping expired responses."""
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(LLM_CACHE_DB_PATH) or ".", exist_ok=True)
+        _connection = sqlite3.connect(LLM_CACHE_DB_PATH, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        _connection.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        _connection.commit()
+    return _connection
+
+def _record(site, outcome):
+    """Counts a lookup outcome ("memory_hits", "disk_hits" or "misses") for a call site."""
+    with _lock:
+        site_stats = _stats.setdefault(site, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        site_stats[outcome] += 1
+
+def _remember(key, response, expires_at):
+    """Stores a response in the in-memory tier, evicting the least recently used one."""
+    _memory[key] = (response, expires_at)
+    _memory.move_to_end(key)
+    while len(_memory) > LLM_CACHE_MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+def get_cached_response(key, site):
+    """
+    Looks up a cached response, first in memory and then on disk.
+
+    Args:
+        key (str): The cache key.
+        site (str): The call site, used for statistics.
+
+    Returns:
+        str: The cached response, or None on a miss.
+    """
+    now = time.time()
+    with _lock:
+        entry = _memory.get(key)
+        if entry and entry[1] > now:
+            _memory.move_to_end(key)
+            response = entry[0]
+        else:
+            _memory.pop(key, None)
+            response = None
+    if response is not None:
+        _record(site, "memory_hits")
+        return response
+
+    try:
+        with _lock:
+            row = _get_connection().execute(
+                "SELECT response, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row:
+                _remember(key, row[0], row[1])
+    except sqlite3.Error as e:
+        print(f"LLM cache read error: {e}")
+        row = None
+
+    if row:
+        _record(site, "disk_hits")
+        return row[0]
+    _record(site, "misses")
+    return None
+
+def store_response(key, response, ttl):
+    """
+    Stores a response in both cache tiers.
+
+    Args:
+        key (str): The cache key.
+        response (str): The LLM response.
+        ttl (float): Seconds the response stays valid.
+    """
+    expires_at = time.time() + ttl
+    with _lock:
+        _remember(key, response, expires_at)
+        try:
+            connection = _get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires_at) VALUES (?, ?, ?)",
+                (key, response, expires_at)
+            )
+            connection.commit()
+        except sqlite3.Error as e:
+            print(f"LLM cache write error: {e}")
+
+def get_llm_cache_stats():
+    """
+    Returns the hit and miss counts of this process per call site, with hit rates.
+
+    Returns:
+        dict: Statistics per call site, plus a "total" entry.
+    """
+    with _lock:
+        stats = {site: dict(counts) for site, counts in _stats.items()}
+        memory_entries = len(_memory)
+
+    total = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+    for counts in stats.values():
+        for outcome in total:
+            total[outcome] += counts[outcome]
+    stats["total"] = total
+
+    for counts in stats.values():
+        lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+        counts["hit_rate"] = (counts["memory_hits"] + counts["disk_hits"]) / lookups if lookups else 0.0
+    total["memory_entries"] = memory_entries
+    return stats
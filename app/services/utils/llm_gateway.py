@@ -0,0 +1,374 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from huggingface_hub import InferenceClient
+from app.config import (
+    HUGGINGFACE_TOKEN, LLM_MODEL_NAME, LLM_BASE_URL, LLM_DEADLINE_SECONDS, LLM_ATTEMPT_TIMEOUT_SECONDS, LLM_MAX_RETRIES,
+    LLM_RETRY_BACKOFF_SECONDS, LLM_HEDGE_AFTER_SECONDS, LLM_MAX_CONCURRENCY, LLM_BREAKER_FAILURES,
+    LLM_BREAKER_RESET_SECONDS
+)
+
+class LLMGatewayError(Exception):
+    """Raised when the language model could not produce a response."""
+
+class LLMTimeoutError(LLMGatewayError):
+    """Raised when a call ran out of its deadline."""
+
+class LLMUnavailableError(LLMGatewayError):
+    """Raised when the circuit breaker is open or the concurrency limit was not freed in time."""
+
+class LLMBusyError(LLMUnavailableError):
+    """Raised when no local concurrency slot freed up in time. Says nothing about the upstream."""
+
+def get_status_code(error):
+    """Returns the HTTP status code of an upstream error, or None if it has none."""
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+def is_retryable(error):
+    """
+    Checks whether a failed attempt is worth retrying. Client errors other than
+    timeouts and rate limiting would fail again with the same request.
+
+    Args:
+        error (Exception): The error of the attempt.
+
+    Returns:
+        bool: True if the call should be retried.
+    """
+    status_code = get_status_code(error)
+    return status_code is None or status_code >= 500 or status_code in (408, 429)
+
+def is_upstream_failure(error):
+    """
+    Checks whether a failed attempt says the upstream is unhealthy, as opposed to
+    this one request being bad. Rejected credentials fail every call, so they
+    count against the upstream like server errors do.
+
+    Args:
+        error (Exception): The error of the attempt.
+
+    Returns:
+        bool: True if the failure should count towards opening the circuit breaker.
+    """
+    return isinstance(error, LLMGatewayError) or is_retryable(error) or get_status_code(error) in (401, 403)
+
+class CircuitBreaker:
+    """
+    Rejects calls for a while after several consecutive failures, so that a
+    failing upstream is not hammered and requests fail fast. After the reset
+    period one trial call is let through; its outcome closes or reopens the breaker.
+    """
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, reset_seconds=LLM_BREAKER_RESET_SECONDS):
+        """
+        Args:
+            failure_threshold (int, optional): Consecutive failures that open the breaker.
+            reset_seconds (float, optional): How long the breaker stays open.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """The breaker state: "closed", "open" or "half_open"."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                return "open"
+            return "half_open"
+
+    def allow(self):
+        """
+        Checks whether a call may go ahead.
+
+        Returns:
+            bool: False while the breaker is open or a trial call is running.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        """Closes the breaker."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        """Counts a failure, opening the breaker at the threshold or after a failed trial call."""
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release_trial(self):
+        """Lets another trial call through when the current one never reached the upstream."""
+        with self._lock:
+            self._trial_running = False
+
+class LLMGateway:
+    """
+    Sends chat completion requests to the language model with a deadline per
+    call, jittered exponential retries, optional hedged duplicate requests, a
+    limit on requests in flight and a circuit breaker.
+    """
+
+    def __init__(
+        self,
+        base_url=LLM_BASE_URL,
+        deadline_seconds=LLM_DEADLINE_SECONDS,
+        attempt_timeout_seconds=LLM_ATTEMPT_TIMEOUT_SECONDS,
+        max_retries=LLM_MAX_RETRIES,
+        backoff_seconds=LLM_RETRY_BACKOFF_SECONDS,
+        hedge_after_seconds=LLM_HEDGE_AFTER_SECONDS,
+        max_concurrency=LLM_MAX_CONCURRENCY,
+        breaker=None
+    ):
+        """
+        Args:
+            base_url (str, optional): An OpenAI-compatible endpoint to use instead of the Hugging Face API.
+            deadline_seconds (float, optional): Time budget of one call, retries included.
+            attempt_timeout_seconds (float, optional): Timeout of a single upstream request.
+            max_retries (int, optional): Retries after a failed attempt.
+            backoff_seconds (float, optional): Base delay between retries.
+            hedge_after_seconds (float, optional): Delay before a duplicate request is sent, 0 to disable.
+            max_concurrency (int, optional): Upstream requests allowed in flight at once.
+            breaker (CircuitBreaker, optional): The circuit breaker to use.
+        """
+        self.base_url = base_url
+        self.deadline_seconds = deadline_seconds
+        self.attempt_timeout_seconds = attempt_timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.hedge_after_seconds = hedge_after_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._client = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0, "failures": 0, "attempts": 0, "retries": 0, "hedges": 0,
+            "hedge_wins": 0, "timeouts": 0, "rejected": 0
+        }
+
+    def _count(self, name, amount=1):
+        """Increments a statistics counter."""
+        with self._lock:
+            self._stats[name] += amount
+
+    def _get_client(self):
+        """Creates the inference client on first use. Its HTTP session is shared by all calls."""
+        with self._lock:
+            if self._client is None:
+                if self.base_url:
+                    self._client = InferenceClient(base_url=self.base_url, timeout=self.attempt_timeout_seconds)
+                else:
+                    self._client = InferenceClient(token=HUGGINGFACE_TOKEN(), timeout=self.attempt_timeout_seconds)
+            return self._client
+
+    def _acquire_slot(self, timeout):
+        """Waits for a free concurrency slot, raising LLMBusyError when none frees up in time."""
+        if not self._slots.acquire(timeout=max(0, timeout)):
+            self._count("rejected")
+            raise LLMBusyError("Too many LLM requests in flight")
+
+    def _submit(self, request):
+        """Sends one request on a worker thread that already holds a concurrency slot."""
+        def send():
+            try:
+                self._count("attempts")
+                response = self._get_client().chat.completions.create(**request, stream=False)
+                return response["choices"][0]["message"]["content"].strip()
+            finally:
+                self._slots.release()
+        return self._executor.submit(send)
+
+    def _attempt(self, request, deadline):
+        """
+        Runs one attempt, sending a hedged duplicate if the first request is slow
+        and a concurrency slot is free, and returns the first successful response.
+        """
+        self._acquire_slot(deadline - time.monotonic())
+        primary = self._submit(request)
+        futures = [primary]
+        hedge_at = time.monotonic() + self.hedge_after_seconds if self.hedge_after_seconds else None
+        error = None
+
+        while futures:
+            wake_at = min(deadline, hedge_at) if hedge_at else deadline
+            done, _ = wait(futures, timeout=max(0, wake_at - time.monotonic()), return_when=FIRST_COMPLETED)
+            for future in done:
+                futures.remove(future)
+                try:
+                    content = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is not primary:
+                    self._count("hedge_wins")
+                return content
+
+            if hedge_at and time.monotonic() >= hedge_at and futures:
+                hedge_at = None
+                if self._slots.acquire(blocking=False):
+                    self._count("hedges")
+                    futures.append(self._submit(request))
+            elif time.monotonic() >= deadline:
+                self._count("timeouts")
+                raise LLMTimeoutError(f"No LLM response within {self.deadline_seconds}s")
+
+        raise error
+
+    def _backoff(self, retry, deadline):
+        """Sleeps for a jittered exponential delay, cut short by the deadline."""
+        delay = self.backoff_seconds * (2 ** retry) * random.uniform(0.5, 1.5)
+        time.sleep(max(0, min(delay, deadline - time.monotonic())))
+
+    def complete(self, messages, temperature=0.5, max_tokens=50, top_p=0.7):
+        """
+        Queries the language model, retrying failed attempts until the deadline.
+
+        Args:
+            messages (list): The chat messages.
+            temperature (float, optional): The sampling temperature.
+            max_tokens (int, optional): The maximum number of tokens to generate.
+            top_p (float, optional): The nucleus sampling probability.
+
+        Returns:
+            str: The generated text.
+
+        Raises:
+            LLMGatewayError: If no response was produced.
+        """
+        self._count("calls")
+        request = {"messages": messages, "temperature": temperature, "max_tokens": max_tokens, "top_p": top_p}
+        if not self.base_url:
+            request["model"] = LLM_MODEL_NAME
+        deadline = time.monotonic() + self.deadline_seconds
+
+        for retry in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._count("failures")
+                self._count("rejected")
+                raise LLMUnavailableError("LLM circuit breaker is open")
+            try:
+                content = self._attempt(request, deadline)
+            except LLMBusyError:
+                # Local overload is not an upstream failure, so it neither trips the breaker nor is retried
+                self.breaker.release_trial()
+                self._count("failures")
+                raise
+            except Exception as e:
+                retryable = isinstance(e, LLMGatewayError) or is_retryable(e)
+                if is_upstream_failure(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                print(f"LLM attempt {retry + 1} failed: {e}")
+                if not retryable or retry == self.max_retries or time.monotonic() >= deadline:
+                    self._count("failures")
+                    if isinstance(e, LLMGatewayError):
+                        raise
+                    raise LLMGatewayError(f"LLM request failed: {e}") from e
+                self._count("retries")
+                self._backoff(retry, deadline)
+                continue
+            self.breaker.record_success()
+            return content
+
+    def stream(self, messages, temperature=0.5, max_tokens=50, top_p=0.7):
+        """
+        Queries the language model and yields the generated text as it arrives.
+        Attempts that fail before the first piece are retried; once text has been
+        yielded a failure is raised, since the caller has already used it.
+
+        Args:
+            messages (list): The chat messages.
+            temperature (float, optional): The sampling temperature.
+            max_tokens (int, optional): The maximum number of tokens to generate.
+            top_p (float, optional): The nucleus sampling probability.
+
+        Yields:
+            str: The next piece of generated text.
+
+        Raises:
+            LLMGatewayError: If no complete response was produced.
+        """
+        self._count("calls")
+        request = {"messages": messages, "temperature": temperature, "max_tokens": max_tokens, "top_p": top_p}
+        if not self.base_url:
+            request["model"] = LLM_MODEL_NAME
+        deadline = time.monotonic() + self.deadline_seconds
+
+        for retry in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._count("failures")
+                self._count("rejected")
+                raise LLMUnavailableError("LLM circuit breaker is open")
+            started = False
+            try:
+                self._acquire_slot(deadline - time.monotonic())
+                try:
+                    self._count("attempts")
+                    for chunk in self._get_client().chat.completions.create(**request, stream=True):
+                        if time.monotonic() >= deadline:
+                            self._count("timeouts")
+                            raise LLMTimeoutError(f"LLM stream exceeded {self.deadline_seconds}s")
+                        if not chunk.choices:
+                            continue
+                        piece = chunk.choices[0].delta.content
+                        if piece:
+                            started = True
+                            yield piece
+                finally:
+                    self._slots.release()
+            except GeneratorExit:
+                self.breaker.record_success()
+                raise
+            except LLMBusyError:
+                self.breaker.release_trial()
+                self._count("failures")
+                raise
+            except Exception as e:
+                retryable = isinstance(e, LLMGatewayError) or is_retryable(e)
+                if is_upstream_failure(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                print(f"LLM stream attempt {retry + 1} failed: {e}")
+                if started or not retryable or retry == self.max_retries or time.monotonic() >= deadline:
+                    self._count("failures")
+                    if isinstance(e, LLMGatewayError):
+                        raise
+                    raise LLMGatewayError(f"LLM stream failed: {e}") from e
+                self._count("retries")
+                self._backoff(retry, deadline)
+                continue
+            self.breaker.record_success()
+            return
+
+    def get_stats(self):
+        """
+        Returns the call, retry, hedge and failure counts and the breaker state.
+
+        Returns:
+            dict: The gateway statistics.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["breaker"] = self.breaker.state
+        return stats
+
+gateway = LLMGateway()
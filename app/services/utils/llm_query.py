@@ -1,9 +1,10 @@
-from huggingface_hub import InferenceClient
-from app.config import HUGGINGFACE_TOKEN, LLM_MODEL_NAME
+import time
+from app.services.utils.llm_cache import make_cache_key, get_cached_response, store_response
+from app.services.utils.llm_gateway import gateway
+from app.services.utils.tracing import span, count, record_span
+from app.config import LLM_MODEL_NAME, LLM_CACHE_TTLS
 
-client = InferenceClient(token=HUGGINGFACE_TOKEN())
-
-def query_llm(messages, temperature=0.5, max_tokens=50, top_p=0.7):
+def query_llm(messages, temperature=0.5, max_tokens=50, top_p=0.7, cache_site=None):
     """
     Queries the language model with the provided messages and parameters.
 
@@ -12,20 +13,71 @@ def query_llm(messages, temperature=0.5, max_tokens=50, top_p=0.7):
         temperature: The sampling temperature.
         max_tokens: The maximum number of tokens to generate.
         top_p: The nucleus sampling probability.
+        cache_site: The call site name in LLM_CACHE_TTLS. When given, identical
+            requests are answered from the response cache until the site's TTL expires.
 
     Returns:
         The generated text from the language model.
+
+    Raises:
+        LLMGatewayError: If the language model did not respond before the deadline,
+            failed on every retry or is behind an open circuit breaker.
     """
+    with span(f"llm.{cache_site or 'query'}"):
+        cache_key = None
+        if cache_site in LLM_CACHE_TTLS:
+            cache_key = make_cache_key(LLM_MODEL_NAME, messages, temperature, top_p, max_tokens)
+            cached_response = get_cached_response(cache_key, cache_site)
+            if cached_response is not None:
+                count("llm_cache_hits")
+                return cached_response
+
+        count("llm_calls")
+        content = gateway.complete(messages, temperature=temperature, max_tokens=max_tokens, top_p=top_p)
+        if cache_key and content:
+            store_response(cache_key, content, LLM_CACHE_TTLS[cache_site])
+        return content
+
+
+def stream_llm(messages, temperature=0.5, max_tokens=50, top_p=0.7, cache_site=None):
+    """
+    Queries the language model and yields the generated text as it arrives.
+
+    Args:
+        messages: The messages to send to the language model.
+        temperature: The sampling temperature.
+        max_tokens: The maximum number of tokens to generate.
+        top_p: The nucleus sampling probability.
+        cache_site: The call site name in LLM_CACHE_TTLS. A cached response is
+            yielded in one piece, and a completed stream is stored in the cache.
+
+    Yields:
+        str: The next piece of generated text.
+
+    Raises:
+        LLMGatewayError: If the language model did not produce a complete response.
+    """
+    # A generator may be resumed in a different context, so the stage is
+    # recorded when it finishes instead of being opened as a span
+    started = time.perf_counter()
+    stage = f"llm.{cache_site or 'query'}.stream"
+    cache_key = None
+    if cache_site in LLM_CACHE_TTLS:
+        cache_key = make_cache_key(LLM_MODEL_NAME, messages, temperature, top_p, max_tokens)
+        cached_response = get_cached_response(cache_key, cache_site)
+        if cached_response is not None:
+            record_span(stage, time.perf_counter() - started, {"llm_cache_hits": 1})
+            yield cached_response
+            return
+
+    pieces = []
     try:
-        response = client.chat.completions.create(
-            model=LLM_MODEL_NAME,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            top_p=top_p,
-            stream=False
-        )
-        return response["choices"][0]["message"]["content"].strip()
-    except Exception as e:
-        print(f"Error querying LLM: {e}")
-        return ""
+        for piece in gateway.stream(messages, temperature=temperature, max_tokens=max_tokens, top_p=top_p):
+            pieces.append(piece)
+            yield piece
+    finally:
+        record_span(stage, time.perf_counter() - started, {"llm_calls": 1})
+
+    content = "".join(pieces).strip()
+    if cache_key and content:
+        store_response(cache_key, content, LLM_CACHE_TTLS[cache_site])
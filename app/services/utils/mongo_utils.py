@@ -1,4 +1,5 @@
 from pymongo import MongoClient
+from app.services.utils.tracing import count
 from app.config import MONGODB_URI, DB_NAME, COLLECTION_NAME
 
 def init_mongo_client():
@@ -22,4 +23,15 @@ def fetch_document(collection, key):
     Returns:
         dict: The document found, or None if no document matches the key.
     """
+    count("mongo_queries")
     return collection.find_one({"words": key})
+
+def ensure_indexes(collection):
+    """
+    Creates the indexes the lexicon relies on. Meant to be called once at startup,
+    since creating an index that exists is still a round trip to the server.
+
+    Args:
+        collection (Collection): The MongoDB collection object.
+    """
+    collection.create_index("words", unique=True)
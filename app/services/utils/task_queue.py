@@ -0,0 +1,170 @@
+import time
+import uuid
+import queue
+import threading
+from app.services.utils.tracing import start_trace, clear_trace
+from app.config import TASK_WORKERS, TASK_QUEUE_SIZE, TASK_RESULT_TTL_SECONDS
+
+class QueueBusyError(RuntimeError):
+    """Raised when a task is submitted while the queue is full."""
+
+class TaskQueue:
+    """
+    Runs slow work such as video merging and pose extraction on a bounded pool
+    of worker threads, outside the request threads.
+
+    Tasks are identified by a key describing their work. Submitting a task whose
+    key matches a queued or running task returns that task instead of queuing
+    the same work twice. Finished tasks are kept for TASK_RESULT_TTL_SECONDS so
+    clients can fetch their results.
+    """
+
+    def __init__(self, workers=TASK_WORKERS, max_pending=TASK_QUEUE_SIZE, result_ttl=TASK_RESULT_TTL_SECONDS):
+        """
+        Args:
+            workers (int, optional): Number of worker threads.
+            max_pending (int, optional): Tasks that may wait for a worker before
+                submissions are rejected.
+            result_ttl (float, optional): Seconds finished tasks are kept.
+        """
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._tasks = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        self._stats = {"submitted": 0, "coalesced": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    def start(self):
+        """Starts the worker threads, if they are not already running."""
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for _ in range(self.workers - len(self._threads)):
+                thread = threading.Thread(target=self._work, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, kind, key, function, *args, **kwargs):
+        """
+        Queues a task, or joins the queued or running task with the same key.
+
+        Args:
+            kind (str): The kind of task, e.g. "prepare" or "pose".
+            key (str): Identifies the work; tasks with equal keys are coalesced.
+            function (callable): Computes the result of the task.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            dict: The status of the task, as returned by get().
+
+        Raises:
+            QueueBusyError: If the queue is full.
+        """
+        self.start()
+        with self._lock:
+            self._drop_expired()
+            task_id = self._in_flight.get((kind, key))
+            if task_id is not None:
+                self._tasks[task_id]["coalesced"] += 1
+                self._stats["coalesced"] += 1
+                return self._describe(self._tasks[task_id])
+
+            task = {
+                "id": uuid.uuid4().hex,
+                "kind": kind,
+                "key": key,
+                "status": "queued",
+                "result": None,
+                "error": None,
+                "coalesced": 0,
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "timing": None
+            }
+            try:
+                self._queue.put_nowait((task, function, args, kwargs))
+            except queue.Full:
+                self._stats["rejected"] += 1
+                raise QueueBusyError("Too many videos are being prepared, try again shortly")
+            self._tasks[task["id"]] = task
+            self._in_flight[(kind, key)] = task["id"]
+            self._stats["submitted"] += 1
+            return self._describe(task)
+
+    def get(self, task_id):
+        """
+        Returns the status of a task without waiting for it.
+
+        Args:
+            task_id (str): The task ID.
+
+        Returns:
+            dict: The "id", "kind", "status" ("queued", "running", "done" or
+            "failed"), "result", "error", "coalesced" submissions, "position" in
+            the queue and "timing" of the task, or None if the task is unknown.
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            return self._describe(task)
+
+    def get_stats(self):
+        """Returns the task counters, the queue length and the number of workers."""
+        with self._lock:
+            return {**self._stats, "queued": self._queue.qsize(), "workers": self.workers}
+
+    def _describe(self, task):
+        """Returns the public fields of a task. Must be called with the lock held."""
+        position = None
+        if task["status"] == "queued":
+            queued = [t["id"] for t in self._tasks.values() if t["status"] == "queued"]
+            position = queued.index(task["id"]) if task["id"] in queued else None
+        return {
+            "id": task["id"],
+            "kind": task["kind"],
+            "status": task["status"],
+            "result": task["result"],
+            "error": task["error"],
+            "coalesced": task["coalesced"],
+            "position": position,
+            "timing": task["timing"]
+        }
+
+    def _drop_expired(self):
+        """Forgets finished tasks older than the result TTL. Must be called with the lock held."""
+        now = time.time()
+        expired = [
+            task_id for task_id, task in self._tasks.items()
+            if task["finished_at"] is not None and now - task["finished_at"] > self.result_ttl
+        ]
+        for task_id in expired:
+            del self._tasks[task_id]
+
+    def _work(self):
+        """Runs queued tasks until the process exits."""
+        while True:
+            task, function, args, kwargs = self._queue.get()
+            with self._lock:
+                task["status"] = "running"
+                task["started_at"] = time.time()
+
+            trace = start_trace()
+            try:
+                result, status, error = function(*args, **kwargs), "done", None
+            except Exception as e:
+                print(f"Task {task['id']} ({task['kind']}) failed: {e}")
+                result, status, error = None, "failed", str(e)
+            finally:
+                clear_trace()
+
+            with self._lock:
+                task.update(result=result, status=status, error=error, finished_at=time.time(), timing=trace.to_dict())
+                self._in_flight.pop((task["kind"], task["key"]), None)
+                self._stats["completed" if status == "done" else "failed"] += 1
+            self._queue.task_done()
+
+task_queue = TaskQueue()
@@ -0,0 +1,218 @@
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_current_trace = ContextVar("current_trace", default=None)
+_current_span = ContextVar("current_span", default=None)
+
+class Histogram:
+    """Cumulative histogram of durations per label value, in the Prometheus data model."""
+
+    def __init__(self, name, description, label, buckets=DURATION_BUCKETS):
+        """
+        Args:
+            name (str): The metric name.
+            description (str): The HELP text of the metric.
+            label (str): The name of the label the observations are split by.
+            buckets (tuple, optional): The upper bounds of the buckets, in seconds.
+        """
+        self.name = name
+        self.description = description
+        self.label = label
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, value):
+        """Records one observation."""
+        with self._lock:
+            series = self._series.setdefault(label_value, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        """Returns the histogram in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, series in sorted(self._series.items()):
+                label = f'{self.label}="{escape_label(label_value)}"'
+                for bound, bucket_count in zip(self.buckets, series["buckets"]):
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {series["count"]}')
+                lines.append(f"{self.name}_sum{{{label}}} {series['sum']:.6f}")
+                lines.append(f"{self.name}_count{{{label}}} {series['count']}")
+        return "\n".join(lines)
+
+STAGE_DURATIONS = Histogram("asl_stage_duration_seconds", "Duration of pipeline stages.", "stage")
+REQUEST_DURATIONS = Histogram("asl_http_request_duration_seconds", "Duration of HTTP requests.", "endpoint")
+
+_events = Counter()
+_events_lock = threading.Lock()
+
+def escape_label(value):
+    """Escapes a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Span:
+    """A timed pipeline stage and the events counted while it was the innermost open span."""
+
+    def __init__(self, name, started=None):
+        """
+        Args:
+            name (str): The stage name.
+            started (float, optional): The perf_counter value the stage started at.
+        """
+        self.name = name
+        self.started = time.perf_counter() if started is None else started
+        self.seconds = None
+        self.counts = Counter()
+
+    def to_dict(self):
+        """Returns the span as a JSON-serializable dict."""
+        return {"name": self.name, "ms": round((self.seconds or 0.0) * 1000, 2), "counts": dict(self.counts)}
+
+class Trace:
+    """The spans and event counts of one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def add_span(self, span):
+        """Adds a finished span."""
+        with self._lock:
+            self.spans.append(span)
+
+    def add_count(self, event, amount):
+        """Adds to the count of an event."""
+        with self._lock:
+            self.counts[event] += amount
+
+    def to_dict(self):
+        """
+        Returns the timing breakdown of the request.
+
+        Returns:
+            dict: The "total_ms" since the trace started, the finished "spans" in
+            the order they started, and the "counts" of all events.
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.started)
+            return {
+                "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+                "spans": [span.to_dict() for span in spans],
+                "counts": dict(self.counts)
+            }
+
+def start_trace():
+    """
+    Starts collecting spans for the current request.
+
+    Returns:
+        Trace: The new trace.
+    """
+    trace = Trace()
+    _current_trace.set(trace)
+    _current_span.set(None)
+    return trace
+
+def get_current_trace():
+    """Returns the trace of the current request, or None outside a request."""
+    return _current_trace.get()
+
+def clear_trace():
+    """Stops attributing spans to the trace of the current request."""
+    _current_trace.set(None)
+    _current_span.set(None)
+
+@contextmanager
+def span(name):
+    """
+    Times a pipeline stage. The duration is recorded in the stage histogram and,
+    inside a request, added to the request trace.
+
+    Args:
+        name (str): The stage name.
+
+    Yields:
+        Span: The open span.
+    """
+    current = Span(name)
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        _current_span.reset(token)
+        _finish_span(current, time.perf_counter() - current.started)
+
+def record_span(name, seconds, counts=None):
+    """
+    Records a stage that was timed without span(), e.g. a generator whose
+    execution is spread over several resumptions.
+
+    Args:
+        name (str): The stage name.
+        seconds (float): The duration of the stage.
+        counts (dict, optional): Events counted during the stage.
+    """
+    recorded = Span(name, started=time.perf_counter() - seconds)
+    for event, amount in (counts or {}).items():
+        recorded.counts[event] += amount
+        _count_event(event, amount)
+    _finish_span(recorded, seconds)
+
+def _finish_span(finished, seconds):
+    """Records the duration of a finished span."""
+    finished.seconds = seconds
+    STAGE_DURATIONS.observe(finished.name, seconds)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span(finished)
+
+def _count_event(event, amount):
+    """Adds to the process-wide and request counts of an event."""
+    with _events_lock:
+        _events[event] += amount
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_count(event, amount)
+
+def count(event, amount=1):
+    """
+    Counts an event, such as an LLM call or a processed frame, in the innermost
+    open span, the request trace and the process-wide counters.
+
+    Args:
+        event (str): The event name.
+        amount (int, optional): How many events happened.
+    """
+    if not amount:
+        return
+    current = _current_span.get()
+    if current is not None:
+        current.counts[event] += amount
+    _count_event(event, amount)
+
+def render_metrics():
+    """
+    Returns every histogram and event counter in the Prometheus text format.
+
+    Returns:
+        str: The exposition text.
+    """
+    lines = [STAGE_DURATIONS.render(), REQUEST_DURATIONS.render()]
+    lines.append("# HELP asl_pipeline_events_total Events counted by pipeline stages.")
+    lines.append("# TYPE asl_pipeline_events_total counter")
+    with _events_lock:
+        for event, total in sorted(_events.items()):
+            lines.append(f'asl_pipeline_events_total{{event="{escape_label(event)}"}} {total}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,163 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from app.config import VIDEO_CACHE_PATH, VIDEO_CACHE_MAX_BYTES
+
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+_lock = threading.Lock()
+
+def _record(counter, amount=1):
+    """Increments one of the cache counters."""
+    with _lock:
+        _stats[counter] += amount
+
+def _clip_identity(video_path):
+    """
+    Identifies a clip by its path, size and modification time so that replaced
+    clips produce new cache keys.
+    """
+    try:
+        stat = os.stat(video_path)
+        return [video_path, stat.st_size, stat.st_mtime_ns]
+    except OSError:
+        return [video_path, None, None]
+
+def get_cache_key(kind, video_paths, settings):
+    """
+    Computes the content address of a video made from an ordered list of clips.
+
+    Args:
+        kind (str): The kind of video, e.g. "merged" or "pose".
+        video_paths (list): The clip paths, in playback order.
+        settings (dict): The encode settings that affect the output.
+
+    Returns:
+        str: The hex digest identifying the video.
+    """
+    payload = {
+        "kind": kind,
+        "clips": [_clip_identity(path) for path in video_paths],
+        "settings": settings
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+def get_cache_path(key):
+    """Returns the path of a cache entry."""
+    return os.path.normpath(os.path.join(VIDEO_CACHE_PATH, f"{key}.mp4"))
+
+def fetch_cached_video(key, dest_path):
+    """
+    Places the cached video with the given key at the destination path.
+
+    Args:
+        key (str): The cache key.
+        dest_path (str): Where to place the video.
+
+    Returns:
+        bool: True on a cache hit, False on a miss.
+    """
+    cache_path = get_cache_path(key)
+    try:
+        os.utime(cache_path)  # Mark as recently used
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        try:
+            os.link(cache_path, dest_path)
+        except OSError:
+            shutil.copyfile(cache_path, dest_path)
+    except OSError:
+        _record("misses")
+        return False
+    _record("hits")
+    return True
+
+def store_cached_video(key, src_path, max_bytes=VIDEO_CACHE_MAX_BYTES):
+    """
+    Adds a video to the cache and evicts least recently used entries to stay
+    within the byte budget.
+
+    Args:
+        key (str): The cache key.
+        src_path (str): The path of the video to store.
+        max_bytes (int, optional): The byte budget of the cache.
+    """
+    if not os.path.exists(src_path) or not os.path.getsize(src_path):
+        return
+
+    cache_path = get_cache_path(key)
+    temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    os.makedirs(VIDEO_CACHE_PATH, exist_ok=True)
+    try:
+        shutil.copyfile(src_path, temp_path)
+        os.replace(temp_path, cache_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    _record("stores")
+    evict(max_bytes)
+
+def _list_entries():
+    """
+    Lists the cache entries on disk.
+
+    Returns:
+        list: List of (path, last_used, size_in_bytes) tuples, least recently used first.
+    """
+    if not os.path.isdir(VIDEO_CACHE_PATH):
+        return []
+
+    entries = []
+    for entry in os.scandir(VIDEO_CACHE_PATH):
+        if entry.is_file() and entry.name.endswith(".mp4"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((entry.path, stat.st_mtime, stat.st_size))
+    return sorted(entries, key=lambda entry: entry[1])
+
+def evict(max_bytes=VIDEO_CACHE_MAX_BYTES):
+    """
+    Removes least recently used entries until the cache fits in the byte budget.
+
+    Args:
+        max_bytes (int, optional): The byte budget of the cache.
+
+    Returns:
+        int: The number of evicted entries.
+    """
+    entries = _list_entries()
+    total_size = sum(size for _, _, size in entries)
+    evicted = 0
+    for path, _, size in entries:
+        if total_size <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
+        evicted += 1
+    if evicted:
+        _record("evictions", evicted)
+    return evicted
+
+def get_cache_stats():
+    """
+    Returns the cache counters of this process and the current cache size.
+
+    Returns:
+        dict: Hit, miss, store and eviction counts, hit rate, entry count and size in bytes.
+    """
+    with _lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    entries = _list_entries()
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    stats["entries"] = len(entries)
+    stats["bytes"] = sum(size for _, _, size in entries)
+    stats["max_bytes"] = VIDEO_CACHE_MAX_BYTES
+    return stats
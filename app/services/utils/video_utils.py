@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from app.config import STATIC_VIDEO_PATH
 
 def construct_video_path(video_url):
@@ -16,4 +17,46 @@ def construct_video_path(video_url):
     if "youtube.com" in video_url or "youtu.be" in video_url:
         video_filename = video_url.split('/')[-1] if 'youtu.be' in video_url else video_url.split('v=')[-1]
         return os.path.normpath(os.path.join(STATIC_VIDEO_PATH, f"{video_filename}.mp4"))
-    return os.path.normpath(os.path.join(STATIC_VIDEO_PATH, video_url.split('/')[-1]))
\ No newline at end of file
+    return os.path.normpath(os.path.join(STATIC_VIDEO_PATH, video_url.split('/')[-1]))
+
+def video_path_to_url(video_path):
+    """
+    Converts a video file path under the static folder to the URL it is served at.
+    
+    Args:
+        video_path (str): The file path of the video.
+        
+    Returns:
+        str: The URL of the video.
+    """
+    return "/" + video_path.replace(os.sep, "/")
+
+@lru_cache(maxsize=4096)
+def _read_video_duration(video_path, modified_time):
+    """Reads the duration of a video from its container metadata."""
+    import cv2  # Imported here so that loading the lexicon does not load OpenCV
+    cap = cv2.VideoCapture(video_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+    finally:
+        cap.release()
+    if not fps or not frame_count:
+        return None
+    return round(frame_count / fps, 3)
+
+def get_video_duration(video_path):
+    """
+    Returns the duration of a video, cached until the file changes.
+    
+    Args:
+        video_path (str): The file path of the video.
+        
+    Returns:
+        float: The duration in seconds, or None if it cannot be determined.
+    """
+    try:
+        modified_time = os.path.getmtime(video_path)
+    except OSError:
+        return None
+    return _read_video_duration(video_path, modified_time)
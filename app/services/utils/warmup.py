@@ -0,0 +1,95 @@
+import sys
+import time
+import importlib
+import multiprocessing
+import threading
+from app.config import POSE_WORKERS
+
+HEAVY_MODULES = [
+    "app.services.sign_synthesis.video_matcher",
+    "app.services.sign_synthesis.skeleton_video",
+    "translators",
+    "app.services.speech_to_text.speech_to_text_converter"
+]
+
+_report = {"state": "pending", "modules": {}, "holistic_pool_seconds": None, "pose_workers_seconds": None, "total_seconds": None}
+_lock = threading.Lock()
+
+def _timed(step):
+    """Runs a warm-up step and returns how long it took, or None if it failed."""
+    start_time = time.perf_counter()
+    try:
+        step()
+    except Exception as e:
+        print(f"Warm-up step failed: {e}")
+        return None
+    return time.perf_counter() - start_time
+
+def warm_up():
+    """
+    Imports the media stacks, then starts the pose worker processes or, when pose
+    extraction runs in the request thread, fills the Holistic pool, recording how
+    long each step took.
+    """
+    start_time = time.perf_counter()
+    with _lock:
+        _report["state"] = "running"
+
+    for module_name in HEAVY_MODULES:
+        elapsed = _timed(lambda: importlib.import_module(module_name))
+        with _lock:
+            _report["modules"][module_name] = elapsed
+
+    if POSE_WORKERS > 1:
+        def start_pose_workers():
+            from app.services.sign_synthesis.parallel_pose_extraction import start_workers
+            start_workers(POSE_WORKERS)
+
+        elapsed = _timed(start_pose_workers)
+        with _lock:
+            _report["pose_workers_seconds"] = elapsed
+    else:
+        def fill_holistic_pool():
+            from app.services.sign_synthesis.holistic_pool import holistic_pool
+            holistic_pool.fill()
+
+        elapsed = _timed(fill_holistic_pool)
+        with _lock:
+            _report["holistic_pool_seconds"] = elapsed
+
+    total = time.perf_counter() - start_time
+    with _lock:
+        _report["state"] = "done"
+        _report["total_seconds"] = total
+    print(f"Warm-up completed in {total:.2f}s")
+
+def start_warmup():
+    """
+    Runs the warm-up in a daemon thread, so that the server accepts requests while
+    the media stacks load. Requests that need a module before it is loaded wait
+    for its import to finish. Nothing is started in child processes, such as pose
+    workers that re-import the main module when they are spawned.
+
+    Returns:
+        threading.Thread: The warm-up thread, or None in a child process.
+    """
+    if multiprocessing.parent_process() is not None:
+        return None
+    thread = threading.Thread(target=warm_up, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+def get_warmup_report():
+    """
+    Returns the progress and step timings of the warm-up, with the Holistic pool
+    statistics once the pool has been loaded.
+
+    Returns:
+        dict: The warm-up report.
+    """
+    with _lock:
+        report = {**_report, "modules": dict(_report["modules"])}
+    pool_module = sys.modules.get("app.services.sign_synthesis.holistic_pool")
+    if pool_module is not None:
+        report["holistic_pool"] = pool_module.holistic_pool.get_stats()
+    return report
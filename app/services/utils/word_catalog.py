@@ -0,0 +1,124 @@
+import hashlib
+import threading
+from bisect import bisect_left, bisect_right
+from app.config import WORDS_PAGE_SIZE, WORDS_MAX_PAGE_SIZE
+
+class WordSnapshot:
+    """
+    One version of the sorted word list. Its digest and the pages and searches
+    served from it always describe the same words, however the lexicon changes
+    in the meantime.
+    """
+
+    def __init__(self, keys, words, digest):
+        """
+        Args:
+            keys (list): The (lowercase word, word) sort keys.
+            words (list): The words in sort order.
+            digest (str): A hash of the words, usable as an ETag.
+        """
+        self.keys = keys
+        self.words = words
+        self.digest = digest
+
+    def page(self, cursor=None, limit=None):
+        """
+        Returns the words following a cursor.
+
+        The cursor is the last word of the previous page, so pages stay consistent
+        when words are added or removed between requests.
+
+        Args:
+            cursor (str, optional): The "next_cursor" of the previous page.
+            limit (int, optional): The number of words to return.
+
+        Returns:
+            dict: The "words" of the page, the "next_cursor" (None on the last
+            page) and the "total" number of words.
+        """
+        limit = WordCatalog.clamp_limit(limit)
+        start = bisect_right(self.keys, (cursor.lower(), cursor)) if cursor else 0
+        page = self.words[start:start + limit]
+        next_cursor = page[-1] if page and start + limit < len(self.words) else None
+        return {"words": page, "next_cursor": next_cursor, "total": len(self.words)}
+
+    def search(self, prefix, limit=None):
+        """
+        Finds the words starting with a prefix, ignoring case.
+
+        Args:
+            prefix (str): The prefix to search for.
+            limit (int, optional): The maximum number of words to return.
+
+        Returns:
+            dict: The matching "words" in order and the "total" number of matches.
+        """
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, (prefix, ""))
+        end = bisect_left(self.keys, (prefix + "\U0010ffff", ""), lo=start)
+        limit = WordCatalog.clamp_limit(limit)
+        return {"words": self.words[start:min(end, start + limit)], "total": end - start}
+
+class WordCatalog:
+    """
+    Sorted list of the words in a lexicon index, rebuilt only when the index
+    changes, with keyset pagination and prefix search over it.
+
+    Words are ordered case-insensitively. Prefix search runs two binary searches
+    over the sort keys, which finds the same range a trie would without
+    keeping one in memory.
+    """
+
+    def __init__(self, lexicon):
+        """
+        Args:
+            lexicon (LexiconIndex): The index the words are taken from.
+        """
+        self.lexicon = lexicon
+        self._version = None
+        self._snapshot = WordSnapshot([], [], "")
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """
+        Returns the current word list, re-sorting the words when the lexicon
+        index version has changed. Take one snapshot per request and derive both
+        the ETag and the payload from it.
+
+        Returns:
+            WordSnapshot: The current word list.
+        """
+        version = self.lexicon.get_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    keys = sorted((word.lower(), word) for word in set(self.lexicon.words()))
+                    words = [word for _, word in keys]
+                    digest = hashlib.sha256("\n".join(words).encode("utf-8")).hexdigest()[:16]
+                    self._snapshot = WordSnapshot(keys, words, digest)
+                    self._version = version
+        return self._snapshot
+
+    @staticmethod
+    def clamp_limit(limit, default=WORDS_PAGE_SIZE):
+        """
+        Bounds a requested page size.
+
+        Args:
+            limit (int): The requested number of words, or None for the default.
+            default (int, optional): The page size used when none is requested.
+
+        Returns:
+            int: The page size, between 1 and WORDS_MAX_PAGE_SIZE.
+        """
+        if limit is None:
+            return default
+        return max(1, min(limit, WORDS_MAX_PAGE_SIZE))
+
+    def page(self, cursor=None, limit=None):
+        """Returns a page of the current word list, see WordSnapshot.page."""
+        return self.snapshot().page(cursor, limit)
+
+    def search(self, prefix, limit=None):
+        """Finds words of the current word list by prefix, see WordSnapshot.search."""
+        return self.snapshot().search(prefix, limit)
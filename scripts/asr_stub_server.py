@@ -0,0 +1,77 @@
+import json
+import time
+import random
+import argparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class StubASRHandler(BaseHTTPRequestHandler):
+    """
+    Answers transcription requests like the Hugging Face Whisper API, after a
+    configurable delay and with a configurable share of server errors.
+    """
+
+    transcription = "hello how are you"
+    latency = 0.0
+    failure_rate = 0.0
+
+    def do_POST(self):
+        """Handles a POST with an encoded audio body."""
+        length = int(self.headers.get("Content-Length", 0))
+        audio_bytes = self.rfile.read(length)
+        time.sleep(self.latency)
+
+        if random.random() < self.failure_rate:
+            self.send_error(503, "Stub failure")
+            return
+        if not audio_bytes:
+            self.send_json(400, {"error": "No audio received"})
+            return
+
+        print(f"Received {len(audio_bytes)} bytes of {self.headers.get('Content-Type', 'unknown')}")
+        self.send_json(200, {"text": f" {self.transcription}"})
+
+    def send_json(self, status, payload):
+        """Sends a JSON response."""
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Silences per-request logging."""
+
+def run_stub_server(port=8091, latency=0.0, failure_rate=0.0, transcription=None):
+    """
+    Serves the stub transcription API until interrupted. Point the application at
+    it with ASR_API_URL=http://localhost:<port>/asr.
+
+    Args:
+        port (int, optional): The port to listen on.
+        latency (float, optional): Seconds to wait before answering.
+        failure_rate (float, optional): Share of requests answered with HTTP 503.
+        transcription (str, optional): The text every request returns.
+    """
+    StubASRHandler.latency = latency
+    StubASRHandler.failure_rate = failure_rate
+    if transcription is not None:
+        StubASRHandler.transcription = transcription
+
+    server = ThreadingHTTPServer(("localhost", port), StubASRHandler)
+    print(f"Stub ASR listening on http://localhost:{port}/asr")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a stub Whisper transcription API.")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--transcription", default=None)
+    args = parser.parse_args()
+    run_stub_server(args.port, args.latency, args.failure_rate, args.transcription)
@@ -0,0 +1,90 @@
+import time
+from types import SimpleNamespace
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+from app.services.sign_synthesis.pose_extraction import draw_styled_landmarks
+from app.services.sign_synthesis.skeleton_renderer import (
+    FACE_LANDMARK_COUNT, POSE_LANDMARK_COUNT, HAND_LANDMARK_COUNT, SkeletonRenderer, results_to_landmarks
+)
+from app.config import NORMALIZED_VIDEO_SIZE
+
+def make_landmark_list(rng, count):
+    """
+    Builds a MediaPipe landmark list of random visible landmarks.
+
+    Args:
+        rng (np.random.Generator): The random generator.
+        count (int): The number of landmarks.
+
+    Returns:
+        landmark_pb2.NormalizedLandmarkList: The landmark list.
+    """
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y in rng.uniform(0.1, 0.9, size=(count, 2)):
+        landmark_list.landmark.add(x=float(x), y=float(y), visibility=1.0)
+    return landmark_list
+
+def make_results(rng, frames):
+    """
+    Builds synthetic Holistic results with every body part detected.
+
+    Args:
+        rng (np.random.Generator): The random generator.
+        frames (int): The number of frames.
+
+    Returns:
+        list: One results object per frame.
+    """
+    return [
+        SimpleNamespace(
+            face_landmarks=make_landmark_list(rng, FACE_LANDMARK_COUNT),
+            pose_landmarks=make_landmark_list(rng, POSE_LANDMARK_COUNT),
+            left_hand_landmarks=make_landmark_list(rng, HAND_LANDMARK_COUNT),
+            right_hand_landmarks=make_landmark_list(rng, HAND_LANDMARK_COUNT)
+        )
+        for _ in range(frames)
+    ]
+
+def measure_fps(render, frames):
+    """
+    Renders every frame once and returns the achieved frame rate.
+
+    Args:
+        render (callable): Renders one frame.
+        frames (list): The frames to render.
+
+    Returns:
+        float: Frames rendered per second.
+    """
+    start_time = time.perf_counter()
+    for frame in frames:
+        render(frame)
+    return len(frames) / (time.perf_counter() - start_time)
+
+def benchmark_renderer(frames=300, frame_size=NORMALIZED_VIDEO_SIZE):
+    """
+    Compares the MediaPipe drawing utilities with the vectorized skeleton renderer.
+
+    Args:
+        frames (int, optional): The number of frames to render.
+        frame_size (tuple, optional): The (width, height) of the frames.
+
+    Returns:
+        dict: Frames per second of each renderer.
+    """
+    width, height = frame_size
+    results = make_results(np.random.default_rng(0), frames)
+    landmarks = [results_to_landmarks(frame_results) for frame_results in results]
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    renderer = SkeletonRenderer(width, height)
+
+    return {
+        "draw_styled_landmarks": measure_fps(lambda frame_results: draw_styled_landmarks(image, frame_results), results),
+        "SkeletonRenderer.render_results": measure_fps(renderer.render_results, results),
+        "SkeletonRenderer.render": measure_fps(renderer.render, landmarks)
+    }
+
+if __name__ == "__main__":
+    print("Benchmarking skeleton rendering...")
+    for name, fps in benchmark_renderer().items():
+        print(f"{name}: {fps:.1f} fps")
@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from app.services.sign_synthesis.landmark_cache import extract_clip_landmarks, save_clip_landmarks, load_clip_landmarks
+from app.config import STATIC_VIDEO_PATH
+
+def cache_clip_landmarks(video_path, force=False):
+    """
+    Extracts and stores the landmarks of a library clip unless they are already cached.
+
+    Args:
+        video_path (str): The path of the library clip.
+        force (bool, optional): Re-extract the landmarks even if they are cached.
+
+    Returns:
+        bool: True if the landmarks were extracted, False if the cache was up to date.
+    """
+    if not force and load_clip_landmarks(video_path) is not None:
+        return False
+    save_clip_landmarks(video_path, extract_clip_landmarks(video_path))
+    return True
+
+def extract_landmarks(max_workers=None, force=False):
+    """
+    Builds the landmark cache for every library clip.
+
+    Args:
+        max_workers (int, optional): Number of worker processes. Defaults to the CPU count.
+        force (bool, optional): Re-extract the landmarks of every clip.
+
+    Returns:
+        list: List of (video_path, error) tuples for clips that failed.
+    """
+    video_paths = sorted(
+        os.path.normpath(os.path.join(STATIC_VIDEO_PATH, f))
+        for f in os.listdir(STATIC_VIDEO_PATH) if f.endswith('.mp4')
+    )
+
+    failures = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(cache_clip_landmarks, path, force): path for path in video_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                if future.result():
+                    print(f"Extracted landmarks: {path}")
+            except Exception as e:
+                print(f"Error extracting landmarks from {path}: {e}")
+                failures.append((path, e))
+    return failures
+
+if __name__ == "__main__":
+    print("Starting landmark extraction process...")
+    failed = extract_landmarks()
+    print(f"\nLandmark extraction completed with {len(failed)} failure(s)!")
@@ -0,0 +1,61 @@
+import argparse
+from app.services.utils.mongo_utils import init_mongo_client, ensure_indexes
+from app.services.utils.lexicon_import import read_records, import_records, detect_format, LexiconImportError
+from app.config import IMPORT_BATCH_SIZE, SCRAPER_WORKERS
+
+def import_lexicon(path, file_format=None, batch_size=IMPORT_BATCH_SIZE, download_videos=False, workers=SCRAPER_WORKERS):
+    """
+    Imports lexicon documents from a CSV or JSON Lines file.
+
+    Args:
+        path (str): The path of the import file.
+        file_format (str, optional): "csv" or "jsonl". Defaults to the file extension.
+        batch_size (int, optional): Documents per bulk write.
+        download_videos (bool, optional): Download the videos of the imported documents afterwards.
+        workers (int, optional): Number of parallel video downloads.
+
+    Returns:
+        dict: The import report returned by import_records.
+
+    Raises:
+        LexiconImportError: If the file format is unknown or the file is unreadable.
+    """
+    file_format = file_format or detect_format(path)
+    if not file_format:
+        raise LexiconImportError(f"Cannot tell the format of {path}, pass --format csv or --format jsonl")
+    collection = init_mongo_client()
+    ensure_indexes(collection)
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        records = read_records(f, file_format)
+    report = import_records(collection, records, batch_size)
+
+    for failure in report["failures"]:
+        print(f"Line {failure['line']}: {failure['error']}")
+    print(
+        f"Read {report['records']} record(s): inserted {report['inserted']}, "
+        f"updated {report['updated']}, failed {len(report['failures'])}"
+    )
+
+    if download_videos and report["video_urls"]:
+        from scripts.video_scraper import download_video_batch
+        print(f"Downloading {len(report['video_urls'])} video(s)...")
+        report["download_failures"] = download_video_batch(report["video_urls"], workers)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import lexicon documents from CSV or JSON Lines.")
+    parser.add_argument("path", help="The CSV or JSON Lines file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None, help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Documents per bulk write")
+    parser.add_argument("--download-videos", action="store_true", help="Download the videos of imported words")
+    parser.add_argument("--workers", type=int, default=SCRAPER_WORKERS, help="Number of parallel downloads")
+    args = parser.parse_args()
+
+    try:
+        result = import_lexicon(args.path, args.format, args.batch_size, args.download_videos, args.workers)
+    except (LexiconImportError, OSError, UnicodeDecodeError) as e:
+        print(f"Error reading import file: {e}")
+        raise SystemExit(1)
+    if result["failures"] or result.get("download_failures"):
+        raise SystemExit(1)
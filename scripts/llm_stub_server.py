@@ -0,0 +1,147 @@
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """
+    Answers OpenAI-compatible chat completion requests with a fixed response,
+    after a configurable delay and with a configurable share of errors.
+    """
+
+    response_text = "ASL Gloss: STUB RESPONSE"
+    latency = 0.0
+    jitter = 0.0
+    failure_rate = 0.0
+    failure_status = 503
+    fail_first = 0
+    requests_seen = 0
+    _lock = threading.Lock()
+
+    def do_POST(self):
+        """Handles POST /v1/chat/completions, streamed or not."""
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        with self._lock:
+            type(self).requests_seen += 1
+            request_number = self.requests_seen
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        if request_number <= self.fail_first or random.random() < self.failure_rate:
+            self.send_error(self.failure_status, "Stub failure")
+            return
+
+        if request.get("stream"):
+            self.send_stream(request)
+        else:
+            self.send_completion(request)
+
+    def send_completion(self, request):
+        """Sends the response in a single chat completion object."""
+        body = json.dumps({
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model") or "stub",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.response_text},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, request):
+        """Sends the response word by word as Server-Sent Events."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        words = self.response_text.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": "stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model") or "stub",
+                "choices": [{
+                    "index": 0,
+                    "delta": {"role": "assistant", "content": word if i == 0 else " " + word},
+                    "finish_reason": "stop" if i == len(words) - 1 else None
+                }]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        """Silences per-request logging."""
+
+def create_stub_server(port=8090, latency=0.0, jitter=0.0, failure_rate=0.0, response_text=None, failure_status=503, fail_first=0):
+    """
+    Creates a stub language model server with its own settings and request count.
+
+    Args:
+        port (int, optional): The port to listen on, 0 for any free port.
+        latency (float, optional): Seconds to wait before answering.
+        jitter (float, optional): Extra random delay of up to this many seconds.
+        failure_rate (float, optional): Share of requests answered with an error.
+        response_text (str, optional): The text every completion returns.
+        failure_status (int, optional): The HTTP status of failed requests.
+        fail_first (int, optional): Number of initial requests that fail regardless of the failure rate.
+
+    Returns:
+        ThreadingHTTPServer: The server, not yet serving.
+    """
+    settings = {
+        "latency": latency, "jitter": jitter, "failure_rate": failure_rate, "failure_status": failure_status,
+        "fail_first": fail_first, "requests_seen": 0, "_lock": threading.Lock()
+    }
+    if response_text is not None:
+        settings["response_text"] = response_text
+    handler = type("ConfiguredStubLLMHandler", (StubLLMHandler,), settings)
+    return ThreadingHTTPServer(("localhost", port), handler)
+
+def run_stub_server(port=8090, latency=0.0, jitter=0.0, failure_rate=0.0, response_text=None, failure_status=503):
+    """
+    Serves the stub language model until interrupted. Point the application at it
+    with LLM_BASE_URL=http://localhost:<port>/v1.
+
+    Args:
+        port (int, optional): The port to listen on.
+        latency (float, optional): Seconds to wait before answering.
+        jitter (float, optional): Extra random delay of up to this many seconds.
+        failure_rate (float, optional): Share of requests answered with an error.
+        response_text (str, optional): The text every completion returns.
+        failure_status (int, optional): The HTTP status of failed requests.
+    """
+    server = create_stub_server(port, latency, jitter, failure_rate, response_text, failure_status)
+    print(f"Stub LLM listening on http://localhost:{port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a stub OpenAI-compatible language model.")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--response", default=None)
+    parser.add_argument("--failure-status", type=int, default=503)
+    args = parser.parse_args()
+    run_stub_server(args.port, args.latency, args.jitter, args.failure_rate, args.response, args.failure_status)
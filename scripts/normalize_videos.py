@@ -0,0 +1,46 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.services.sign_synthesis.clip_normalizer import normalize_clip, get_normalized_path, profile_matches, write_profile
+from app.config import STATIC_VIDEO_PATH
+
+def normalize_videos(max_workers=4):
+    """
+    Transcodes every library clip to the normalization profile so that merged
+    videos can be produced by stream copy.
+
+    Args:
+        max_workers (int): Number of clips to transcode in parallel.
+
+    Returns:
+        list: List of (video_path, error) tuples for clips that failed.
+    """
+    video_paths = sorted(
+        os.path.normpath(os.path.join(STATIC_VIDEO_PATH, f))
+        for f in os.listdir(STATIC_VIDEO_PATH) if f.endswith('.mp4')
+    )
+    force = not profile_matches()
+    if force:
+        print("Normalization profile changed, re-encoding all clips")
+
+    failures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(normalize_clip, path, force): path for path in video_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                future.result()
+                print(f"Normalized: {path}")
+            except Exception as e:
+                print(f"Error normalizing {path}: {e}")
+                failures.append((path, e))
+                stale_path = get_normalized_path(path)
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+
+    write_profile()
+    return failures
+
+if __name__ == "__main__":
+    print("Starting video normalization process...")
+    failed = normalize_videos()
+    print(f"\nVideo normalization completed with {len(failed)} failure(s)!")
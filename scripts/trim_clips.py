@@ -0,0 +1,53 @@
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.services.sign_synthesis.clip_trimming import analyze_clip, load_spans, save_spans, is_entry_current
+from app.config import STATIC_VIDEO_PATH
+
+def trim_clips(max_workers=4, force=False):
+    """
+    Detects the motion onset and offset of every library clip and stores the
+    in and out points, so that merging and pose rendering skip idle frames.
+
+    Args:
+        max_workers (int): Number of clips to analyze in parallel.
+        force (bool, optional): Re-analyze clips that have not changed.
+
+    Returns:
+        list: List of (video_path, error) tuples for clips that failed.
+    """
+    video_paths = sorted(
+        os.path.normpath(os.path.join(STATIC_VIDEO_PATH, f))
+        for f in os.listdir(STATIC_VIDEO_PATH) if f.endswith('.mp4')
+    )
+    entries = {path: entry for path, entry in load_spans().items() if path in video_paths}
+    pending = [path for path in video_paths if force or not is_entry_current(path, entries.get(path, {}))]
+    print(f"Analyzing {len(pending)} of {len(video_paths)} clips")
+
+    failures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(analyze_clip, path): path for path in pending}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                entry = entries[path] = future.result()
+                print(f"Trimmed {path}: {entry['in']:.2f}s-{entry['out']:.2f}s of {entry['duration']:.2f}s")
+            except Exception as e:
+                print(f"Error analyzing {path}: {e}")
+                failures.append((path, e))
+                entries.pop(path, None)
+
+    save_spans(entries)
+    total = sum(entry["duration"] for entry in entries.values())
+    active = sum(entry["out"] - entry["in"] for entry in entries.values())
+    print(f"Active footage: {active:.1f}s of {total:.1f}s ({total - active:.1f}s of idle frames trimmed)")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Detect the active span of every library clip.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="Re-analyze clips that have not changed")
+    args = parser.parse_args()
+    print("Starting clip trimming analysis...")
+    failed = trim_clips(args.workers, args.force)
+    print(f"\nClip trimming analysis completed with {len(failed)} failure(s)!")
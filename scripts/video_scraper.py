@@ -1,109 +1,509 @@
 import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+from contextlib import contextmanager
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import yt_dlp
 from app.services.utils.mongo_utils import init_mongo_client
 from app.services.utils.video_utils import construct_video_path
-from app.config import STATIC_VIDEO_PATH
+from app.config import STATIC_VIDEO_PATH, VIDEO_MANIFEST_PATH, SCRAPER_WORKERS, DOWNLOAD_CHUNK_SIZE, MANIFEST_SAVE_EVERY
 
-collection = init_mongo_client()
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
 
-def download_video(url, save_path):
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session(pool_size=SCRAPER_WORKERS):
+    """
+    Returns the HTTP session shared by all download threads, so that connections
+    to the same host are reused.
+
+    Args:
+        pool_size (int, optional): Connections kept open per host.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+            _session = requests.Session()
+            _session.headers.update(HEADERS)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+def is_youtube_url(url):
+    """Checks whether a video is hosted on YouTube."""
+    return "youtube.com" in url or "youtu.be" in url
+
+@contextmanager
+def file_lock(path):
+    """
+    Holds an exclusive lock on a lock file next to a file, so that processes
+    writing the file take turns. Does nothing where fcntl is unavailable.
+
+    Args:
+        path (str): The path of the file to lock.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+class Manifest:
+    """
+    Records the state of every synced video: its URL, the ETag and size reported
+    by the server, the SHA-256 of the file and whether the download completed.
+    It also keeps a fingerprint of each lexicon document for incremental runs.
+
+    Several runs may use the manifest at once, e.g. a scrape and the downloads
+    of a lexicon import. Each run only writes back the entries it changed.
+    """
+
+    def __init__(self, path=VIDEO_MANIFEST_PATH):
+        """
+        Args:
+            path (str, optional): The path of the manifest file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.videos = data.get("videos", {})
+        self.documents = data.get("documents", {})
+        self.last_sync = data.get("last_sync")
+        self._changed = set()
+        self._removed = set()
+        self._sync_recorded = False
+
+    def get(self, video_path):
+        """Returns a copy of the entry of a video, or an empty dict."""
+        with self._lock:
+            return dict(self.videos.get(video_path, {}))
+
+    def update(self, video_path, **fields):
+        """Merges fields into the entry of a video."""
+        with self._lock:
+            entry = self.videos.setdefault(video_path, {})
+            entry.update(fields, updated_at=time.time())
+            self._changed.add(video_path)
+            self._removed.discard(video_path)
+
+    def remove(self, video_path):
+        """Forgets a video."""
+        with self._lock:
+            self.videos.pop(video_path, None)
+            self._removed.add(video_path)
+            self._changed.discard(video_path)
+
+    def record_sync(self, fingerprints):
+        """Records the document fingerprints and the time of a full sync."""
+        with self._lock:
+            self.documents = fingerprints
+            self.last_sync = time.time()
+            self._sync_recorded = True
+
+    def save(self):
+        """
+        Writes the entries changed by this run into the manifest file, on top of
+        what other runs saved in the meantime. The file is replaced atomically.
+        """
+        with self._lock, file_lock(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+
+            videos = data.get("videos", {})
+            for video_path in self._changed:
+                videos[video_path] = self.videos[video_path]
+            for video_path in self._removed:
+                videos.pop(video_path, None)
+            if not self._sync_recorded:
+                self.documents = data.get("documents", {})
+                self.last_sync = data.get("last_sync")
+            self.videos = videos
+            self._changed.clear()
+            self._removed.clear()
+
+            data = {"last_sync": self.last_sync, "videos": self.videos, "documents": self.documents}
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+
+def hash_file(path):
+    """
+    Computes the SHA-256 of a file.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def document_fingerprint(doc):
+    """
+    Hashes the words and definitions of a lexicon document, so that incremental
+    runs can tell whether it changed.
+
+    Args:
+        doc (dict): The lexicon document.
+
+    Returns:
+        str: The hex digest.
+    """
+    payload = json.dumps({"words": doc.get("words"), "definitions": doc.get("definitions")}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def is_up_to_date(url, save_path, entry, verify=False):
+    """
+    Checks whether a downloaded video still matches its source.
+
+    Args:
+        url (str): The URL of the video.
+        save_path (str): The path of the downloaded video.
+        entry (dict): The manifest entry of the video.
+        verify (bool, optional): Recompute the file hash instead of trusting the manifest.
+
+    Returns:
+        bool: True if the video does not need to be downloaded again.
+    """
+    if entry.get("status") != "complete" or entry.get("url") != url or not os.path.exists(save_path):
+        return False
+    if entry.get("size") is not None and os.path.getsize(save_path) != entry["size"]:
+        return False
+    if verify and hash_file(save_path) != entry.get("sha256"):
+        return False
+    if is_youtube_url(url):
+        return True
+
+    # Keep the local copy when the source cannot be checked
+    try:
+        response = get_session().head(url, allow_redirects=True, timeout=30)
+    except requests.RequestException as e:
+        print(f"Could not check {url}, keeping the local copy: {e}")
+        return True
+    if not response.ok:
+        return True
+    etag = response.headers.get("ETag")
+    length = response.headers.get("Content-Length")
+    if etag and entry.get("etag") and etag != entry["etag"]:
+        return False
+    if length and length.isdigit() and entry.get("size") is not None and int(length) != entry["size"]:
+        return False
+    return True
+
+def adopt_existing_file(url, save_path, manifest):
+    """
+    Records a video downloaded before the manifest existed as complete, so that
+    it is checked against its source instead of downloaded again.
+
+    Args:
+        url (str): The URL of the video.
+        save_path (str): The path of the downloaded video.
+        manifest (Manifest): The sync manifest.
+
+    Returns:
+        dict: The new manifest entry.
+    """
+    manifest.update(
+        save_path, url=url, status="complete", error=None, etag=None,
+        size=os.path.getsize(save_path), sha256=hash_file(save_path)
+    )
+    return manifest.get(save_path)
+
+def download_http(url, save_path, entry, manifest):
     """
-    Downloads a video from the given URL and saves it to the specified path.
+    Downloads a video over HTTP into a partial file, resuming a previous partial
+    download with a Range request when the server still serves the same file.
 
     Args:
         url (str): The URL of the video.
         save_path (str): The path where the video will be saved.
+        entry (dict): The manifest entry of the video.
+        manifest (Manifest): The sync manifest, updated with the ETag once the
+            response arrives so that an interrupted download can be resumed.
+
+    Returns:
+        dict: The ETag, size and SHA-256 of the downloaded file.
+    """
+    part_path = f"{save_path}.part"
+    can_resume = os.path.exists(part_path) and entry.get("url") == url and entry.get("etag")
+    if os.path.exists(part_path) and not can_resume:
+        os.remove(part_path)  # Left by an interrupted download that cannot be resumed
+    offset = os.path.getsize(part_path) if can_resume else 0
+    headers = {"Range": f"bytes={offset}-", "If-Range": entry["etag"]} if offset else {}
+
+    with get_session().get(url, headers=headers, stream=True, timeout=30) as response:
+        if response.status_code == 416:
+            os.remove(part_path)  # The partial file does not fit the current source
+            return download_http(url, save_path, {}, manifest)
+        response.raise_for_status()
+        if response.status_code != 206:
+            offset = 0  # The server sent the whole file
+        etag = response.headers.get("ETag")
+        manifest.update(save_path, etag=etag)
+
+        digest = hashlib.sha256()
+        if offset:
+            with open(part_path, "rb") as f:
+                for block in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                    digest.update(block)
+            print(f"Resuming {save_path} at {offset} bytes")
+
+        with open(part_path, "ab" if offset else "wb") as file:
+            for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                file.write(data)
+                digest.update(data)
+
+    size = os.path.getsize(part_path)
+    os.replace(part_path, save_path)
+    return {"etag": etag, "size": size, "sha256": digest.hexdigest()}
+
+def download_youtube(url, save_path):
+    """
+    Downloads a YouTube video with yt-dlp, which resumes partial downloads itself.
+
+    Args:
+        url (str): The URL of the video.
+        save_path (str): The path where the video will be saved.
+
+    Returns:
+        dict: The size and SHA-256 of the downloaded file.
+    """
+    ydl_opts = {
+        'format': 'best',
+        'outtmpl': save_path,
+        'continuedl': True,
+        'quiet': True,
+        'noprogress': True
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        ydl.download([url])
+    return {"etag": None, "size": os.path.getsize(save_path), "sha256": hash_file(save_path)}
+
+def download_video(url, save_path, manifest, verify=False):
+    """
+    Brings a video in line with its source, recording the outcome in the manifest.
+
+    Args:
+        url (str): The URL of the video.
+        save_path (str): The path where the video will be saved.
+        manifest (Manifest): The sync manifest.
+        verify (bool, optional): Recompute the hash of already downloaded videos.
+
+    Returns:
+        str: "skipped" if the video was up to date, "downloaded" otherwise.
+
+    Raises:
+        Exception: If the download failed. The partial file is kept for resuming.
     """
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    
-    if os.path.exists(save_path):
-        print(f"Skipping {save_path} - already exists")
-        return
-    
+    entry = manifest.get(save_path)
+
     try:
-        if "youtube.com" in url or "youtu.be" in url:
-            ydl_opts = {
-                'format': 'best',
-                'outtmpl': save_path,
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-            print(f"Successfully downloaded: {save_path}")
-        else:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, stream=True)
-            response.raise_for_status()
-            
-            file_size = int(response.headers.get('content-length', 0))
-            progress = tqdm(total=file_size, unit='iB', unit_scale=True, desc=os.path.basename(save_path))
-            
-            with open(save_path, 'wb') as file:
-                for data in response.iter_content(chunk_size=1024):
-                    size = file.write(data)
-                    progress.update(size)
-            progress.close()
-            print(f"Successfully downloaded: {save_path}")
-        
+        if not entry and os.path.exists(save_path) and not os.path.exists(f"{save_path}.part"):
+            entry = adopt_existing_file(url, save_path, manifest)
+        if is_up_to_date(url, save_path, entry, verify):
+            return "skipped"
+
+        manifest.update(save_path, url=url, status="partial")
+        result = download_youtube(url, save_path) if is_youtube_url(url) else download_http(url, save_path, entry, manifest)
+        manifest.update(save_path, url=url, status="complete", error=None, **result)
+        return "downloaded"
     except Exception as e:
-        print(f"Error downloading {url}: {str(e)}")
-        if os.path.exists(save_path):
-            os.remove(save_path)
+        manifest.update(save_path, url=url, status="failed", error=str(e))
+        raise
 
-def process_document(doc, executor, current_video_paths):
+def collect_videos(documents, manifest, incremental=False):
     """
-    Processes a document to download videos for each definition.
+    Lists the videos referenced by the lexicon.
 
     Args:
-        doc (dict): The document containing video URLs.
-        executor (ThreadPoolExecutor): The executor for managing threads.
-        current_video_paths (set): A set to keep track of current video paths.
-    """
-    for definition in doc.get('definitions', []):
-        video_url = definition.get('video_url')
-        if video_url:
-            print(f"\nProcessing word(s): {doc['words']}")
+        documents (iterable): The lexicon documents.
+        manifest (Manifest): The sync manifest.
+        incremental (bool, optional): Only return videos of documents that changed
+            since the last run, or whose last download did not complete.
+
+    Returns:
+        tuple: The list of (url, save_path) pairs to sync, the set of every video
+        path referenced by the lexicon and the new document fingerprints.
+    """
+    to_sync = {}
+    current_video_paths = set()
+    fingerprints = {}
+
+    for doc in documents:
+        doc_id = str(doc.get("_id"))
+        fingerprints[doc_id] = document_fingerprint(doc)
+        changed = manifest.documents.get(doc_id) != fingerprints[doc_id]
+
+        for definition in doc.get('definitions', []):
+            video_url = definition.get('video_url')
+            if not video_url:
+                continue
             video_path = construct_video_path(video_url)
             current_video_paths.add(video_path)
-            executor.submit(download_video, video_url, video_path)
+            incomplete = manifest.get(video_path).get("status") != "complete" or not os.path.exists(video_path)
+            if not incremental or changed or incomplete:
+                to_sync[video_path] = video_url
 
-def scrape_videos():
+    return [(url, path) for path, url in to_sync.items()], current_video_paths, fingerprints
+
+def scrape_videos(workers=SCRAPER_WORKERS, incremental=False, verify=False):
     """
-    Scrapes videos from the database and downloads them.
+    Syncs the local video library with the lexicon.
+
+    Args:
+        workers (int, optional): Number of parallel downloads.
+        incremental (bool, optional): Only sync documents changed since the last run.
+        verify (bool, optional): Recompute the hash of already downloaded videos.
+
+    Returns:
+        list: List of (url, error) tuples for videos that failed.
     """
-    documents = collection.find({})
-    futures = []
-    
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        current_video_paths = set()
-        
-        for doc in documents:
-            process_document(doc, executor, current_video_paths)
-        
-        for future in as_completed(futures):
-            future.result()
-    
-    clean_up_old_videos(current_video_paths)
+    collection = init_mongo_client()
+    manifest = Manifest()
+    jobs, current_video_paths, fingerprints = collect_videos(collection.find({}), manifest, incremental)
+    print(f"{len(jobs)} video(s) to check, {len(current_video_paths)} referenced by the lexicon")
+
+    try:
+        counts, failures = download_videos(jobs, manifest, workers, verify)
+
+        # Videos that failed stay incomplete in the manifest, so the next
+        # incremental run retries them even though their document is unchanged.
+        manifest.record_sync(fingerprints)
+        clean_up_old_videos(current_video_paths, manifest)
+    finally:
+        manifest.save()
 
-def clean_up_old_videos(current_video_paths):
+    print(f"Downloaded {counts['downloaded']}, up to date {counts['skipped']}, failed {len(failures)}")
+    return failures
+
+def download_videos(jobs, manifest, workers=SCRAPER_WORKERS, verify=False, save_every=MANIFEST_SAVE_EVERY):
     """
-    Cleans up old videos that are no longer in the current video paths.
+    Downloads videos in parallel, recording each outcome in the manifest. The
+    manifest is saved every few completed downloads, so that a crash or kill
+    does not lose the progress of a long sync.
+
+    Args:
+        jobs (list): The (url, save_path) pairs to sync.
+        manifest (Manifest): The sync manifest.
+        workers (int, optional): Number of parallel downloads.
+        verify (bool, optional): Recompute the hash of already downloaded videos.
+        save_every (int, optional): Completed downloads between manifest saves, 0 to save only at the end.
+
+    Returns:
+        tuple: The number of videos "downloaded" and "skipped" as a dict, and the
+        list of (url, error) tuples for videos that failed.
+    """
+    get_session(workers)
+    failures = []
+    counts = {"downloaded": 0, "skipped": 0}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(download_video, url, path, manifest, verify): (url, path) for url, path in jobs}
+        for completed, future in enumerate(tqdm(as_completed(futures), total=len(futures), desc="Syncing videos"), 1):
+            url, path = futures[future]
+            try:
+                counts[future.result()] += 1
+            except Exception as e:
+                print(f"Error downloading {url}: {e}")
+                failures.append((url, e))
+            if save_every and completed % save_every == 0:
+                manifest.save()
+    return counts, failures
+
+def download_video_batch(video_urls, workers=SCRAPER_WORKERS):
+    """
+    Downloads the videos of newly imported lexicon documents in one batch,
+    without syncing or cleaning up the rest of the library.
+
+    Args:
+        video_urls (iterable): The video URLs to download.
+        workers (int, optional): Number of parallel downloads.
+
+    Returns:
+        list: List of (url, error) tuples for videos that failed.
+    """
+    jobs = {construct_video_path(url): url for url in video_urls if url}
+    manifest = Manifest()
+    try:
+        counts, failures = download_videos([(url, path) for path, url in jobs.items()], manifest, workers)
+    finally:
+        manifest.save()
+
+    print(f"Downloaded {counts['downloaded']}, up to date {counts['skipped']}, failed {len(failures)}")
+    return failures
+
+def clean_up_old_videos(current_video_paths, manifest=None):
+    """
+    Cleans up old videos that are no longer in the current video paths, and the
+    partial downloads of videos that are no longer referenced.
 
     Args:
         current_video_paths (set): A set of current video paths.
+        manifest (Manifest, optional): The sync manifest to remove deleted videos from.
     """
     existing_videos = set(os.path.normpath(os.path.join(STATIC_VIDEO_PATH, f)) for f in os.listdir(STATIC_VIDEO_PATH) if f.endswith('.mp4'))
     videos_to_delete = existing_videos - current_video_paths
-    
+
     for video in videos_to_delete:
         os.remove(video)
+        if manifest:
+            manifest.remove(video)
         print(f"Deleted old video: {video}")
 
+    part_files = [os.path.normpath(os.path.join(STATIC_VIDEO_PATH, f)) for f in os.listdir(STATIC_VIDEO_PATH) if f.endswith('.part')]
+    for part_path in part_files:
+        video = part_path[:-len('.part')]
+        if video not in current_video_paths:
+            os.remove(part_path)
+            if manifest:
+                manifest.remove(video)
+            print(f"Deleted partial download: {part_path}")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync the sign video library with the lexicon.")
+    parser.add_argument("--workers", type=int, default=SCRAPER_WORKERS, help="Number of parallel downloads")
+    parser.add_argument("--incremental", action="store_true", help="Only sync documents changed since the last run")
+    parser.add_argument("--verify", action="store_true", help="Recompute the hash of downloaded videos")
+    args = parser.parse_args()
+
     print("Starting video scraping process...")
-    scrape_videos()
-    print("\nVideo scraping completed!")
+    failed = scrape_videos(workers=args.workers, incremental=args.incremental, verify=args.verify)
+    print(f"\nVideo scraping completed with {len(failed)} failure(s)!")
+    if failed:
+        raise SystemExit(1)
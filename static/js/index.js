@@ -52,36 +52,131 @@ document.addEventListener('DOMContentLoaded', () => {
     // Microphone functionality
     document.getElementById('micButton').addEventListener('click', handleMicButtonClick);
 
+    const AUDIO_SAMPLE_RATE = 16000;
+    const AUDIO_CHUNK_MS = 500;
+    const AUDIO_MAX_SECONDS = 15;
+    const SILENCE_LEVEL = 0.01;
+    const TRAILING_SILENCE_MS = 800;
+    let recorder = null;
+
     function handleMicButtonClick() {
         const button = this;
         const icon = button.querySelector('i');
 
-        if (button.classList.contains('recording')) return; // Prevent multiple recordings
+        if (button.classList.contains('processing')) return; // Wait for the transcription
+        if (recorder) {
+            recorder.stop();
+            return;
+        }
 
         button.classList.add('recording');
         icon.classList.replace('fa-microphone', 'fa-microphone-slash');
 
-        showToast('Recording...', 'Started recording');
+        showToast('Recording...', 'Started recording, click again to stop');
         startRecording(button, textarea, icon);
     }
 
+    function createAudioUploader() {
+        // Sends 16-bit PCM chunks in order; each chunk waits for the previous one
+        const uploadId = crypto.randomUUID().replace(/-/g, '');
+        let index = 0;
+        let queue = Promise.resolve();
+
+        function send(samples, final) {
+            const pcm = new Int16Array(samples.length);
+            for (let i = 0; i < samples.length; i++) {
+                pcm[i] = Math.max(-1, Math.min(1, samples[i])) * 0x7fff;
+            }
+            const params = new URLSearchParams({ upload_id: uploadId, index: index++, final: final ? '1' : '0', sample_rate: AUDIO_SAMPLE_RATE });
+            queue = queue.then(async () => {
+                const response = await fetch(`/api/speech-to-text/chunk?${params}`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/octet-stream' },
+                    body: pcm.buffer
+                });
+                const data = await response.json();
+                if (!data.success) throw new Error(data.error || 'Failed to transcribe speech');
+                return data;
+            });
+            return queue;
+        }
+
+        return { send };
+    }
+
     async function startRecording(button, textarea, icon) {
+        let stream = null;
+        let audioContext = null;
         try {
-            button.classList.add('processing');
+            stream = await navigator.mediaDevices.getUserMedia({ audio: { channelCount: 1 } });
+            audioContext = new AudioContext({ sampleRate: AUDIO_SAMPLE_RATE });
+            const source = audioContext.createMediaStreamSource(stream);
+            const processor = audioContext.createScriptProcessor(4096, 1, 1);
+            const uploader = createAudioUploader();
+
+            let pending = [];
+            let pendingLength = 0;
+            let recordedMs = 0;
+            let silenceMs = 0;
+            let heardSpeech = false;
+
+            function takePending() {
+                const samples = new Float32Array(pendingLength);
+                let offset = 0;
+                for (const block of pending) {
+                    samples.set(block, offset);
+                    offset += block.length;
+                }
+                pending = [];
+                pendingLength = 0;
+                return samples;
+            }
 
-            const response = await fetch('/api/speech-to-text', { method: 'POST' });
-            const data = await response.json();
+            const finished = new Promise(resolve => {
+                recorder = { stop: resolve };
+
+                processor.onaudioprocess = event => {
+                    const block = new Float32Array(event.inputBuffer.getChannelData(0));
+                    const blockMs = block.length / AUDIO_SAMPLE_RATE * 1000;
+                    pending.push(block);
+                    pendingLength += block.length;
+                    recordedMs += blockMs;
+
+                    let energy = 0;
+                    for (const sample of block) energy += sample * sample;
+                    if (Math.sqrt(energy / block.length) > SILENCE_LEVEL) {
+                        heardSpeech = true;
+                        silenceMs = 0;
+                    } else {
+                        silenceMs += blockMs;
+                    }
+
+                    if ((heardSpeech && silenceMs >= TRAILING_SILENCE_MS) || recordedMs >= AUDIO_MAX_SECONDS * 1000) {
+                        resolve();
+                    } else if (pendingLength >= AUDIO_SAMPLE_RATE * AUDIO_CHUNK_MS / 1000) {
+                        uploader.send(takePending(), false).catch(() => resolve());
+                    }
+                };
+            });
 
-            if (data.success) {
-                textarea.value = textarea.value ? `${textarea.value} ${data.text}` : data.text;
-                submitButton.disabled = !textarea.value.trim();
-                textarea.dispatchEvent(new Event('input')); // Trigger word count update
-            } else {
-                showToast('Error', data.error || 'Failed to transcribe speech', true);
-            }
+            source.connect(processor);
+            processor.connect(audioContext.destination);
+            await finished;
+
+            processor.disconnect();
+            source.disconnect();
+            button.classList.add('processing');
+
+            const data = await uploader.send(takePending(), true);
+            textarea.value = textarea.value ? `${textarea.value} ${data.text}` : data.text;
+            submitButton.disabled = !textarea.value.trim();
+            textarea.dispatchEvent(new Event('input')); // Trigger word count update
         } catch (error) {
             showToast('Error', error.message, true);
         } finally {
+            recorder = null;
+            if (stream) stream.getTracks().forEach(track => track.stop());
+            if (audioContext) audioContext.close();
             button.classList.remove('recording', 'processing');
             icon.classList.replace('fa-microphone-slash', 'fa-microphone');
         }
@@ -100,35 +195,147 @@ document.addEventListener('DOMContentLoaded', () => {
         bsToast.show();
     }
 
+    // Video players
+    const outputVideo = document.getElementById('outputVideo');
+    const bufferVideo = document.getElementById('bufferVideo');
+    const videoSource = document.getElementById('videoSource');
+    const PLAYBACK_MODE = document.getElementById('videoContainer').getAttribute('data-playback-mode');
+    const ORCHESTRATED = document.getElementById('videoContainer').getAttribute('data-orchestrated') === 'true';
+
+    const mergedPlayer = createMergedPlayer();
+    const playlistPlayer = createPlaylistPlayer();
+    let activePlayer = mergedPlayer;
+
+    function resetPlayButton() {
+        playPauseBtn.innerHTML = '<i class="fas fa-play"></i> Play';
+    }
+
+    function createMergedPlayer() {
+        const player = {
+            get paused() { return outputVideo.paused; },
+            load(src) {
+                bufferVideo.style.display = 'none';
+                outputVideo.style.display = '';
+                outputVideo.removeAttribute('src');
+                videoSource.src = src;
+                outputVideo.load();
+            },
+            play() { outputVideo.play(); },
+            pause() { outputVideo.pause(); },
+            restart() {
+                outputVideo.currentTime = 0;
+                outputVideo.play();
+            }
+        };
+        outputVideo.addEventListener('ended', () => {
+            if (activePlayer === player) resetPlayButton();
+        });
+        return player;
+    }
+
+    // Plays a list of clips back to back on two alternating video elements,
+    // preloading the next clip while the current one plays. Clips with a
+    // start and end are played from start to end only.
+    function createPlaylistPlayer() {
+        const videos = [outputVideo, bufferVideo];
+        const loadedClips = [null, null];
+        let clips = [];
+        let index = 0;
+        let current = 0;
+
+        function preload(video, clip) {
+            loadedClips[videos.indexOf(video)] = clip;
+            video.src = clip.url;
+            video.load();
+        }
+
+        function seekToStart(video, clip) {
+            if (clip && clip.start) video.currentTime = clip.start;
+        }
+
+        function show(videoIndex) {
+            videos.forEach((video, i) => {
+                video.style.display = i === videoIndex ? '' : 'none';
+            });
+        }
+
+        function start() {
+            index = 0;
+            current = 0;
+            show(current);
+            preload(videos[0], clips[0]);
+            if (clips.length > 1) preload(videos[1], clips[1]);
+        }
+
+        function advance() {
+            index += 1;
+            if (index >= clips.length) {
+                resetPlayButton();
+                return;
+            }
+            current = 1 - current;
+            show(current);
+            videos[current].play();
+            if (index + 1 < clips.length) preload(videos[1 - current], clips[index + 1]);
+        }
+
+        videos.forEach((video, i) => {
+            video.addEventListener('loadedmetadata', () => seekToStart(video, loadedClips[i]));
+            video.addEventListener('ended', () => {
+                if (activePlayer === player && i === current) advance();
+            });
+            video.addEventListener('timeupdate', () => {
+                const clip = loadedClips[i];
+                if (activePlayer !== player || i !== current || !clip || !clip.end) return;
+                if (video.currentTime >= clip.end && !video.paused) {
+                    video.pause();
+                    advance();
+                }
+            });
+        });
+
+        const player = {
+            get paused() { return videos[current].paused; },
+            load(newClips) {
+                clips = newClips;
+                start();
+            },
+            play() {
+                if (index >= clips.length) start();
+                videos[current].play();
+            },
+            pause() { videos[current].pause(); },
+            restart() {
+                videos[current].pause();
+                start();
+                videos[current].play();
+            }
+        };
+        return player;
+    }
+
     // Initialize Video Controls
     initializeVideoControls()
 
     function initializeVideoControls() {
-        const video = document.getElementById('outputVideo');
         const restartBtn = document.getElementById('restartBtn');
     
         // Play/Pause button functionality
         playPauseBtn.addEventListener('click', () => {
-            if (video.paused) {
-                video.play();
+            if (activePlayer.paused) {
+                activePlayer.play();
                 playPauseBtn.innerHTML = '<i class="fas fa-pause"></i> Pause';
             } else {
-                video.pause();
-                playPauseBtn.innerHTML = '<i class="fas fa-play"></i> Play';
+                activePlayer.pause();
+                resetPlayButton();
             }
         });
     
         // Restart button functionality
         restartBtn.addEventListener('click', () => {
-            video.currentTime = 0;
-            video.play();
+            activePlayer.restart();
             playPauseBtn.innerHTML = '<i class="fas fa-pause"></i> Pause';
         });
-    
-        // Reset Play button when the video ends
-        video.addEventListener('ended', () => {
-            playPauseBtn.innerHTML = '<i class="fas fa-play"></i> Play';
-        });
     }
 
     // Translation submission
@@ -140,7 +347,6 @@ document.addEventListener('DOMContentLoaded', () => {
         const outputContainer = document.getElementById('outputContainer');
         const aslTranslation = document.getElementById('aslTranslation');
         const videoContainer = document.getElementById('videoContainer');
-        const videoSource = document.getElementById('videoSource');
         const buttonText = document.getElementById('buttonText');
         const buttonSpinner = document.getElementById('buttonSpinner');
 
@@ -149,20 +355,127 @@ document.addEventListener('DOMContentLoaded', () => {
         clearError();
 
         // Reset play/pause button text to "Play"
-        playPauseBtn.innerHTML = '<i class="fas fa-play"></i> Play'; // Add this line
+        activePlayer.pause();
+        resetPlayButton();
 
         // Disable the button and show loading spinner
         submitButton.disabled = true;
         buttonText.style.display = 'none';
         buttonSpinner.style.display = 'inline-block';
 
-        await submitTranslation(textarea, outputContainer, aslTranslation, videoContainer, videoSource, submitButton, buttonText, buttonSpinner);
+        await submitTranslation(textarea, outputContainer, aslTranslation, videoContainer, submitButton, buttonText, buttonSpinner);
+    }
+
+    // Posts to an endpoint answering with Server-Sent Events, handing each event to
+    // onEvent and returning the payload of the "done" event
+    async function readEventStream(url, body, onEvent) {
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(body)
+        });
+        if (!response.ok) {
+            const data = await response.json();
+            throw new Error(data.error);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let eventName = 'message';
+                let eventData = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) eventName = line.slice(7);
+                    else if (line.startsWith('data: ')) eventData += line.slice(6);
+                });
+                const payload = eventData ? JSON.parse(eventData) : {};
+
+                if (eventName === 'error') {
+                    throw new Error(payload.busy ? 'The server is busy, please try again in a few seconds' : payload.error);
+                }
+                if (eventName === 'done') return payload;
+                onEvent(eventName, payload);
+            }
+        }
+        throw new Error('Event stream ended unexpectedly');
+    }
+
+    async function streamAslGloss(englishText, onGloss) {
+        return readEventStream('/api/convert-to-asl/stream', { english_text: englishText }, (eventName, payload) => {
+            if (eventName === 'gloss') onGloss(payload.gloss);
+        });
+    }
+
+    // Posts to an endpoint that queues a background task and polls the task until
+    // it finishes, returning its result. The polls back off from a quarter second
+    // to two seconds, so short tasks return quickly and long ones are polled rarely.
+    async function runTask(url, body) {
+        let response = await fetch(url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(body)
+        });
+        let data = await response.json();
+        if (response.status === 503 && data.busy) throw new Error('The server is busy, please try again in a few seconds');
+        if (!response.ok) throw new Error(data.error || 'Request failed');
+        if (!data.task_id) return data;
+
+        return pollTask(data.task_id);
+    }
+
+    async function pollTask(taskId) {
+        let delay = 250;
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, delay));
+            const response = await fetch('/api/tasks/' + taskId);
+            const data = await response.json();
+            if (!response.ok) throw new Error(data.error);
+            if (data.status === 'done') return data.result;
+            if (data.status === 'failed') throw new Error(data.error);
+            delay = Math.min(delay * 2, 2000);
+        }
+    }
+
+    // Plays the clips of a playlist result, or the skeleton video of a merged result
+    function showVideo(data, videoContainer) {
+        if (data.mode === 'playlist') {
+            activePlayer = playlistPlayer;
+            playlistPlayer.load(data.clips);
+        } else {
+            activePlayer = mergedPlayer;
+            mergedPlayer.load(data.output_path + '?t=' + new Date().getTime());
+        }
+        videoContainer.style.display = 'flex';
     }
 
-    async function submitTranslation(textarea, outputContainer, aslTranslation, videoContainer, videoSource, submitButton, buttonText, buttonSpinner) {
+    async function submitTranslation(textarea, outputContainer, aslTranslation, videoContainer, submitButton, buttonText, buttonSpinner) {
         try {
             const originalText = textarea.value;
 
+            if (ORCHESTRATED) {
+                // The server runs every stage, overlapping those that are independent,
+                // and streams the gloss before queuing the render
+                outputContainer.style.display = 'block';
+                const data = await readEventStream('/api/translate', { input_text: originalText, mode: PLAYBACK_MODE }, (eventName, payload) => {
+                    if (eventName === 'gloss') aslTranslation.textContent = payload.gloss;
+                });
+                aslTranslation.textContent = data.asl_translation;
+                if (!data.video_ready) throw new Error('No signs found for this translation');
+                showVideo(data.task_id ? await pollTask(data.task_id) : data, videoContainer);
+                return;
+            }
+
             // Step 1: Translate to English
             let response = await fetch('/api/translate-to-english', {
                 method: 'POST',
@@ -174,39 +487,27 @@ document.addEventListener('DOMContentLoaded', () => {
 
             const englishText = data.english_text;
 
-            // Step 2: Convert to ASL
-            response = await fetch('/api/convert-to-asl', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ english_text: englishText })
+            // Step 2: Convert to ASL, showing the gloss as it is generated
+            outputContainer.style.display = 'block';
+            data = await streamAslGloss(englishText, partialGloss => {
+                aslTranslation.textContent = partialGloss;
             });
-            data = await response.json();
-            if (!response.ok) throw new Error(data.error);
 
             const aslText = data.asl_translation;
+            const annotation = data.annotation;
             aslTranslation.textContent = aslText;
-            outputContainer.style.display = 'block';
 
             // Step 3: Prepare video
-            response = await fetch('/api/prepare-video', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ asl_translation: aslText, context: englishText })
-            });
-            data = await response.json();
-            if (!response.ok) throw new Error(data.error);
+            data = await runTask('/api/prepare-video', { asl_translation: aslText, context: englishText, annotation: annotation, mode: PLAYBACK_MODE });
 
-            // Step 4: Pose extraction
-            response = await fetch('/api/pose-extraction', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' }
-            });
-            data = await response.json();
-            if (!response.ok) throw new Error(data.error);
+            if (data.mode === 'playlist') {
+                showVideo(data, videoContainer);
+                return;
+            }
 
-            videoSource.src = data.output_path + '?t=' + new Date().getTime();
-            document.getElementById('outputVideo').load();
-            videoContainer.style.display = 'flex';
+            // Step 4: Pose extraction
+            data = await runTask('/api/pose-extraction', { job_id: data.job_id });
+            showVideo(data, videoContainer);
         } catch (error) {
             showError('An error occurred: ' + error.message);
         } finally {
@@ -0,0 +1,132 @@
+import time
+import threading
+import unittest
+from scripts.llm_stub_server import create_stub_server
+from app.services.utils.llm_gateway import (
+    LLMGateway, CircuitBreaker, LLMGatewayError, LLMTimeoutError, LLMUnavailableError, LLMBusyError
+)
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+class LLMGatewayTest(unittest.TestCase):
+    """Drives the gateway against the stub language model server."""
+
+    def start_stub(self, **settings):
+        """Serves a stub with the given settings for the duration of the test and returns its server."""
+        server = create_stub_server(port=0, response_text="STUB RESPONSE", **settings)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        def stop():
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self.addCleanup(stop)
+        return server
+
+    def make_gateway(self, server, breaker=None, **settings):
+        """Creates a gateway pointed at a stub server, with test-sized timings."""
+        options = {
+            "deadline_seconds": 5, "attempt_timeout_seconds": 5, "max_retries": 2, "backoff_seconds": 0.01,
+            "hedge_after_seconds": 0, "max_concurrency": 4
+        }
+        options.update(settings)
+        base_url = f"http://localhost:{server.server_address[1]}/v1"
+        return LLMGateway(base_url=base_url, breaker=breaker or CircuitBreaker(5, 30), **options)
+
+    def test_complete_returns_response(self):
+        gateway = self.make_gateway(self.start_stub())
+        self.assertEqual(gateway.complete(MESSAGES), "STUB RESPONSE")
+        self.assertEqual(gateway.get_stats()["attempts"], 1)
+
+    def test_stream_yields_response(self):
+        gateway = self.make_gateway(self.start_stub())
+        self.assertEqual("".join(gateway.stream(MESSAGES)), "STUB RESPONSE")
+
+    def test_server_errors_are_retried(self):
+        server = self.start_stub(fail_first=2)
+        gateway = self.make_gateway(server)
+        self.assertEqual(gateway.complete(MESSAGES), "STUB RESPONSE")
+        stats = gateway.get_stats()
+        self.assertEqual(stats["attempts"], 3)
+        self.assertEqual(stats["retries"], 2)
+        self.assertEqual(stats["breaker"], "closed")
+
+    def test_retries_stop_at_the_limit(self):
+        server = self.start_stub(failure_rate=1.0)
+        gateway = self.make_gateway(server, max_retries=1)
+        with self.assertRaises(LLMGatewayError):
+            gateway.complete(MESSAGES)
+        self.assertEqual(server.RequestHandlerClass.requests_seen, 2)
+
+    def test_client_errors_are_not_retried(self):
+        server = self.start_stub(failure_rate=1.0, failure_status=400)
+        gateway = self.make_gateway(server, breaker=CircuitBreaker(1, 30))
+        with self.assertRaises(LLMGatewayError):
+            gateway.complete(MESSAGES)
+        self.assertEqual(server.RequestHandlerClass.requests_seen, 1)
+        self.assertEqual(gateway.get_stats()["breaker"], "closed")
+
+    def test_deadline_bounds_slow_calls(self):
+        gateway = self.make_gateway(self.start_stub(latency=1.0), deadline_seconds=0.3)
+        started = time.monotonic()
+        with self.assertRaises(LLMTimeoutError):
+            gateway.complete(MESSAGES)
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(gateway.get_stats()["timeouts"], 1)
+
+    def test_hedge_answers_for_slow_request(self):
+        server = self.start_stub()
+        base = server.RequestHandlerClass
+
+        class SlowFirstHandler(base):
+            @property
+            def latency(self):
+                return 1.0 if self.requests_seen == 1 else 0.0
+
+        server.RequestHandlerClass = SlowFirstHandler
+        gateway = self.make_gateway(server, hedge_after_seconds=0.1)
+        started = time.monotonic()
+        self.assertEqual(gateway.complete(MESSAGES), "STUB RESPONSE")
+        self.assertLess(time.monotonic() - started, 0.8)
+        stats = gateway.get_stats()
+        self.assertEqual(stats["hedges"], 1)
+        self.assertEqual(stats["hedge_wins"], 1)
+
+    def test_concurrency_limit_rejects_without_tripping_breaker(self):
+        gateway = self.make_gateway(
+            self.start_stub(latency=0.8), breaker=CircuitBreaker(1, 30), deadline_seconds=0.3, max_concurrency=1
+        )
+        holder = threading.Thread(target=lambda: self.assertRaises(LLMTimeoutError, gateway.complete, MESSAGES))
+        holder.start()
+        time.sleep(0.05)
+        with self.assertRaises(LLMBusyError):
+            gateway.complete(MESSAGES)
+        holder.join()
+        self.assertEqual(gateway.get_stats()["rejected"], 1)
+
+    def test_breaker_opens_on_auth_errors(self):
+        server = self.start_stub(failure_rate=1.0, failure_status=401)
+        gateway = self.make_gateway(server, breaker=CircuitBreaker(2, 30))
+        for _ in range(2):
+            with self.assertRaises(LLMGatewayError):
+                gateway.complete(MESSAGES)
+        with self.assertRaises(LLMUnavailableError):
+            gateway.complete(MESSAGES)
+        self.assertEqual(server.RequestHandlerClass.requests_seen, 2)
+        self.assertEqual(gateway.get_stats()["breaker"], "open")
+
+    def test_breaker_closes_after_successful_trial(self):
+        server = self.start_stub(fail_first=2)
+        gateway = self.make_gateway(server, breaker=CircuitBreaker(2, 0.2), max_retries=0)
+        for _ in range(2):
+            with self.assertRaises(LLMGatewayError):
+                gateway.complete(MESSAGES)
+        with self.assertRaises(LLMUnavailableError):
+            gateway.complete(MESSAGES)
+        time.sleep(0.3)
+        self.assertEqual(gateway.get_stats()["breaker"], "half_open")
+        self.assertEqual(gateway.complete(MESSAGES), "STUB RESPONSE")
+        self.assertEqual(gateway.get_stats()["breaker"], "closed")
+
+if __name__ == "__main__":
+    unittest.main()